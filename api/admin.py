@@ -1,10 +1,32 @@
-from django.contrib import admin
+import datetime
+import re
+import uuid
+import zipfile
+from collections import defaultdict
+
+from django.contrib import admin, messages
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db.models import Count, Q, Sum
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.urls import path, reverse
+from django.utils.decorators import method_decorator
 from django.utils.html import format_html
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from .models import (
     ContactMessage, TeamMember, GalleryCategory, GalleryItem, 
     Testimonial, Event, EventRegistration, Payment,
-    ProgramCategory, Program, ProgramFeature, ProgramRegistration
+    ProgramCategory, Program, ProgramFeature, ProgramRegistration,
+    DailyRollup,
 )
+from .forms import CatalogueImportForm, GalleryBulkUploadForm
+from .paginators import EstimatedCountPaginator
+from .services import catalogue_import, registration_service
+from .services.gallery_upload import bulk_upload
 
 
 # ==================== CONTACT & TEAM ADMIN ====================
@@ -28,7 +50,74 @@ class TeamMemberAdmin(admin.ModelAdmin):
 @admin.register(GalleryCategory)
 class GalleryCategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {"slug": ("name",)}
-    list_display = ('name', 'slug')
+    list_display = ('name', 'slug', 'bulk_upload_link')
+
+    def bulk_upload_link(self, obj):
+        url = reverse('admin:api_gallerycategory_bulk_upload', args=[obj.pk])
+        return format_html('<a href="{}">Bulk upload photos</a>', url)
+    bulk_upload_link.short_description = "Bulk Upload"
+
+    def get_urls(self):
+        custom_urls = [
+            path(
+                '<path:object_id>/bulk-upload/',
+                self.admin_site.admin_view(self.bulk_upload_view),
+                name='api_gallerycategory_bulk_upload',
+            ),
+        ]
+        return custom_urls + super().get_urls()
+
+    @method_decorator(csrf_exempt)
+    def bulk_upload_view(self, request, object_id):
+        # Spool every upload to a temp file instead of memory. Upload handlers
+        # can only be swapped before the body is read, hence csrf_exempt here
+        # and csrf_protect on the inner view.
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return self._bulk_upload_view(request, object_id)
+
+    @method_decorator(csrf_protect)
+    def _bulk_upload_view(self, request, object_id):
+        category = self.get_object(request, object_id)
+        if category is None:
+            return self._get_obj_does_not_exist_redirect(request, self.opts, object_id)
+        if not self.has_add_permission(request) or not request.user.has_perm('api.add_galleryitem'):
+            raise PermissionDenied
+
+        if request.method == 'POST':
+            form = GalleryBulkUploadForm(request.POST, request.FILES)
+            if form.is_valid():
+                try:
+                    result = bulk_upload(
+                        category,
+                        files=form.cleaned_data['files'],
+                        archive=form.cleaned_data.get('archive'),
+                    )
+                except (zipfile.BadZipFile, ValueError) as e:
+                    form.add_error('archive', str(e))
+                else:
+                    created = len(result['created'])
+                    self.message_user(
+                        request,
+                        f"Uploaded {created} photo(s) to {category.name}. "
+                        f"Resized variants are queued for process_images.",
+                        messages.SUCCESS,
+                    )
+                    for filename, reason in result['rejected'][:20]:
+                        self.message_user(request, f"Skipped {filename}: {reason}", messages.WARNING)
+                    return redirect(
+                        f"{reverse('admin:api_galleryitem_changelist')}?category__id__exact={category.pk}"
+                    )
+        else:
+            form = GalleryBulkUploadForm()
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f"Bulk upload photos to {category.name}",
+            'opts': self.opts,
+            'original': category,
+            'form': form,
+        }
+        return TemplateResponse(request, 'admin/api/gallerycategory/bulk_upload.html', context)
 
 
 @admin.register(GalleryItem)
@@ -46,37 +135,86 @@ class TestimonialAdmin(admin.ModelAdmin):
     ordering = ('-created_at',)
 
 
-# ==================== EVENT & REGISTRATION ADMIN ====================
-class EventRegistrationInline(admin.TabularInline):
-    model = EventRegistration
-    extra = 0
-    readonly_fields = ('registration_status_display', 'registration_date')
-    fields = ('full_name', 'email', 'registration_status_display', 'registration_date')
-    show_change_link = True
-    
-    def registration_status_display(self, obj):
-        status_colors = {
-            'pending': 'orange',
-            'confirmed': 'green', 
-            'cancelled': 'red',
-            'waiting_list': 'blue',
+# ==================== CATALOGUE IMPORT ====================
+class CatalogueImportMixin:
+    """Adds an "Import" page (CSV/XLSX of events, programs and features) to a changelist."""
+    change_list_template = 'admin/api/catalogue_import_change_list.html'
+    import_kind = None
+    # Any file may mix all three kinds of rows
+    import_permissions = (
+        'api.add_event', 'api.change_event', 'api.add_program', 'api.change_program', 'api.add_programfeature',
+    )
+    import_errors_shown = 200
+
+    def get_urls(self):
+        custom_urls = [
+            path(
+                'import/',
+                self.admin_site.admin_view(self.import_view),
+                name=f'{self.opts.app_label}_{self.opts.model_name}_import',
+            ),
+        ]
+        return custom_urls + super().get_urls()
+
+    @method_decorator(csrf_exempt)
+    def import_view(self, request):
+        # Spool the upload to a temp file; see GalleryCategoryAdmin.bulk_upload_view
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return self._import_view(request)
+
+    @method_decorator(csrf_protect)
+    def _import_view(self, request):
+        if not request.user.has_perms(self.import_permissions):
+            raise PermissionDenied
+
+        report = None
+        if request.method == 'POST':
+            form = CatalogueImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                upload = form.cleaned_data['file']
+                try:
+                    report = catalogue_import.import_file(
+                        upload, upload.name, kind=form.cleaned_data['kind'], dry_run=form.cleaned_data['dry_run'],
+                    )
+                except catalogue_import.ImportFileError as e:
+                    form.add_error('file', str(e))
+                else:
+                    level = messages.WARNING if report.errors else messages.SUCCESS
+                    self.message_user(request, report.summary(), level)
+        else:
+            form = CatalogueImportForm(initial={'kind': self.import_kind})
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Import events, programs and features',
+            'opts': self.opts,
+            'form': form,
+            'report': report,
+            'errors': report.errors[:self.import_errors_shown] if report else [],
+            'columns': catalogue_import.COLUMNS,
         }
-        color = status_colors.get(obj.registration_status, 'gray')
-        return format_html(
-            '<span style="background-color: {}; color: white; padding: 2px 8px; border-radius: 12px; font-size: 12px;">{}</span>',
-            color,
-            obj.get_registration_status_display().upper()
-        )
-    registration_status_display.short_description = "Status"
+        return TemplateResponse(request, 'admin/api/catalogue_import.html', context)
+
+
+# ==================== EVENT & REGISTRATION ADMIN ====================
+# Badge colours of the registrations panel on the event change page
+REGISTRATION_STATUS_COLORS = {
+    'pending': 'orange',
+    'confirmed': 'green',
+    'cancelled': 'red',
+    'waiting_list': 'blue',
+}
 
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(CatalogueImportMixin, admin.ModelAdmin):
     list_display = ('title', 'category', 'start_date', 'location', 'status', 'is_free', 'available_spots_display')
     list_filter = ('category', 'status', 'is_free', 'registration_open')
     search_fields = ('title', 'location', 'description')
     readonly_fields = ('created_at', 'updated_at', 'available_spots_display')
-    inlines = [EventRegistrationInline]
+    change_form_template = 'admin/api/event/change_form.html'
+    registrations_per_page = 50
+    import_kind = 'event'
     fieldsets = (
         ('Basic Information', {
             'fields': ('title', 'subtitle', 'tagline', 'category', 'description')
@@ -106,6 +244,81 @@ class EventAdmin(admin.ModelAdmin):
         return obj.available_spots
     available_spots_display.short_description = 'Available Spots'
 
+    def get_urls(self):
+        custom_urls = [
+            path(
+                '<path:object_id>/registrations/',
+                self.admin_site.admin_view(self.registrations_view),
+                name='api_event_registrations',
+            ),
+        ]
+        return custom_urls + super().get_urls()
+
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        extra_context = {
+            **(extra_context or {}),
+            'registration_statuses': [
+                {'value': value, 'label': label, 'color': REGISTRATION_STATUS_COLORS.get(value, 'gray')}
+                for value, label in EventRegistration.REGISTRATION_STATUS_CHOICES
+            ],
+            'show_registrations': request.user.has_perm('api.view_eventregistration'),
+        }
+        return super().change_view(request, object_id, form_url, extra_context)
+
+    def registrations_view(self, request, object_id):
+        """
+        One page of an event's registrations as JSON for the change page panel,
+        with per-status counts. Filters: ?status=, ?q= (name, email or company), ?page=.
+        """
+        event = self.get_object(request, object_id)
+        if event is None:
+            return JsonResponse({'error': 'Event not found'}, status=404)
+        if not self.has_view_or_change_permission(request, event) or not request.user.has_perm('api.view_eventregistration'):
+            raise PermissionDenied
+
+        statuses = dict(EventRegistration.REGISTRATION_STATUS_CHOICES)
+        status = request.GET.get('status', '')
+        if status and status not in statuses:
+            return JsonResponse({'error': f"Unknown status: {status}"}, status=400)
+        try:
+            page = max(1, int(request.GET.get('page', 1)))
+        except ValueError:
+            return JsonResponse({'error': 'page must be a number'}, status=400)
+        search = request.GET.get('q', '').strip()
+
+        registrations = EventRegistration.objects.filter(event_id=event.pk)
+        # All status counts in a single aggregate query
+        counts = registrations.aggregate(
+            total=Count('id'),
+            **{value: Count('id', filter=Q(registration_status=value)) for value in statuses},
+        )
+
+        rows = registrations
+        if status:
+            rows = rows.filter(registration_status=status)
+        if search:
+            rows = rows.filter(Q(full_name__icontains=search) | Q(email__icontains=search) | Q(company__icontains=search))
+            count = rows.count()
+        else:
+            count = counts[status] if status else counts['total']
+
+        per_page = self.registrations_per_page
+        num_pages = max(1, -(-count // per_page))
+        page = min(page, num_pages)
+        offset = (page - 1) * per_page
+        results = list(
+            rows.order_by('-registration_date', '-pk')
+            .values('id', 'full_name', 'email', 'company', 'registration_status', 'registration_date')
+            [offset:offset + per_page]
+        )
+        return JsonResponse({
+            'counts': counts,
+            'count': count,
+            'page': page,
+            'num_pages': num_pages,
+            'results': results,
+        })
+
 
 @admin.register(EventRegistration)
 class EventRegistrationAdmin(admin.ModelAdmin):
@@ -113,6 +326,7 @@ class EventRegistrationAdmin(admin.ModelAdmin):
     list_filter = ('registration_status', 'event', 'experience_level')
     search_fields = ('full_name', 'email', 'company', 'job_title', 'event__title')
     readonly_fields = ('registration_date', 'updated_at', 'payment_link_display')
+    actions = ('confirm_selected', 'cancel_selected', 'waitlist_selected')
     fieldsets = (
         ('Personal Information', {
             'fields': ('full_name', 'email', 'phone')
@@ -174,6 +388,27 @@ class EventRegistrationAdmin(admin.ModelAdmin):
             '<span style="background-color: gray; color: white; padding: 2px 8px; border-radius: 12px; font-size: 12px;">NO PAYMENT</span>'
         )
     payment_status_display.short_description = "Payment Status"
+
+    def confirm_selected(self, request, queryset):
+        result = registration_service.confirm_registrations(queryset)
+        self.message_user(request, registration_service.describe(result, "Confirmed", "registration(s)"), messages.SUCCESS)
+    confirm_selected.short_description = "Confirm selected registrations"
+    confirm_selected.allowed_permissions = ('change',)
+
+    def cancel_selected(self, request, queryset):
+        result = registration_service.cancel_registrations(queryset)
+        message = registration_service.describe(result, "Cancelled", "registration(s)")
+        if result['payments']:
+            message += f"; {result['payments']} open payment(s) cancelled"
+        self.message_user(request, message, messages.SUCCESS)
+    cancel_selected.short_description = "Cancel selected registrations"
+    cancel_selected.allowed_permissions = ('change',)
+
+    def waitlist_selected(self, request, queryset):
+        result = registration_service.waitlist_registrations(queryset)
+        self.message_user(request, registration_service.describe(result, "Waitlisted", "registration(s)"), messages.SUCCESS)
+    waitlist_selected.short_description = "Move selected registrations to the waiting list"
+    waitlist_selected.allowed_permissions = ('change',)
     
     def payment_link_display(self, obj):
         if hasattr(obj, 'payment'):
@@ -189,11 +424,60 @@ class EventRegistrationAdmin(admin.ModelAdmin):
 
 
 # ==================== PAYMENT ADMIN ====================
+class CachedAllValuesFieldListFilter(admin.AllValuesFieldListFilter):
+    """AllValuesFieldListFilter whose distinct values are cached, instead of a DISTINCT scan on every page view."""
+    cache_timeout = 600
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        key = f"admin_filter_values:{model._meta.label_lower}:{field_path}"
+        self.lookup_choices = cache.get_or_set(key, lambda: list(self.lookup_choices), self.cache_timeout)
+
+
+EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+
+class PaymentChangelistMixin:
+    """
+    Changelist tuning shared by the Payment and ProgramPayment admins: related
+    rows joined up front, no second full-table COUNT, an estimated count for
+    the unfiltered list on Postgres, and index-backed lookups for full
+    emails / IDs.
+    """
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    list_related = ()
+    actions = ('mark_cash_completed',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(*self.list_related)
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if EMAIL_RE.fullmatch(term):
+            return queryset.filter(customer_email__in={term, term.lower()}), False
+        try:
+            tracking_id = uuid.UUID(term)
+        except ValueError:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(Q(pk=tracking_id) | Q(pesapal_order_tracking_id=term)), False
+
+    def mark_cash_completed(self, request, queryset):
+        result = registration_service.mark_cash_payments_completed(queryset)
+        self.message_user(
+            request, registration_service.describe(result, "Completed", "cash payment(s)"), messages.SUCCESS,
+        )
+    mark_cash_completed.short_description = "Mark selected cash payments as completed"
+    mark_cash_completed.allowed_permissions = ('change',)
+
+
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(PaymentChangelistMixin, admin.ModelAdmin):
     list_display = ('truncated_id', 'customer_email', 'amount_currency', 'payment_method', 'payment_status_badge', 'event_title', 'payment_initiated_at')
-    list_filter = ('payment_status', 'payment_method', 'currency', 'payment_initiated_at')
-    search_fields = ('customer_email', 'customer_phone', 'pesapal_order_tracking_id', 'registration__full_name', 'registration__event__title')
+    list_filter = ('payment_status', 'payment_method', ('currency', CachedAllValuesFieldListFilter), 'payment_initiated_at')
+    # description always carries the event title, so searching it avoids joining api_event
+    search_fields = ('customer_email', 'customer_phone', 'pesapal_order_tracking_id', 'registration__full_name', 'description')
+    list_related = ('registration__event',)
     readonly_fields = ('id', 'created_at', 'updated_at', 'registration_link', 'pesapal_order_tracking_id', 'pesapal_transaction_id')
     fieldsets = (
         ('Payment Information', {
@@ -266,11 +550,17 @@ class ProgramFeatureInline(admin.TabularInline):
 
 
 @admin.register(Program)
-class ProgramAdmin(admin.ModelAdmin):
-    list_display = ('title', 'category', 'duration', 'price', 'badge')
-    list_filter = ('category', 'badge')
+class ProgramAdmin(CatalogueImportMixin, admin.ModelAdmin):
+    list_display = ('title', 'category', 'duration', 'price_display', 'badge')
+    list_filter = ('category', 'badge', 'price_currency')
     search_fields = ('title', 'description', 'focus', 'outcome')
     inlines = [ProgramFeatureInline]
+    import_kind = 'program'
+
+    def price_display(self, obj):
+        return obj.price
+    price_display.short_description = 'Price'
+    price_display.admin_order_field = 'price_amount'
 
 
 @admin.register(ProgramCategory)
@@ -280,10 +570,11 @@ class ProgramCategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(ProgramFeature)
-class ProgramFeatureAdmin(admin.ModelAdmin):
+class ProgramFeatureAdmin(CatalogueImportMixin, admin.ModelAdmin):
     list_display = ('program', 'description')
     search_fields = ('description',)
     list_per_page = 20
+    import_kind = 'feature'
 
 
 @admin.register(ProgramRegistration)
@@ -301,7 +592,7 @@ from django.utils.html import format_html
 from .models import ProgramPayment
 
 @admin.register(ProgramPayment)
-class ProgramPaymentAdmin(admin.ModelAdmin):
+class ProgramPaymentAdmin(PaymentChangelistMixin, admin.ModelAdmin):
     list_display = (
         'truncated_id', 
         'customer_email', 
@@ -314,7 +605,7 @@ class ProgramPaymentAdmin(admin.ModelAdmin):
     list_filter = (
         'payment_status', 
         'payment_method', 
-        'currency', 
+        ('currency', CachedAllValuesFieldListFilter),
         'payment_initiated_at'
     )
     search_fields = (
@@ -322,8 +613,9 @@ class ProgramPaymentAdmin(admin.ModelAdmin):
         'customer_phone', 
         'pesapal_order_tracking_id', 
         'registration__full_name', 
-        'registration__program__title'
+        'description'  # carries the program title; avoids joining api_program
     )
+    list_related = ('registration__program',)
     readonly_fields = (
         'id', 
         'created_at', 
@@ -414,6 +706,117 @@ class ProgramPaymentAdmin(admin.ModelAdmin):
             )
         return "No Registration"
     registration_link.short_description = "Registration"
-    
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('registration', 'registration__program')
\ No newline at end of file
+
+# ==================== SALES DASHBOARD ====================
+@admin.register(DailyRollup)
+class DailyRollupAdmin(admin.ModelAdmin):
+    """
+    Revenue and registration dashboard read from DailyRollup, so the cost
+    grows with the number of days shown, not with the number of payments.
+    """
+    dashboard_days = (7, 30, 90, 365)
+    top_objects = 25
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            days = int(request.GET.get('days', 30))
+        except ValueError:
+            days = 30
+        if days not in self.dashboard_days:
+            days = 30
+        kind = request.GET.get('kind', '')
+        if kind not in dict(DailyRollup.KIND_CHOICES):
+            kind = ''
+
+        end = timezone.localdate()
+        start = end - datetime.timedelta(days=days - 1)
+        rollups = DailyRollup.objects.filter(date__gte=start, date__lte=end)
+        if kind:
+            rollups = rollups.filter(kind=kind)
+        sums = {
+            'registrations': Sum('registrations'),
+            'payments': Sum('payments'),
+            'completed_payments': Sum('completed_payments'),
+            'revenue': Sum('revenue'),
+        }
+
+        totals = {name: value or 0 for name, value in rollups.aggregate(**sums).items()}
+        totals['conversion'] = self._conversion(totals)
+        # Rows are per currency, and revenue is only ever added up within one
+        totals['revenue'] = list(
+            rollups.values_list('currency').annotate(amount=Sum('revenue')).exclude(amount=0).order_by('currency')
+        )
+        revenue_by_day = defaultdict(list)
+        for day, currency, amount in (
+            rollups.values_list('date', 'currency').annotate(amount=Sum('revenue')).exclude(amount=0).order_by('currency')
+        ):
+            revenue_by_day[day].append((currency, amount))
+
+        by_day = {row['date']: row for row in rollups.values('date').annotate(**sums).order_by()}
+        peak = max((row['registrations'] for row in by_day.values()), default=0) or 1
+        daily = []
+        for offset in range(days):
+            day = start + datetime.timedelta(days=offset)
+            row = by_day.get(day, {'registrations': 0, 'payments': 0, 'completed_payments': 0})
+            daily.append({
+                **row,
+                'date': day,
+                'revenue': revenue_by_day[day],
+                'bar': round(100 * row['registrations'] / peak),
+            })
+
+        # Ranked within each currency: amounts in different currencies don't compare
+        currencies = rollups.order_by('currency').values_list('currency', flat=True).distinct()
+        top = [
+            (currency, list(
+                rollups.filter(currency=currency).values('kind', 'object_id').annotate(**sums)
+                .order_by('-revenue', '-registrations')[:self.top_objects]
+            ))
+            for currency in currencies
+        ]
+        rows = [row for _, ranked in top for row in ranked]
+        targets = {
+            kind: model.objects.only('title').in_bulk([row['object_id'] for row in rows if row['kind'] == kind])
+            for kind, model in (('event', Event), ('program', Program))
+        }
+        for row in rows:
+            target = targets[row['kind']].get(row['object_id'])
+            row['title'] = target.title if target else f"{row['object_id']} (deleted)"
+            row['conversion'] = self._conversion(row)
+            if target:
+                row['url'] = reverse(f"admin:api_{row['kind']}_change", args=[target.pk])
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Sales dashboard',
+            'opts': self.opts,
+            'days': days,
+            'day_choices': self.dashboard_days,
+            'kind': kind,
+            'kind_choices': DailyRollup.KIND_CHOICES,
+            'start': start,
+            'end': end,
+            'totals': totals,
+            'daily': reversed(daily),
+            'top': top,
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request, 'admin/api/dailyrollup/dashboard.html', context)
+
+    @staticmethod
+    def _conversion(row):
+        """Share of payments that completed, as a percentage."""
+        if not row['payments']:
+            return None
+        return round(100 * row['completed_payments'] / row['payments'], 1)
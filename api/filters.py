@@ -0,0 +1,151 @@
+import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, List, Optional, Sequence
+
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+from .models import Event, ProgramFeature
+
+TRUE_VALUES = {'1', 'true', 'yes'}
+FALSE_VALUES = {'0', 'false', 'no'}
+
+EVENT_ORDERING = {'start_date', 'title', 'investment_amount', 'created_at'}
+PROGRAM_ORDERING = {'title', 'duration', 'badge', 'price_amount'}
+
+# Serializer fields that read columns other than their own name
+EXTRA_SOURCES = {
+    'image_srcset': ('image_variants',),
+}
+
+
+class QueryParamError(ValueError):
+    """An invalid list query parameter; the message is safe to return to the client."""
+
+
+def _choices(param: str, value: str, allowed: Iterable[str]) -> List[str]:
+    values = [item.strip() for item in value.split(',') if item.strip()]
+    allowed = set(allowed)
+    unknown = [item for item in values if item not in allowed]
+    if unknown:
+        raise QueryParamError(f"Unknown {param}: {', '.join(unknown)}. Expected one of: {', '.join(sorted(allowed))}")
+    return values
+
+
+def _boolean(param: str, value: str) -> bool:
+    if value.lower() in TRUE_VALUES:
+        return True
+    if value.lower() in FALSE_VALUES:
+        return False
+    raise QueryParamError(f"{param} must be true or false")
+
+
+def _date(param: str, value: str) -> datetime.date:
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise QueryParamError(f"{param} must be a date (YYYY-MM-DD)")
+
+
+def _decimal(param: str, value: str) -> Decimal:
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise QueryParamError(f"{param} must be a number")
+    if not amount.is_finite():
+        raise QueryParamError(f"{param} must be a number")
+    return amount
+
+
+def _ordering(value: Optional[str], allowed: Iterable[str], default: Sequence[str]) -> List[str]:
+    if not value:
+        return list(default)
+    ordering = []
+    for item in (part.strip() for part in value.split(',') if part.strip()):
+        if item.lstrip('-') not in allowed:
+            raise QueryParamError(f"Cannot order by {item}. Expected one of: {', '.join(sorted(allowed))}")
+        ordering.append(item)
+    return ordering + ['pk']
+
+
+def sparse_fields(params, serializer_class) -> Optional[List[str]]:
+    """The `fields=` sparse fieldset, validated against the serializer, or None for all fields."""
+    value = params.get('fields')
+    if not value:
+        return None
+    available = list(serializer_class().fields)
+    requested = _choices('fields', value, available)
+    return [name for name in available if name in requested]
+
+
+def only_columns(serializer_class, fields: Optional[List[str]]) -> Optional[List[str]]:
+    """Model columns needed to render `fields`, for queryset.only(); None when all fields are rendered."""
+    if fields is None:
+        return None
+    serializer_fields = serializer_class().fields
+    columns = ['pk']
+    for name in fields:
+        field = serializer_fields[name]
+        if name in EXTRA_SOURCES:
+            columns.extend(EXTRA_SOURCES[name])
+        elif field.source != '*' and '.' not in field.source and not isinstance(field, serializers.ListSerializer):
+            columns.append(field.source)
+    return list(dict.fromkeys(columns))
+
+
+def filter_events(queryset, params):
+    """
+    Apply event list query parameters:
+    status, category (comma-separated), is_free, registration_open,
+    start_date_from / start_date_to (YYYY-MM-DD), location (substring) and
+    ordering (start_date, title, investment_amount, created_at; `-` for descending).
+    """
+    if params.get('status'):
+        queryset = queryset.filter(status__in=_choices('status', params['status'], dict(Event.EVENT_STATUS_CHOICES)))
+    if params.get('category'):
+        queryset = queryset.filter(category__in=_choices('category', params['category'], dict(Event.CATEGORY_CHOICES)))
+    if params.get('is_free'):
+        queryset = queryset.filter(is_free=_boolean('is_free', params['is_free']))
+    if params.get('registration_open'):
+        queryset = queryset.filter(registration_open=_boolean('registration_open', params['registration_open']))
+    if params.get('start_date_from'):
+        queryset = queryset.filter(start_date__gte=_date('start_date_from', params['start_date_from']))
+    if params.get('start_date_to'):
+        queryset = queryset.filter(start_date__lte=_date('start_date_to', params['start_date_to']))
+    if params.get('location'):
+        queryset = queryset.filter(location__icontains=params['location'].strip())
+    return queryset.order_by(*_ordering(params.get('ordering'), EVENT_ORDERING, ['start_date']))
+
+
+def filter_programs(queryset, params, fields: Optional[List[str]] = None):
+    """
+    Apply program list query parameters: category (slug, comma-separated),
+    badge, price_currency, price_min / price_max (on price_amount; programs
+    without a structured price are excluded) and ordering (title, duration,
+    badge, price_amount). Loads the category and features relations only
+    when they are rendered.
+    """
+    if params.get('category'):
+        slugs = [slug.strip() for slug in params['category'].split(',') if slug.strip()]
+        queryset = queryset.filter(category__slug__in=slugs)
+    if params.get('badge'):
+        queryset = queryset.filter(badge__iexact=params['badge'].strip())
+    if params.get('price_currency'):
+        queryset = queryset.filter(price_currency=params['price_currency'].strip().upper())
+    if params.get('price_min'):
+        queryset = queryset.filter(price_amount__gte=_decimal('price_min', params['price_min']))
+    if params.get('price_max'):
+        queryset = queryset.filter(price_amount__lte=_decimal('price_max', params['price_max']))
+    if fields is None or 'category' in fields:
+        queryset = queryset.select_related('category')
+    if fields is None or 'features' in fields:
+        queryset = queryset.prefetch_related(
+            Prefetch('features', queryset=ProgramFeature.objects.only('id', 'program_id', 'description'))
+        )
+    return queryset.order_by(*_ordering(params.get('ordering'), PROGRAM_ORDERING, ['title']))
+
+
+def apply_only(queryset, serializer_class, fields: Optional[List[str]]):
+    """Defer every column the sparse fieldset doesn't render."""
+    columns = only_columns(serializer_class, fields)
+    return queryset if columns is None else queryset.only(*columns)
@@ -0,0 +1,46 @@
+from django import forms
+
+
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    """FileField accepting several files from one <input multiple>."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("widget", MultipleFileInput(attrs={"accept": "image/*"}))
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        single_clean = super().clean
+        if isinstance(data, (list, tuple)):
+            return [single_clean(item, initial) for item in data if item]
+        return [single_clean(data, initial)] if data else []
+
+
+class GalleryBulkUploadForm(forms.Form):
+    files = MultipleFileField(required=False, help_text="Select any number of photos.")
+    archive = forms.FileField(
+        required=False,
+        help_text="Or upload a ZIP archive of photos.",
+        widget=forms.ClearableFileInput(attrs={"accept": ".zip,application/zip"}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get("files") and not cleaned_data.get("archive"):
+            raise forms.ValidationError("Choose photos or a ZIP archive to upload.")
+        return cleaned_data
+
+
+class CatalogueImportForm(forms.Form):
+    file = forms.FileField(
+        help_text="CSV (UTF-8) or .xlsx with a header row.",
+        widget=forms.ClearableFileInput(attrs={"accept": ".csv,.xlsx"}),
+    )
+    kind = forms.ChoiceField(
+        choices=[("event", "Events"), ("program", "Programs"), ("feature", "Program features")],
+        help_text="For rows without a kind column or a sheet named Events/Programs/Features.",
+    )
+    dry_run = forms.BooleanField(required=False, help_text="Validate and report only; nothing is saved.")
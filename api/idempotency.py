@@ -0,0 +1,116 @@
+import datetime
+import functools
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+def expiry_cutoff():
+    return timezone.now() - datetime.timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def request_hash(request):
+    """Fingerprint of the method, path and parsed body, to spot a key reused for another request."""
+    data = request.data
+    if hasattr(data, "lists"):  # QueryDict from form posts
+        data = dict(data.lists())
+    payload = json.dumps([request.method, request.get_full_path(), data], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _claim(scope, key, digest):
+    """
+    (record, True) after inserting the placeholder for a new key, or the
+    existing record and False. An expired record is replaced.
+    """
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(scope=scope, key=key, request_hash=digest), True
+        except IntegrityError:
+            pass
+        record = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+        if record is None:
+            continue  # deleted since the INSERT failed
+        if record.created_at < expiry_cutoff():
+            IdempotencyKey.objects.filter(pk=record.pk, created_at=record.created_at).delete()
+            continue
+        return record, False
+    return None, False
+
+
+def _replay(record, digest):
+    if record is not None and record.request_hash != digest:
+        return Response(
+            {'error': f'This {HEADER} was already used for a different request'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if record is None or record.status_code is None:
+        return Response(
+            {'error': f'A request with this {HEADER} is still being processed'},
+            status=status.HTTP_409_CONFLICT,
+            headers={'Retry-After': '1'},
+        )
+    return Response(record.response_body, status=record.status_code, headers={'Idempotent-Replayed': 'true'})
+
+
+def idempotent(scope):
+    """
+    View decorator, under @api_view: a POST carrying an Idempotency-Key
+    header runs once per (scope, key); repeats within IDEMPOTENCY_KEY_TTL
+    get the stored response back without re-running the view (no second
+    registration, email or PesaPal order). A repeat that arrives while the
+    first is still running gets a 409, and a key reused with a different
+    body or URL a 422. Server errors are not stored, so they can be retried.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(request, *args, **kwargs):
+            key = request.headers.get(HEADER, "").strip()
+            if request.method != "POST" or not key:
+                return view(request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return Response(
+                    {'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            digest = request_hash(request)
+            record, created = _claim(scope, key, digest)
+            if not created:
+                logger.info("Replaying %s response for %s key %s", scope, request.path, key)
+                return _replay(record, digest)
+
+            try:
+                response = view(request, *args, **kwargs)
+            except Exception:
+                record.delete()
+                raise
+            if response.status_code >= 500 or not hasattr(response, "data"):
+                record.delete()
+                return response
+            record.status_code = response.status_code
+            record.response_body = response.data
+            record.save(update_fields=['status_code', 'response_body'])
+            return response
+        return wrapped
+    return decorator
+
+
+def purge_expired():
+    """Delete stored responses older than IDEMPOTENCY_KEY_TTL; returns the count."""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=expiry_cutoff()).delete()
+    return deleted
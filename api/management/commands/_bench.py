@@ -0,0 +1,84 @@
+"""Shared helpers for the bench_* management commands."""
+import logging
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def isolated_database(verbosity=0, quiet=True, test_name=None):
+    """
+    Run the block against a freshly migrated throwaway database (the same one
+    `manage.py test` would create), with the locmem email backend installed.
+    Application logging below WARNING is muted unless quiet=False.
+    test_name overrides TEST['NAME'], e.g. to get an on-disk SQLite file.
+    """
+    test_settings = connection.settings_dict.setdefault("TEST", {})
+    old_test_name = test_settings.get("NAME")
+    if test_name is not None:
+        test_settings["NAME"] = test_name
+    setup_test_environment()
+    if quiet:
+        logging.disable(logging.INFO)
+    old_name = connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        test_settings["NAME"] = old_test_name
+        if quiet:
+            logging.disable(logging.NOTSET)
+        teardown_test_environment()
+
+
+class Timer:
+    """Collects per-operation latencies and the wall time of a phase."""
+
+    def __init__(self, label):
+        self.label = label
+        self.latencies = []
+        self.errors = 0
+        self.started = None
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started
+
+    @contextmanager
+    def op(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    @property
+    def count(self):
+        return len(self.latencies)
+
+    @property
+    def rate(self):
+        return self.count / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, pct):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        mean = statistics.mean(self.latencies) if self.latencies else 0.0
+        return (
+            f"{self.label:<28} {self.count:>7} ops  {self.errors:>5} errors  "
+            f"{self.elapsed:>8.3f}s  {self.rate:>9.1f}/s  "
+            f"mean {mean * 1000:>7.2f}ms  p50 {self.percentile(50) * 1000:>7.2f}ms  "
+            f"p95 {self.percentile(95) * 1000:>7.2f}ms"
+        )
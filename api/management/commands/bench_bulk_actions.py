@@ -0,0 +1,91 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import DailyRollup, Event, EventRegistration, Payment
+from api.services import registration_service, rollups
+
+from ._bench import isolated_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Rows per second of the registration/payment admin actions: row-by-row "
+        "model methods vs the set-based registration_service. Confirmation "
+        "emails are left out of the timings (template rendering dominates both)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        with isolated_database():
+            event = Event.objects.create(
+                id="BENCHEVENT", title="Sales Summit", start_date=datetime.date(2030, 1, 1), location="Nairobi",
+                participants_limit=rows * 2, description="Bench", investment_amount=1000, status="open",
+            )
+            for label, bulk in (("row by row", False), ("set-based", True)):
+                self._populate(event, rows)
+                registrations = EventRegistration.objects.filter(event=event)
+                payments = Payment.objects.filter(registration__event=event)
+
+                if bulk:
+                    confirm = registration_service.confirm_registrations(
+                        registrations.filter(pk__lte=self._half), notify=False,
+                    )
+                    complete = registration_service.mark_cash_payments_completed(payments, notify=False)
+                else:
+                    confirm = self._timed(lambda: [
+                        registration.confirm_registration() for registration in registrations.filter(pk__lte=self._half)
+                    ])
+                    complete = self._timed(lambda: [
+                        payment.mark_as_completed() for payment in payments.select_related("registration")
+                    ])
+
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                self.stdout.write(f"  confirm registrations     {self._line(confirm)}")
+                self.stdout.write(f"  complete cash payments    {self._line(complete)}")
+
+                state = sorted(registrations.values_list("registration_status", flat=True))
+                if state != ["confirmed"] * rows or payments.exclude(payment_status="completed").exists():
+                    raise CommandError(f"{label}: registrations/payments not all confirmed/completed")
+                expected = self._rollups()
+                rollups.rebuild()
+                if self._rollups() != expected:
+                    raise CommandError(f"{label}: dashboard rollups drifted from a full rebuild")
+            self.stdout.write(self.style.SUCCESS("Final states and rollups match"))
+
+    def _populate(self, event, rows):
+        EventRegistration.objects.all().delete()
+        DailyRollup.objects.all().delete()
+        EventRegistration.objects.bulk_create([
+            EventRegistration(event=event, full_name=f"Attendee {i}", email=f"attendee{i}@example.com", phone="0700000000")
+            for i in range(rows)
+        ])
+        first = EventRegistration.objects.order_by("pk").values_list("pk", flat=True)
+        self._half = first[rows // 2 - 1] if rows > 1 else first[0]
+        Payment.objects.bulk_create([
+            Payment(
+                registration=registration, amount=1000, currency="KES", payment_method="cash",
+                customer_email=registration.email, description=f"Event: {event.title}",
+                pesapal_merchant_reference=f"MBG-{registration.pk}",
+            )
+            for registration in EventRegistration.objects.filter(event=event)
+        ])
+        rollups.rebuild()
+
+    def _timed(self, work):
+        started = time.perf_counter()
+        updated = len(work())
+        elapsed = time.perf_counter() - started
+        return {"updated": updated, "elapsed": elapsed, "rows_per_second": updated / elapsed}
+
+    def _line(self, result):
+        return f"{result['updated']:>7} rows  {result['elapsed'] * 1000:>9.1f} ms  {result['rows_per_second']:>10,.0f} rows/s"
+
+    def _rollups(self):
+        return sorted(
+            DailyRollup.objects.values_list("date", "kind", "object_id", "currency", "registrations", "payments", "completed_payments", "revenue")
+        )
@@ -0,0 +1,142 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from api.models import Event, EventRegistration, Payment
+from api.services.pesapal_emulator import PesaPalEmulator
+from api.services import pesapal_service
+
+from ._bench import Timer, isolated_database
+
+
+class Command(BaseCommand):
+    help = (
+        "End-to-end checkout benchmark against the local PesaPal emulator: "
+        "registrations, payment initiations and IPNs per second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--registrations", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=1, help="Client threads per phase")
+        parser.add_argument("--latency-ms", type=float, default=0, help="Emulated PesaPal latency")
+        parser.add_argument("--jitter-ms", type=float, default=0)
+        parser.add_argument("--failure-rate", type=float, default=0.0, help="Emulated PesaPal failure rate")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--verbose-logs", action="store_true", help="Keep application INFO/DEBUG logging on")
+
+    def handle(self, *args, **options):
+        emulator = PesaPalEmulator(
+            latency_ms=options["latency_ms"],
+            jitter_ms=options["jitter_ms"],
+            failure_rate=options["failure_rate"],
+            seed=options["seed"],
+        )
+        pesapal_config = dict(settings.PESAPAL_CONFIG, BASE_URL=emulator.base_url)
+
+        with emulator, isolated_database(quiet=not options["verbose_logs"]), override_settings(
+            PESAPAL_CONFIG=pesapal_config,
+            PESAPAL_CONSUMER_KEY="bench-consumer-key",
+            PESAPAL_CONSUMER_SECRET="bench-consumer-secret",
+            # Every request comes from one test-client IP
+            RATE_LIMITS={**settings.RATE_LIMITS, "ENABLED": False},
+        ):
+            cache.delete_many([pesapal_service._TOKEN_CACHE_KEY, pesapal_service._IPN_ID_CACHE_KEY])
+            self.stdout.write(f"PesaPal emulator at {emulator.base_url}")
+            timers = self._run(options)
+
+        for timer in timers:
+            self.stdout.write(timer.summary())
+        self.stdout.write(f"Emulator request counts: {emulator.request_counts}")
+
+    def _run(self, options):
+        total = options["registrations"]
+        concurrency = max(1, options["concurrency"])
+        local = threading.local()
+
+        def client():
+            if not hasattr(local, "client"):
+                local.client = Client()
+            return local.client
+
+        event = Event.objects.create(
+            title="Benchmark Conference",
+            start_date=(timezone.now() + timedelta(days=30)).date(),
+            location="Nairobi",
+            participants_limit=total * 2,
+            description="Load-test event",
+            investment_amount=Decimal("2500.00"),
+            currency="KES",
+            is_free=False,
+            status="open",
+        )
+
+        def run_phase(label, items, call):
+            timer = Timer(label)
+
+            def one(item):
+                with timer.op():
+                    try:
+                        ok = call(item)
+                    except Exception:
+                        ok = False
+                if not ok:
+                    timer.errors += 1
+
+            with timer:
+                if concurrency == 1:
+                    for item in items:
+                        one(item)
+                else:
+                    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                        list(pool.map(one, items))
+            return timer
+
+        def register(i):
+            response = client().post(
+                f"/api/events/{event.id}/registrations/",
+                {
+                    "event": event.id,
+                    "full_name": f"Bench User {i}",
+                    "email": f"bench{i}@example.com",
+                    "phone": "0712345678",
+                    "company": "Bench Ltd",
+                    "job_title": "Tester",
+                },
+                content_type="application/json",
+            )
+            return response.status_code == 201
+
+        registrations = run_phase("registrations", range(total), register)
+
+        registration_ids = list(
+            EventRegistration.objects.filter(event=event).values_list("id", flat=True)
+        )
+
+        def initiate(registration_id):
+            response = client().post(f"/api/payments/initiate/{registration_id}/")
+            return response.status_code == 200
+
+        initiations = run_phase("payment initiations", registration_ids, initiate)
+
+        tracking_ids = list(
+            Payment.objects.filter(registration__event=event, pesapal_order_tracking_id__isnull=False)
+            .values_list("pesapal_order_tracking_id", flat=True)
+        )
+
+        def ipn(order_tracking_id):
+            response = client().post(
+                "/api/payments/pesapal-ipn/",
+                {"OrderTrackingId": order_tracking_id, "OrderNotificationType": "IPNCHANGE"},
+                content_type="application/json",
+            )
+            return response.status_code == 200
+
+        ipns = run_phase("IPNs", tracking_ids, ipn)
+        return [registrations, initiations, ipns]
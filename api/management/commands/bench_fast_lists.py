@@ -0,0 +1,99 @@
+import datetime
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from api.models import Event, GalleryCategory, Testimonial
+
+from ._bench import Timer, isolated_database
+
+ENDPOINTS = ("api-events-list", "testimonial-list", "category_list")
+
+
+def _variants(stem):
+    return {"files": [
+        {"width": width, "format": fmt, "name": f"{stem}_w{width}.0123456789ab.{ext}"}
+        for width in (320, 640) for fmt, ext in (("webp", "webp"), ("jpeg", "jpg"))
+    ]}
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that the .values() fast path of event_list, get_testimonials and category_list "
+        "returns byte-identical responses to the DRF serializers, then compare requests/s."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+        parser.add_argument("--requests", type=int, default=20)
+
+    def handle(self, *args, **options):
+        mismatches = 0
+        with isolated_database():
+            client = Client()
+            for rows in options["rows"]:
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{rows:,} rows per endpoint"))
+                self._populate(rows)
+                for name in ENDPOINTS:
+                    url = reverse(name)
+                    with override_settings(FAST_LIST_SERIALIZATION=False):
+                        drf = client.get(url)
+                    with override_settings(FAST_LIST_SERIALIZATION=True):
+                        fast = client.get(url)
+                    if drf.status_code != 200 or drf.content != fast.content:
+                        mismatches += 1
+                        self.stderr.write(self.style.ERROR(f"{url}: fast path output differs from DRF"))
+                        continue
+                    for label, flag in (("drf", False), ("values", True)):
+                        with override_settings(FAST_LIST_SERIALIZATION=flag), Timer(f"{url} {label}") as timer:
+                            for _ in range(options["requests"]):
+                                with timer.op():
+                                    client.get(url)
+                        self.stdout.write(timer.summary())
+        if mismatches:
+            raise CommandError(f"{mismatches} endpoint(s) failed the parity check")
+        self.stdout.write(self.style.SUCCESS("Parity check passed"))
+
+    def _populate(self, rows):
+        for model in (Event, Testimonial, GalleryCategory):
+            model.objects.all().delete()
+        today = datetime.date(2026, 1, 1)
+        statuses = [choice for choice, _ in Event.EVENT_STATUS_CHOICES]
+        categories = [choice for choice, _ in Event.CATEGORY_CHOICES] + [""]
+        Event.objects.bulk_create([
+            Event(
+                id=f"BENCH{i:05d}",
+                title=f"Event {i}",
+                subtitle="Sales mastery" if i % 2 else "",
+                tagline=f"Tagline – {i}",
+                category=categories[i % len(categories)],
+                start_date=today + datetime.timedelta(days=i % 365),
+                end_date=None if i % 3 else today + datetime.timedelta(days=i % 365 + 1),
+                start_time=datetime.time(9, 30) if i % 2 else None,
+                end_time=datetime.time(17, 0, 15) if i % 2 else None,
+                location="Nairobi",
+                participants_limit=50 + i % 100,
+                duration="2 days",
+                description="Lorem ipsum " * 20,
+                investment_amount=None if i % 5 == 0 else Decimal(f"{i % 90000}.5"),
+                is_free=i % 5 == 0,
+                status=statuses[i % len(statuses)],
+                registration_open=bool(i % 2),
+                image=f"events/event-{i}.0123456789ab.jpg" if i % 4 else "",
+                image_variants=_variants(f"events/event-{i}") if i % 8 == 1 else {},
+            )
+            for i in range(rows)
+        ], batch_size=500)
+        Testimonial.objects.bulk_create([
+            Testimonial(
+                author=f"Author {i}", company="Smart Sales", text="Great training " * 10,
+                logo=f"testimonials/logo {i}.0123456789ab.png",
+                image_variants=_variants(f"testimonials/logo {i}") if i % 2 else {},
+            )
+            for i in range(rows)
+        ], batch_size=500)
+        GalleryCategory.objects.bulk_create([
+            GalleryCategory(name=f"Category {i}", slug=f"category-{i}") for i in range(rows)
+        ], batch_size=500)
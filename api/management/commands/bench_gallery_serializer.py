@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework import serializers
+from rest_framework.request import Request
+
+from api.models import GalleryCategory, GalleryItem
+from api.serializers import GalleryItemSerializer
+
+from ._bench import Timer, isolated_database
+
+
+class LegacyGalleryItemSerializer(GalleryItemSerializer):
+    """The previous per-row URL building: build_absolute_uri(storage.url()) for every file."""
+
+    image = serializers.SerializerMethodField()
+
+    def get_image(self, obj):
+        request = self.context.get('request')
+        if obj.image:
+            return request.build_absolute_uri(obj.image.url)
+        return None
+
+    def get_image_srcset(self, obj):
+        storage = obj.image.storage
+        request = self.context.get('request')
+        files = (obj.image_variants or {}).get('files')
+        if not files:
+            return None
+        candidates = {}
+        for entry in sorted(files, key=lambda item: item['width']):
+            url = request.build_absolute_uri(storage.url(entry['name']))
+            candidates.setdefault(entry['format'], []).append(f"{url} {entry['width']}w")
+        return {fmt: ', '.join(items) for fmt, items in candidates.items()}
+
+
+class Command(BaseCommand):
+    help = "Time GalleryItemSerializer(many=True) on a gallery response: per-row vs per-request media URLs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            category = GalleryCategory.objects.create(name="Bench", slug="bench")
+            GalleryItem.objects.bulk_create([
+                GalleryItem(
+                    category=category,
+                    image=f"gallery/photo-{i}.0123456789ab.jpg",
+                    image_variants={"files": [
+                        {"width": width, "format": fmt, "name": f"gallery/photo-{i}_w{width}.0123456789ab.{ext}"}
+                        for width in (320, 640, 1280)
+                        for fmt, ext in (("webp", "webp"), ("jpeg", "jpg"))
+                    ]},
+                )
+                for i in range(options["items"])
+            ])
+            items = list(GalleryItem.objects.select_related("category"))
+            factory = RequestFactory()
+
+            results = {}
+            for label, serializer_class in (("legacy", LegacyGalleryItemSerializer), ("media base", GalleryItemSerializer)):
+                with Timer(f"{label} ({len(items)} items)") as timer:
+                    for _ in range(options["repeat"]):
+                        request = Request(factory.get("/api/gallery/", HTTP_HOST="api.smartsales.co.ke"))
+                        with timer.op():
+                            data = serializer_class(items, many=True, context={"request": request}).data
+                results[label] = data
+                self.stdout.write(timer.summary())
+
+            if results["legacy"] != results["media base"]:
+                self.stderr.write(self.style.ERROR("Output differs between legacy and media base serializers"))
+            else:
+                self.stdout.write(self.style.SUCCESS("Output identical"))
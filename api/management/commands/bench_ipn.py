@@ -0,0 +1,92 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models
+from django.utils import timezone
+
+from api.models import Event, EventRegistration, Payment
+
+from ._bench import Timer, isolated_database
+
+
+class SQLCounter:
+    """execute_wrapper counting statements and bytes of SQL sent."""
+
+    def __init__(self):
+        self.queries = 0
+        self.bytes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        self.bytes += len(sql) + sum(len(str(param)) for param in params or ())
+        return execute(sql, params, many, context)
+
+
+def legacy_complete(payment, transaction_id):
+    """The IPN completion path before the transition methods: two full-row saves."""
+    registration = payment.registration  # Payment.save() dereferenced it on every save
+    payment.payment_status = "completed"
+    payment.payment_completed_at = timezone.now()
+    payment.payment_method = "pesapal"
+    payment.pesapal_transaction_id = transaction_id
+    models.Model.save(payment)
+    registration.registration_status = "confirmed"
+    registration.save()
+
+
+class Command(BaseCommand):
+    help = (
+        "IPN completions per second, and SQL statements/bytes per IPN, for the "
+        "legacy full-row saves vs Payment.mark_as_completed (update_fields). "
+        "Each payment gets a first IPN and a repeat, as PesaPal retries them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--payments", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        count = options["payments"]
+        with isolated_database():
+            event = Event.objects.create(
+                id="BENCHEVENT", title="Sales Summit", start_date=datetime.date(2030, 1, 1), location="Nairobi",
+                participants_limit=count * 2, description="Bench", investment_amount=2500, status="open",
+            )
+            for label, legacy in (("legacy", True), ("update_fields", False)):
+                tracking_ids = self._populate(event, count)
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                for phase in ("first IPN", "repeat IPN"):
+                    sql = SQLCounter()
+                    with connection.execute_wrapper(sql), Timer(phase) as timer:
+                        for tracking_id in tracking_ids:
+                            with timer.op():
+                                if legacy:
+                                    payment = Payment.objects.get(pesapal_order_tracking_id=tracking_id)
+                                    legacy_complete(payment, f"TX-{tracking_id}")
+                                else:
+                                    # As pesapal_ipn looks it up now, registration joined
+                                    payment = Payment.objects.select_related("registration").get(
+                                        pesapal_order_tracking_id=tracking_id
+                                    )
+                                    payment.mark_as_completed(transaction_id=f"TX-{tracking_id}", payment_method="pesapal")
+                    self.stdout.write(
+                        f"{timer.summary()}  {sql.queries / count:>5.1f} queries  {sql.bytes / count:>7.0f} SQL bytes per IPN"
+                    )
+                if EventRegistration.objects.exclude(registration_status="confirmed").exists():
+                    raise CommandError(f"{label}: not every registration was confirmed")
+
+    def _populate(self, event, count):
+        EventRegistration.objects.all().delete()
+        registrations = EventRegistration.objects.bulk_create([
+            EventRegistration(event=event, full_name=f"Attendee {i}", email=f"attendee{i}@example.com", phone="0700000000")
+            for i in range(count)
+        ])
+        Payment.objects.bulk_create([
+            Payment(
+                registration=registration, amount=2500, currency="KES", payment_method="pesapal",
+                payment_status="initiated", customer_email=registration.email, customer_phone=registration.phone,
+                description=f"Event: {event.title}", pesapal_merchant_reference=f"MBG-{registration.pk}",
+                pesapal_order_tracking_id=f"TRACK-{i:06d}",
+            )
+            for i, registration in enumerate(EventRegistration.objects.order_by("pk"))
+        ])
+        return [f"TRACK-{i:06d}" for i in range(len(registrations))]
@@ -0,0 +1,79 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.models import Event, EventRegistration, Payment
+from api.serializers import EventSerializer, PaymentSerializer
+
+from ._bench import Timer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare FastJSONRenderer with DRF's JSONRenderer on the largest list payloads "
+        "(events, payments, raw values() rows); checks the bytes are identical."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed: FastJSONRenderer uses stdlib json"))
+        payloads = self._payloads(options["rows"])
+        stdlib, fast = JSONRenderer(), renderers.FastJSONRenderer()
+
+        for name, data in payloads.items():
+            expected = stdlib.render(data)
+            if fast.render(data) != expected:
+                raise CommandError(f"{name}: FastJSONRenderer output differs from JSONRenderer")
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name}: {len(data):,} rows, {len(expected) / 1024:,.0f} KiB"))
+            for label, renderer in (("JSONRenderer", stdlib), ("FastJSONRenderer", fast)):
+                with Timer(label) as timer:
+                    for _ in range(options["repeat"]):
+                        with timer.op():
+                            renderer.render(data)
+                self.stdout.write(timer.summary())
+        self.stdout.write(self.style.SUCCESS("Output identical"))
+
+    def _payloads(self, rows):
+        now = timezone.now()
+        events = [
+            Event(
+                id=f"BENCH{i:05d}", title=f"Event {i} \u2028 – Nairobi", category="popular",
+                start_date=datetime.date(2026, 1, 1) + datetime.timedelta(days=i % 365),
+                start_time=datetime.time(9, 30), location="Nairobi", participants_limit=100,
+                description="Lorem ipsum " * 20, investment_amount=Decimal(f"{i}.50"),
+                status="open", image=f"events/event-{i}.0123456789ab.jpg",
+            )
+            for i in range(rows)
+        ]
+        payments = []
+        for i, event in enumerate(events):
+            registration = EventRegistration(event=event, full_name=f"Attendee {i}", email=f"a{i}@example.com")
+            payments.append(Payment(
+                id=uuid.uuid4(), registration=registration, amount=Decimal(f"{i}.50"),
+                payment_method="pesapal", payment_status="completed",
+                pesapal_order_tracking_id=str(uuid.uuid4()),
+                payment_initiated_at=now, payment_completed_at=now, created_at=now,
+            ))
+        raw = [
+            {
+                "id": uuid.uuid4(), "amount": Decimal(f"{i}.50"), "created_at": now - datetime.timedelta(seconds=i),
+                "date": datetime.date(2026, 1, 1), "time": datetime.time(9, 30, 15, 123456),
+                "label": gettext_lazy("Completed"), "count": i, "ratio": i / 7,
+            }
+            for i in range(rows)
+        ]
+        return {
+            "events": EventSerializer(events, many=True).data,
+            "payments": PaymentSerializer(payments, many=True).data,
+            "raw values": raw,
+        }
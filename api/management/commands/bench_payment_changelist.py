@@ -0,0 +1,107 @@
+import datetime
+import math
+from decimal import Decimal
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test import Client
+
+from api.models import Event, EventRegistration, Payment
+
+from ._bench import Timer, isolated_database
+
+SCENARIOS = [
+    ("first page", ""),
+    ("status filter", "?payment_status__exact=completed"),
+    ("email search", "?q=attendee4242%40example.com"),
+    ("name search", "?q=Attendee+4242"),
+]
+
+
+class QueryCounter:
+    """execute_wrapper counting the queries a request runs."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = "Render time and query count of the Payment admin changelist at 100k payments, legacy vs tuned admin."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--payments", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            self._populate(options["payments"])
+            user = get_user_model().objects.create_superuser("bench", "bench@example.com", "bench")
+            client = Client()
+            client.force_login(user)
+            model_admin = admin.site._registry[Payment]
+            # The deepest page: the most expensive OFFSET for this many payments
+            last_page = max(1, math.ceil(Payment.objects.count() / model_admin.list_per_page))
+            scenarios = [SCENARIOS[0], (f"last page ({last_page})", f"?p={last_page}"), *SCENARIOS[1:]]
+
+            for label, legacy in (("legacy", True), ("tuned", False)):
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                if legacy:
+                    # The admin as it was: default paginator, full count, per-row relation queries
+                    model_admin.paginator = Paginator
+                    model_admin.show_full_result_count = True
+                    model_admin.get_queryset = lambda request: admin.ModelAdmin.get_queryset(model_admin, request)
+                    model_admin.get_search_results = lambda request, queryset, term: admin.ModelAdmin.get_search_results(
+                        model_admin, request, queryset, term
+                    )
+                try:
+                    for name, query in scenarios:
+                        url = f"/admin/api/payment/{query}"
+                        queries = QueryCounter()
+                        with connection.execute_wrapper(queries):
+                            response = client.get(url)
+                        assert response.status_code == 200, response.status_code
+                        with Timer(name) as timer:
+                            for _ in range(options["repeat"]):
+                                with timer.op():
+                                    client.get(url)
+                        self.stdout.write(f"{timer.summary()}  {queries.count:>4} queries")
+                finally:
+                    for attribute in ("paginator", "show_full_result_count", "get_queryset", "get_search_results"):
+                        model_admin.__dict__.pop(attribute, None)
+
+    def _populate(self, count):
+        events = Event.objects.bulk_create([
+            Event(
+                id=f"BENCH{i:05d}", title=f"Sales Summit {i}", start_date=datetime.date(2026, 1, 1),
+                location="Nairobi", participants_limit=1000, description="Lorem ipsum " * 50,
+                investment_amount=Decimal("5000.00"), status="open",
+            )
+            for i in range(max(1, count // 100))
+        ])
+        statuses = [choice for choice, _ in Payment.PAYMENT_STATUS_CHOICES]
+        for start in range(0, count, 10_000):
+            registrations = EventRegistration.objects.bulk_create([
+                EventRegistration(
+                    event=events[i % len(events)], full_name=f"Attendee {i}", email=f"attendee{i}@example.com",
+                    phone="0700000000", company="Acme", job_title="Sales",
+                )
+                for i in range(start, min(start + 10_000, count))
+            ])
+            Payment.objects.bulk_create([
+                Payment(
+                    registration=registration, amount=Decimal("5000.00"), currency="KES",
+                    payment_method="pesapal", payment_status=statuses[i % len(statuses)],
+                    customer_email=registration.email, customer_phone=registration.phone,
+                    description=f"Event: {registration.event.title}",
+                    pesapal_merchant_reference=f"MBG-{registration.pk}",
+                )
+                for i, registration in enumerate(registrations, start)
+            ], batch_size=2000)
+        connection.cursor().execute("ANALYZE")
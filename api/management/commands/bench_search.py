@@ -0,0 +1,70 @@
+import itertools
+import random
+
+from django.core.management.base import BaseCommand
+
+from api.models import SearchDocument
+from api.services import search
+
+from ._bench import Timer, isolated_database
+
+COMMON = [
+    "sales", "training", "leadership", "negotiation", "customer", "team", "strategy", "growth",
+    "marketing", "coaching", "retail", "pipeline", "closing", "prospecting", "mindset", "service",
+]
+LOCATIONS = ["Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret", "Online"]
+QUERIES = ["negotiation", "sales leadership", "neg", "le", "nairobi closing", "prospecting mindset team", "zzqx"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Latency of /api/search/ queries (FTS5 on SQLite, tsvector on Postgres) over a synthetic "
+        "Zipf-distributed corpus of event/program-sized documents."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--documents", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--baseline", action="store_true", help="Also time the icontains fallback")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        # Zipf-distributed vocabulary, with the domain words spread over ranks 100-1600
+        vocabulary = [self._word(rng) for _ in range(20_000)]
+        for position, word in enumerate(COMMON):
+            vocabulary.insert(100 + position * 100, word)
+        cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+        def text(words):
+            return " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=words))
+
+        with isolated_database():
+            with Timer("index documents") as timer:
+                for start in range(0, options["documents"], 5000):
+                    SearchDocument.objects.bulk_create([
+                        SearchDocument(
+                            kind="event" if i % 3 else "program", object_id=f"B{i:09d}",
+                            title=text(6).title(), summary=text(12), body=text(120),
+                            location=rng.choice(LOCATIONS),
+                        )
+                        for i in range(start, min(start + 5000, options["documents"]))
+                    ], batch_size=1000)
+                    timer.latencies.append(0)
+            self.stdout.write(f"Indexed {options['documents']:,} documents in {timer.elapsed:.1f}s")
+
+            modes = [("ranked", search.search)]
+            if options["baseline"]:
+                modes.append(("icontains", lambda q, limit: search._search_basic(search.terms(q), None, limit)))
+            for mode, run in modes:
+                self.stdout.write(self.style.MIGRATE_HEADING(mode))
+                for query in QUERIES:
+                    repeat = options["repeat"] if mode == "ranked" else max(1, options["repeat"] // 10)
+                    with Timer(f"{query!r}") as timer:
+                        for _ in range(repeat):
+                            with timer.op():
+                                results = run(query, limit=20)
+                    self.stdout.write(f"{timer.summary()}  hits {len(results)}")
+
+    def _word(self, rng):
+        return "".join(rng.choice("abcdefghijklmnoprstuvw") for _ in range(rng.randint(4, 10)))
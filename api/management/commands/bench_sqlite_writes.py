@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test import override_settings
+from django.utils import timezone
+
+from api.models import Event, EventRegistration, Payment
+
+from ._bench import Timer, isolated_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrent registration inserts and IPN-style updates against an on-disk "
+        "SQLite database, with and without SQLITE_PRAGMAS / IMMEDIATE transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--per-writer", type=int, default=100, help="Registrations per writer thread")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("bench_sqlite_writes only applies to the SQLite backend.")
+
+        workdir = tempfile.mkdtemp(prefix="mbg-sqlite-bench-")
+        try:
+            for label, tuned in (("before (bare sqlite3)", False), ("after (tuned)", True)):
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                for timer in self._run_mode(os.path.join(workdir, f"bench-{int(tuned)}.sqlite3"), tuned, options):
+                    self.stdout.write(timer.summary())
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _run_mode(self, path, tuned, options):
+        db_options = connection.settings_dict.setdefault("OPTIONS", {})
+        old_mode = db_options.get("transaction_mode")
+        if tuned:
+            db_options["transaction_mode"] = "IMMEDIATE"
+            pragma_override = {}
+        else:
+            db_options.pop("transaction_mode", None)
+            pragma_override = {"SQLITE_PRAGMAS": {}}
+
+        try:
+            with override_settings(**pragma_override), isolated_database(test_name=path):
+                # Make sure the migration connection does not hold the file open.
+                connection.close()
+                return self._run_threads(options)
+        finally:
+            if old_mode is None:
+                db_options.pop("transaction_mode", None)
+            else:
+                db_options["transaction_mode"] = old_mode
+
+    def _run_threads(self, options):
+        event = Event.objects.create(
+            title="Write Benchmark",
+            start_date=(timezone.now() + timedelta(days=10)).date(),
+            location="Nairobi",
+            participants_limit=1_000_000,
+            description="",
+            investment_amount=Decimal("1000.00"),
+            is_free=False,
+            status="open",
+        )
+        connection.close()
+
+        writes = Timer("registration + payment")
+        updates = Timer("IPN status update")
+        reads = Timer("event list read")
+        done = threading.Event()
+        lock = threading.Lock()
+
+        def count_error(timer):
+            with lock:
+                timer.errors += 1
+
+        def writer(worker):
+            try:
+                for i in range(options["per_writer"]):
+                    try:
+                        with writes.op(), transaction.atomic():
+                            registration = EventRegistration.objects.create(
+                                event_id=event.id,
+                                full_name=f"Writer {worker}-{i}",
+                                email=f"w{worker}-{i}@example.com",
+                                phone="0712345678",
+                                company="Bench",
+                                job_title="Tester",
+                            )
+                            payment = Payment.objects.create(
+                                registration=registration,
+                                amount=Decimal("1000.00"),
+                                payment_method="pesapal",
+                                customer_email=registration.email,
+                            )
+                    except OperationalError:
+                        count_error(writes)
+                        continue
+                    try:
+                        with updates.op():
+                            Payment.objects.filter(pk=payment.pk).update(
+                                payment_status="completed", payment_completed_at=timezone.now()
+                            )
+                    except OperationalError:
+                        count_error(updates)
+            finally:
+                connections.close_all()
+
+        def reader():
+            try:
+                while not done.is_set():
+                    try:
+                        with reads.op():
+                            list(Event.objects.all())
+                            EventRegistration.objects.filter(event_id=event.id).count()
+                    except OperationalError:
+                        count_error(reads)
+            finally:
+                connections.close_all()
+
+        writer_threads = [threading.Thread(target=writer, args=(n,)) for n in range(options["writers"])]
+        reader_threads = [threading.Thread(target=reader) for _ in range(options["readers"])]
+
+        with writes, updates, reads:
+            for thread in reader_threads + writer_threads:
+                thread.start()
+            for thread in writer_threads:
+                thread.join()
+            done.set()
+            for thread in reader_threads:
+                thread.join()
+
+        return [writes, updates, reads]
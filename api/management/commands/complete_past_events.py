@@ -0,0 +1,27 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services import upcoming_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Mark events that ended before today (Africa/Nairobi) as completed and close their "
+        "registration, in one UPDATE. Schedule it just after midnight, e.g. cron `5 0 * * *`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Treat this date (YYYY-MM-DD) as today")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the events that would change")
+
+    def handle(self, *args, **options):
+        day = None
+        if options["date"]:
+            try:
+                day = datetime.date.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError("--date must be YYYY-MM-DD")
+        count = upcoming_events.complete_past_events(day, dry_run=options["dry_run"])
+        verb = "would be" if options["dry_run"] else "were"
+        self.stdout.write(self.style.SUCCESS(f"{count} past events {verb} marked completed"))
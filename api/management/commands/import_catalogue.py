@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services import catalogue_import
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update events, programs and program features from a CSV or XLSX file. "
+        "Each row's kind comes from a `kind` column (event, program, feature), else its "
+        "sheet name (Events, Programs, Features), else --kind. Rows with an `id` update "
+        "that event/program; features name their program by id or title. Invalid rows "
+        "are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (UTF-8) or .xlsx file")
+        parser.add_argument("--kind", choices=catalogue_import.KINDS, help="Kind of rows without a kind column or sheet name")
+        parser.add_argument("--chunk-size", type=int, default=catalogue_import.CHUNK_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Validate and report, then roll back")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], "rb") as fileobj:
+                report = catalogue_import.import_file(
+                    fileobj, options["path"], kind=options["kind"],
+                    chunk_size=options["chunk_size"], dry_run=options["dry_run"],
+                )
+        except OSError as exc:
+            raise CommandError(f"Can't read {options['path']}: {exc}")
+        except catalogue_import.ImportFileError as exc:
+            raise CommandError(str(exc))
+
+        for location, message in report.errors:
+            self.stderr.write(f"{location}: {message}")
+        style = self.style.WARNING if report.errors else self.style.SUCCESS
+        self.stdout.write(style(report.summary()))
@@ -0,0 +1,138 @@
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services import image_derivatives
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate pending image variants for TeamMember, GalleryItem, Testimonial and Event "
+        "in a process pool. Images whose variants were rendered from the same file with the "
+        "current settings, or that already failed, are skipped without being read."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--models", nargs="+", choices=sorted(image_derivatives.IMAGE_FIELDS),
+            default=sorted(image_derivatives.IMAGE_FIELDS),
+        )
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Re-render every image, e.g. after variant files were deleted from storage, and retry failed ones",
+        )
+        parser.add_argument(
+            "--watch", type=float, default=0,
+            help="Keep running, polling for new uploads every N seconds",
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        if options["watch"] < 0:
+            raise CommandError("--watch cannot be negative")
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while True:
+                stats = self._run_once(pool, workers, options)
+                if stats["processed"] or stats["failed"] or not options["watch"]:
+                    self._report(stats, workers)
+                if not options["watch"]:
+                    break
+                time.sleep(options["watch"])
+
+    def _candidates(self, model_names):
+        for model_name in model_names:
+            model = apps.get_model("api", model_name)
+            field_name = image_derivatives.IMAGE_FIELDS[model_name]
+            pks = list(
+                model.objects.exclude(**{field_name: ""})
+                .exclude(**{f"{field_name}__isnull": True})
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+            # Chunked re-fetch rather than iterator(): rows are updated while we go
+            for start in range(0, len(pks), 200):
+                chunk = pks[start:start + 200]
+                yield from model.objects.filter(pk__in=chunk).only("pk", field_name, "image_variants").order_by("pk")
+
+    def _run_once(self, pool, workers, options):
+        config = image_derivatives.get_config()
+        fingerprint = image_derivatives.config_fingerprint(config)
+        stats = {"processed": 0, "skipped": 0, "failed": 0, "elapsed": 0.0}
+        in_flight = {}
+        started = time.perf_counter()
+
+        def collect(futures):
+            for future in futures:
+                instance, source_name, digest = in_flight.pop(future)
+                try:
+                    image_derivatives.store_derivatives(instance, source_name, digest, future.result())
+                    stats["processed"] += 1
+                except Exception as exc:
+                    stats["failed"] += 1
+                    logger.exception("Image variants failed for %s %s", type(instance).__name__, instance.pk)
+                    image_derivatives.mark_failed(instance, source_name, digest, f"render: {exc}")
+
+        for instance in self._candidates(options["models"]):
+            # Uploads are stored under content-hashed names, so an unchanged name
+            # means unchanged content: skip it without opening or hashing the
+            # file, including sources already recorded as failed
+            variants = instance.image_variants or {}
+            if (
+                not options["force"]
+                and not image_derivatives.needs_derivatives(instance)
+                and (variants.get("failed") or variants.get("config") == fingerprint)
+            ):
+                stats["skipped"] += 1
+                continue
+
+            field = getattr(instance, image_derivatives.image_field_name(instance))
+            try:
+                with field.open("rb") as source:
+                    data = source.read()
+            except Exception as exc:
+                stats["failed"] += 1
+                logger.exception("Cannot read %s for %s %s", field.name, type(instance).__name__, instance.pk)
+                image_derivatives.mark_failed(instance, field.name, None, f"read: {exc}")
+                continue
+
+            digest = image_derivatives.content_hash(data)
+            if not options["force"] and image_derivatives.is_current(instance, digest):
+                if (instance.image_variants or {}).get("source") != field.name:
+                    image_derivatives.mark_source(instance, field.name)
+                stats["skipped"] += 1
+                continue
+
+            # Bound the number of source images held in memory at once
+            while len(in_flight) >= workers * 2:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+
+            future = pool.submit(
+                image_derivatives.render_derivatives, data, config["WIDTHS"], config["FORMATS"], config["QUALITY"]
+            )
+            in_flight[future] = (instance, field.name, digest)
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            collect(done)
+
+        stats["elapsed"] = time.perf_counter() - started
+        return stats
+
+    def _report(self, stats, workers):
+        elapsed = stats["elapsed"] or 1e-9
+        rate = stats["processed"] / elapsed
+        cores = min(workers, os.cpu_count() or 1)
+        self.stdout.write(
+            f"processed={stats['processed']} skipped={stats['skipped']} failed={stats['failed']} "
+            f"in {stats['elapsed']:.2f}s: {rate:.2f} images/s, {rate / cores:.2f} images/s per core "
+            f"({workers} workers on {cores} cores)"
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api import idempotency
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete stored Idempotency-Key responses older than settings.IDEMPOTENCY_KEY_TTL. "
+        "Schedule it daily, e.g. cron `15 0 * * *`."
+    )
+
+    def handle(self, *args, **options):
+        count = idempotency.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} expired idempotency keys"))
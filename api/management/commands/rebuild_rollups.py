@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.services import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the sales dashboard rollups (DailyRollup) from all registrations and payments."
+
+    def handle(self, *args, **options):
+        count = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} daily rollup rows"))
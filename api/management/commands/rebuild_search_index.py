@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.services import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the /api/search/ index (SearchDocument + FTS5 table or tsvectors) from all Events and Programs."
+
+    def handle(self, *args, **options):
+        count = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} documents"))
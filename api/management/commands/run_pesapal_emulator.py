@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from api.services.pesapal_emulator import PesaPalEmulator, STATUS_COMPLETED
+
+
+class Command(BaseCommand):
+    help = "Run a local PesaPal v3 stand-in. Point PESAPAL_BASE_URL at the printed URL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every response")
+        parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra delay, 0..jitter")
+        parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+        parser.add_argument(
+            "--completion-status", type=int, default=STATUS_COMPLETED, choices=[0, 1, 2, 3],
+            help="status_code reported for orders (0 invalid, 1 completed, 2 failed, 3 reversed)",
+        )
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        emulator = PesaPalEmulator(
+            host=options["host"],
+            port=options["port"],
+            latency_ms=options["latency_ms"],
+            jitter_ms=options["jitter_ms"],
+            failure_rate=options["failure_rate"],
+            completion_status=options["completion_status"],
+            seed=options["seed"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"PesaPal emulator running at {emulator.base_url}"))
+        self.stdout.write(f"export PESAPAL_BASE_URL={emulator.base_url}")
+        try:
+            emulator.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            emulator.server.server_close()
@@ -0,0 +1,114 @@
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the test suite against SQLite and, when PostgreSQL binaries are available, "
+        "against a throwaway local Postgres cluster spawned in a temp directory (no Docker)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("test_labels", nargs="*", help="Forwarded to `manage.py test`")
+        parser.add_argument("--skip-sqlite", action="store_true")
+        parser.add_argument("--skip-postgres", action="store_true")
+        parser.add_argument(
+            "--pg-bin", default=os.getenv("PG_BIN", ""),
+            help="Directory holding initdb/pg_ctl (defaults to PG_BIN or PATH)",
+        )
+        parser.add_argument(
+            "--require-postgres", action="store_true",
+            help="Fail instead of skipping when no Postgres binaries are found",
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        if not options["skip_sqlite"]:
+            results["sqlite"] = self._run_tests("sqlite", {"DB_ENGINE": "sqlite"}, options["test_labels"])
+
+        if not options["skip_postgres"]:
+            initdb = self._find_binary("initdb", options["pg_bin"])
+            pg_ctl = self._find_binary("pg_ctl", options["pg_bin"])
+            if initdb and pg_ctl:
+                results["postgres"] = self._run_postgres(initdb, pg_ctl, options["test_labels"])
+            elif options["require_postgres"]:
+                raise CommandError("initdb/pg_ctl not found; set PG_BIN or add them to PATH.")
+            else:
+                self.stdout.write(self.style.WARNING("Postgres binaries not found; skipping Postgres run."))
+
+        for backend, ok in results.items():
+            style = self.style.SUCCESS if ok else self.style.ERROR
+            self.stdout.write(style(f"{backend}: {'passed' if ok else 'FAILED'}"))
+        if not all(results.values()):
+            raise CommandError("Test run failed on at least one backend.")
+
+    def _find_binary(self, name, pg_bin):
+        if pg_bin:
+            candidate = os.path.join(pg_bin, name)
+            return candidate if os.access(candidate, os.X_OK) else None
+        return shutil.which(name)
+
+    def _run_tests(self, label, env_overrides, test_labels):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Running tests on {label}"))
+        env = dict(os.environ, **env_overrides)
+        manage = os.path.join(settings.BASE_DIR, "manage.py")
+        completed = subprocess.run([sys.executable, manage, "test", "--noinput", *test_labels], env=env)
+        return completed.returncode == 0
+
+    def _run_postgres(self, initdb, pg_ctl, test_labels):
+        workdir = tempfile.mkdtemp(prefix="mbg-pg-")
+        data_dir = os.path.join(workdir, "data")
+        port = _free_port()
+        started = False
+        try:
+            subprocess.run(
+                [initdb, "-D", data_dir, "-A", "trust", "-U", "postgres", "-E", "UTF8", "--no-locale"],
+                check=True, stdout=subprocess.DEVNULL,
+            )
+            subprocess.run(
+                [
+                    pg_ctl, "-D", data_dir, "-l", os.path.join(workdir, "postgres.log"), "-w",
+                    "-o", f"-p {port} -k {workdir} -c listen_addresses=''", "start",
+                ],
+                check=True, stdout=subprocess.DEVNULL,
+            )
+            started = True
+            env = {
+                "DB_ENGINE": "postgres",
+                "DB_NAME": "postgres",
+                "DB_USER": "postgres",
+                "DB_PASSWORD": "",
+                "DB_HOST": workdir,  # a directory means a unix socket for libpq
+                "DB_PORT": str(port),
+            }
+            migrated = self._migrate_fresh(env)
+            return self._run_tests(f"postgres (port {port})", env, test_labels) and migrated
+        except subprocess.CalledProcessError as exc:
+            self.stderr.write(f"Could not start a local Postgres cluster: {exc}")
+            return False
+        finally:
+            if started:
+                subprocess.run([pg_ctl, "-D", data_dir, "-m", "fast", "-w", "stop"], stdout=subprocess.DEVNULL)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _migrate_fresh(self, env_overrides):
+        """Apply every migration to an empty database, as a deploy would."""
+        self.stdout.write(self.style.MIGRATE_HEADING("Applying migrations to a fresh Postgres database"))
+        manage = os.path.join(settings.BASE_DIR, "manage.py")
+        completed = subprocess.run(
+            [sys.executable, manage, "migrate", "--noinput"], env=dict(os.environ, **env_overrides)
+        )
+        return completed.returncode == 0
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
@@ -0,0 +1,58 @@
+import mimetypes
+import posixpath
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+from .storage import is_hashed_name
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def _safe_path(path):
+    normalized = posixpath.normpath(path).lstrip("/")
+    if normalized in ("", ".") or normalized.startswith("..") or "\x00" in normalized:
+        raise Http404("Invalid media path")
+    return normalized
+
+
+def serve_media(request, path):
+    """
+    Serve a file from MEDIA_ROOT according to MEDIA_SERVE["MODE"]:
+
+    - "x-accel-redirect": empty response with an X-Accel-Redirect header so
+      nginx streams the file from an `internal` location;
+    - "x-sendfile": same idea for Apache mod_xsendfile / lighttpd;
+    - "django": django.views.static.serve, for development only.
+
+    Content-hashed names (ContentHashedStorage) never change content, so
+    they are cached for a year with `immutable`; other names get a short max-age.
+    """
+    config = settings.MEDIA_SERVE
+    path = _safe_path(path)
+    mode = config["MODE"]
+
+    if mode == "x-accel-redirect":
+        response = HttpResponse()
+        response["X-Accel-Redirect"] = config["ACCEL_REDIRECT_PREFIX"].rstrip("/") + "/" + quote(path)
+    elif mode == "x-sendfile":
+        response = HttpResponse()
+        response["X-Sendfile"] = str(settings.MEDIA_ROOT / path)
+    else:
+        response = serve(request, path, document_root=settings.MEDIA_ROOT)
+
+    if mode in ("x-accel-redirect", "x-sendfile"):
+        # Let the front-end server send the body; keep the right type on the response
+        content_type, encoding = mimetypes.guess_type(path)
+        response["Content-Type"] = content_type or "application/octet-stream"
+        if encoding:
+            response["Content-Encoding"] = encoding
+
+    if is_hashed_name(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=config["MAX_AGE"])
+    return response
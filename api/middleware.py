@@ -0,0 +1,118 @@
+import gzip
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+_DEFAULTS = {
+    "MIN_SIZE": 1024,
+    "CONTENT_TYPES": ["application/json"],
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 5,
+    "CACHE": False,
+    "CACHE_ALIAS": "default",
+    "CACHE_TIMEOUT": 300,
+    "CACHE_MAX_SIZE": 2 * 1024 * 1024,
+}
+
+
+def _accepted_encodings(header):
+    """Codings from an Accept-Encoding header that the client didn't refuse with q=0."""
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    Brotli (when installed) or gzip compression for JSON responses above
+    RESPONSE_COMPRESSION["MIN_SIZE"] bytes. Small or already encoded
+    responses, streaming responses and other content types pass through.
+    HTML is left alone: admin pages carry CSRF tokens next to reflected
+    input, which compression would expose to BREACH.
+
+    With RESPONSE_COMPRESSION["CACHE"] on, compressed GET bodies are stored in
+    the cache keyed by a digest of the uncompressed body, so an unchanged
+    catalogue response is compressed once rather than on every request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = {**_DEFAULTS, **getattr(settings, "RESPONSE_COMPRESSION", {})}
+        self.content_types = set(self.config["CONTENT_TYPES"])
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding") or response.status_code == 206:
+            return response
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type not in self.content_types or len(response.content) < self.config["MIN_SIZE"]:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        accepted = _accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            return response
+
+        compressed = self._compressed(request, response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # The representation changed, so a strong ETag no longer applies
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
+
+    def _compress(self, content, encoding):
+        if encoding == "br":
+            return brotli.compress(content, quality=self.config["BROTLI_QUALITY"])
+        return gzip.compress(content, compresslevel=self.config["GZIP_LEVEL"], mtime=0)
+
+    def _compressed(self, request, content, encoding):
+        if not self.config["CACHE"] or request.method not in ("GET", "HEAD") or len(content) > self.config["CACHE_MAX_SIZE"]:
+            return self._compress(content, encoding)
+
+        # A cache outage only costs the compression, never the response
+        cache = caches[self.config["CACHE_ALIAS"]]
+        key = f"compressed:{encoding}:{hashlib.sha256(content).hexdigest()}"
+        try:
+            compressed = cache.get(key)
+        except Exception:
+            logger.warning("Could not read cached compressed response for %s", request.path, exc_info=True)
+            return self._compress(content, encoding)
+        if compressed is None:
+            compressed = self._compress(content, encoding)
+            try:
+                cache.set(key, compressed, self.config["CACHE_TIMEOUT"])
+            except Exception:
+                logger.warning("Could not cache compressed response for %s", request.path, exc_info=True)
+        return compressed
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:56
+
+import api.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_programpayment'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='id',
+            field=models.CharField(default=api.models.generate_unique_id, editable=False, max_length=10, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='program',
+            name='id',
+            field=models.CharField(default=api.models.generate_unique_id, editable=False, max_length=10, primary_key=True, serialize=False),
+        ),
+    ]
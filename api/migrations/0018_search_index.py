@@ -0,0 +1,135 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:09
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE api_search_fts USING fts5(
+        title, summary, body, location, kind,
+        content='api_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='3'
+    )
+    """,
+    """
+    CREATE TRIGGER api_search_fts_insert AFTER INSERT ON api_searchdocument BEGIN
+        INSERT INTO api_search_fts(rowid, title, summary, body, location, kind)
+        VALUES (new.id, new.title, new.summary, new.body, new.location, new.kind);
+    END
+    """,
+    """
+    CREATE TRIGGER api_search_fts_delete AFTER DELETE ON api_searchdocument BEGIN
+        INSERT INTO api_search_fts(api_search_fts, rowid, title, summary, body, location, kind)
+        VALUES ('delete', old.id, old.title, old.summary, old.body, old.location, old.kind);
+    END
+    """,
+    """
+    CREATE TRIGGER api_search_fts_update AFTER UPDATE OF title, summary, body, location, kind ON api_searchdocument BEGIN
+        INSERT INTO api_search_fts(api_search_fts, rowid, title, summary, body, location, kind)
+        VALUES ('delete', old.id, old.title, old.summary, old.body, old.location, old.kind);
+        INSERT INTO api_search_fts(rowid, title, summary, body, location, kind)
+        VALUES (new.id, new.title, new.summary, new.body, new.location, new.kind);
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS api_search_fts_update",
+    "DROP TRIGGER IF EXISTS api_search_fts_delete",
+    "DROP TRIGGER IF EXISTS api_search_fts_insert",
+    "DROP TABLE IF EXISTS api_search_fts",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE INDEX api_searchdocument_vector_gin ON api_searchdocument USING gin (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS api_searchdocument_vector_gin",
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    """FTS5 table + sync triggers on SQLite, GIN index on Postgres; other backends use icontains."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return
+        _run(schema_editor, SQLITE_FORWARD)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_BACKWARD)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_BACKWARD)
+
+
+def populate_search_documents(apps, schema_editor):
+    Event = apps.get_model('api', 'Event')
+    Program = apps.get_model('api', 'Program')
+    SearchDocument = apps.get_model('api', 'SearchDocument')
+
+    documents = [
+        SearchDocument(
+            kind='event', object_id=event['id'], title=event['title'],
+            summary=' '.join(filter(None, [event['subtitle'], event['tagline']])),
+            body=event['description'], location=event['location'],
+        )
+        for event in Event.objects.values('id', 'title', 'subtitle', 'tagline', 'description', 'location')
+    ]
+    documents += [
+        SearchDocument(
+            kind='program', object_id=program['id'], title=program['title'], summary=program['focus'],
+            body='\n'.join(filter(None, [program['description'], program['outcome'], program['skills']])),
+        )
+        for program in Program.objects.values('id', 'title', 'description', 'focus', 'outcome', 'skills')
+    ]
+    SearchDocument.objects.bulk_create(documents, batch_size=500)
+
+    if schema_editor.connection.vendor == 'postgresql':
+        SearchDocument.objects.update(search_vector=(
+            SearchVector('title', weight='A', config='english')
+            + SearchVector('summary', weight='B', config='english')
+            + SearchVector('location', weight='C', config='english')
+            + SearchVector('body', weight='D', config='english')
+        ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('event', 'Event'), ('program', 'Program')], max_length=10)),
+                ('object_id', models.CharField(max_length=10)),
+                ('title', models.CharField(max_length=200)),
+                ('summary', models.TextField(blank=True, default='')),
+                ('body', models.TextField(blank=True, default='')),
+                ('location', models.CharField(blank=True, default='', max_length=255)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document')],
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(populate_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_date'], name='api_event_start_d_a74c71_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'start_date'], name='api_event_status_363bf9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['category', 'start_date'], name='api_event_categor_247f3e_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_event_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['customer_email'], name='api_payment_custome_39cc55_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['created_at', 'id'], name='api_payment_created_cf3397_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_initiated_at'], name='api_payment_payment_f288d0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='programpayment',
+            index=models.Index(fields=['customer_email'], name='api_program_custome_4d7a5b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='programpayment',
+            index=models.Index(fields=['created_at', 'id'], name='api_program_created_c8672e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='programpayment',
+            index=models.Index(fields=['payment_initiated_at'], name='api_program_payment_30dda5_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_payment_changelist_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('kind', models.CharField(choices=[('event', 'Event'), ('program', 'Program')], max_length=10)),
+                ('object_id', models.CharField(max_length=10)),
+                ('registrations', models.IntegerField(default=0)),
+                ('payments', models.IntegerField(default=0, help_text='Payments created')),
+                ('completed_payments', models.IntegerField(default=0, help_text='Payments completed')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Sum of completed payments', max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Sales dashboard',
+                'verbose_name_plural': 'Sales dashboard',
+                'indexes': [models.Index(fields=['kind', 'object_id', 'date'], name='api_dailyro_kind_af9ef9_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'kind', 'object_id'), name='unique_daily_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:33
+
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+# Frozen copy of api.pricing as of this migration, so later changes to the
+# parser don't change what this migration does
+
+CURRENCY_ALIASES = {
+    "KES": "KES",
+    "KSH": "KES",
+    "KSHS": "KES",
+    "USD": "USD",
+    "$": "USD",
+    "US$": "USD",
+    "EUR": "EUR",
+    "GBP": "GBP",
+}
+PRICE_RE = re.compile(
+    r"^\s*(?P<before>[A-Za-z]{3,4}\$?|\$)?\.?\s*"
+    r"(?P<amount>\d{1,3}(?:,\d{3})+|\d+)(?P<fraction>\.\d{1,2})?"
+    r"\s*(?:/-|/=)?\s*(?P<after>[A-Za-z]{3,4})?\s*$"
+)
+FREE_RE = re.compile(r"^\s*free\s*$", re.IGNORECASE)
+
+
+def parse_price(text):
+    if not text:
+        return None
+    if FREE_RE.match(text):
+        return Decimal("0"), "KES"
+    match = PRICE_RE.match(text)
+    if not match:
+        return None
+    before, after = match.group("before"), match.group("after")
+    if before and after:
+        return None
+    currency = "KES"
+    if before or after:
+        currency = CURRENCY_ALIASES.get((before or after).upper())
+        if currency is None:
+            return None
+    try:
+        amount = Decimal(match.group("amount").replace(",", "") + (match.group("fraction") or ""))
+    except InvalidOperation:
+        return None
+    return amount, currency
+
+
+def format_price(amount, currency):
+    amount = Decimal(str(amount))
+    if amount == 0:
+        return "Free"
+    if amount == amount.to_integral_value():
+        return f"{currency} {amount:,.0f}"
+    return f"{currency} {amount:,.2f}"
+
+
+def parse_prices(apps, schema_editor):
+    """Fill price_amount/price_currency from the free-text prices; unparseable ones stay empty."""
+    Program = apps.get_model('api', 'Program')
+    parsed = []
+    for program in Program.objects.only('id', 'price').iterator(chunk_size=2000):
+        price = parse_price(program.price)
+        if price is None:
+            continue
+        program.price_amount, program.price_currency = price
+        program.price = format_price(*price)
+        parsed.append(program)
+    Program.objects.bulk_update(parsed, ['price_amount', 'price_currency', 'price'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='program',
+            name='price_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Leave empty for prices that aren\'t a single amount (e.g. "Contact us")', max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='price_currency',
+            field=models.CharField(default='KES', max_length=3),
+        ),
+        migrations.AlterField(
+            model_name='program',
+            name='price',
+            field=models.CharField(help_text='Display price; derived from price_amount and price_currency when set', max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(fields=['price_amount'], name='api_program_price_a_e8ea8b_idx'),
+        ),
+        migrations.RunPython(parse_prices, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_program_price_amount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventregistration',
+            name='group_reference',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='programregistration',
+            name='group_reference',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True),
+        ),
+    ]
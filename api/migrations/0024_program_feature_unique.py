@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:38
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_features(apps, schema_editor):
+    """Keep the first of each (program, description) pair so the constraint can be added."""
+    ProgramFeature = apps.get_model('api', 'ProgramFeature')
+    keep = (
+        ProgramFeature.objects.values('program_id', 'description')
+        .annotate(first=Min('id')).values_list('first', flat=True)
+    )
+    ProgramFeature.objects.exclude(id__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_group_reference'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_features, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='programfeature',
+            constraint=models.UniqueConstraint(fields=('program', 'description'), name='unique_program_feature'),
+        ),
+    ]
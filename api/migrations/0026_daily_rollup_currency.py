@@ -0,0 +1,70 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:02
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def populate_rollups(apps, schema_editor):
+    """
+    Recompute every row with its currency. A frozen copy of
+    api.services.rollups.rebuild as of this migration.
+    """
+    DailyRollup = apps.get_model('api', 'DailyRollup')
+    completed_day = Coalesce('payment_completed_at', 'updated_at')
+    totals = defaultdict(dict)
+    for kind, registrations, payments, registered, target, target_currency in (
+        ('event', 'EventRegistration', 'Payment', 'registration_date', 'event_id', 'event__currency'),
+        ('program', 'ProgramRegistration', 'ProgramPayment', 'registered_at', 'program_id', 'program__price_currency'),
+    ):
+        registrations, payments = apps.get_model('api', registrations), apps.get_model('api', payments)
+        sources = (
+            (
+                registrations.objects.all(), registered, target, Coalesce('payment__currency', target_currency),
+                {'registrations': Count('pk')},
+            ),
+            (payments.objects.all(), 'created_at', f'registration__{target}', F('currency'), {'payments': Count('pk')}),
+            (
+                payments.objects.filter(payment_status='completed'), completed_day, f'registration__{target}', F('currency'),
+                {'completed_payments': Count('pk'), 'revenue': Sum('amount')},
+            ),
+        )
+        for queryset, day_field, object_field, currency_field, aggregates in sources:
+            rows = (
+                queryset.annotate(day=TruncDate(day_field), target=F(object_field), row_currency=currency_field)
+                .values('day', 'target', 'row_currency').annotate(**aggregates).order_by()
+            )
+            for row in rows:
+                key = (row.pop('day'), kind, str(row.pop('target')), row.pop('row_currency') or 'KES')
+                totals[key].update(row)
+    DailyRollup.objects.all().delete()
+    DailyRollup.objects.bulk_create([
+        DailyRollup(date=day, kind=kind, object_id=object_id, currency=currency, **counters)
+        for (day, kind, object_id, currency), counters in totals.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='dailyrollup',
+            name='unique_daily_rollup',
+        ),
+        migrations.AddField(
+            model_name='dailyrollup',
+            name='currency',
+            field=models.CharField(default='KES', help_text='Currency of the payments counted in this row', max_length=10),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'kind', 'object_id', 'currency'), name='unique_daily_rollup'),
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
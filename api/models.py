@@ -1,14 +1,70 @@
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction, IntegrityError
+import logging
 import uuid
-import random
+import secrets
 import string
+import time
 from django.utils import timezone
 
+from .pricing import format_price, parse_price
 
-def generate_unique_id():
-    """Generate a unique 6-character alphanumeric ID for events"""
-    alphabet = string.ascii_uppercase + string.digits
-    return ''.join(random.choices(alphabet, k=6))
+logger = logging.getLogger(__name__)
+
+# Digits before letters, so string order of encoded values matches numeric order
+ID_ALPHABET = string.digits + string.ascii_uppercase
+ID_EPOCH = 1735689600  # 2025-01-01T00:00:00Z
+ID_TIME_LENGTH = 6     # 36**6 seconds ~ 69 years after ID_EPOCH
+ID_RANDOM_LENGTH = 4   # 36**4 = 1,679,616 IDs per second
+ID_LENGTH = ID_TIME_LENGTH + ID_RANDOM_LENGTH
+ID_MAX_ATTEMPTS = 5
+
+
+def _encode_base36(value, length):
+    chars = []
+    for _ in range(length):
+        value, remainder = divmod(value, 36)
+        chars.append(ID_ALPHABET[remainder])
+    return ''.join(reversed(chars))
+
+
+def generate_unique_id(timestamp=None):
+    """
+    Generate a time-ordered 10-character ID for events and programs:
+    6 base36 characters of seconds since ID_EPOCH, then 4 random characters
+    from `secrets`. New rows append to the end of the primary key index.
+    Uniqueness is enforced by UniqueIdMixin retrying on collision.
+    """
+    seconds = int(time.time() if timestamp is None else timestamp) - ID_EPOCH
+    prefix = _encode_base36(max(0, seconds), ID_TIME_LENGTH)
+    return prefix + ''.join(secrets.choice(ID_ALPHABET) for _ in range(ID_RANDOM_LENGTH))
+
+
+class UniqueIdMixin:
+    """
+    For models whose primary key defaults to generate_unique_id: retry the
+    INSERT with a fresh ID (up to ID_MAX_ATTEMPTS) if the generated one is
+    already taken, instead of failing the request with an IntegrityError.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pk_generated = not args and 'pk' not in kwargs and self._meta.pk.attname not in kwargs
+
+    def save(self, *args, **kwargs):
+        if not (self._state.adding and self._pk_generated):
+            return super().save(*args, **kwargs)
+
+        for attempt in range(1, ID_MAX_ATTEMPTS + 1):
+            try:
+                with transaction.atomic(using=kwargs.get('using')):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                manager = type(self)._default_manager
+                if attempt == ID_MAX_ATTEMPTS or not manager.filter(pk=self.pk).exists():
+                    raise
+                logger.warning(f"{type(self).__name__} ID collision on {self.pk}, retrying ({attempt}/{ID_MAX_ATTEMPTS})")
+                self.pk = generate_unique_id()
 
 
 class ContactMessage(models.Model):
@@ -43,6 +99,7 @@ class TeamMember(models.Model):
     role = models.CharField(max_length=255)
     category = models.CharField(max_length=50, choices=ROLE_CHOICES)
     image = models.ImageField(upload_to='team/')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     bio = models.TextField()
     email = models.EmailField(blank=True, null=True)
     linkedin = models.URLField(blank=True, null=True)
@@ -69,6 +126,7 @@ class GalleryCategory(models.Model):
 class GalleryItem(models.Model):
     category = models.ForeignKey(GalleryCategory, on_delete=models.CASCADE, related_name='items')
     image = models.ImageField(upload_to='gallery/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     video_url = models.URLField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -84,6 +142,7 @@ class Testimonial(models.Model):
     company = models.CharField(max_length=150)
     text = models.TextField(max_length=500)
     logo = models.ImageField(upload_to='testimonials/')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -94,7 +153,7 @@ class Testimonial(models.Model):
 
 from django.utils import timezone
 
-class Event(models.Model):
+class Event(UniqueIdMixin, models.Model):
     EVENT_STATUS_CHOICES = [
         ('open', 'Open for Registration'),
         ('closed', 'Closed'),
@@ -112,7 +171,7 @@ class Event(models.Model):
     ]
 
     # Basic Information
-    id = models.CharField(primary_key=True, max_length=6, editable=False, default=generate_unique_id)
+    id = models.CharField(primary_key=True, max_length=ID_LENGTH, editable=False, default=generate_unique_id)
     title = models.CharField(max_length=200)
     subtitle = models.CharField(max_length=255, blank=True, default='')
     tagline = models.CharField(max_length=255, blank=True, default='')
@@ -141,6 +200,7 @@ class Event(models.Model):
     
     # Media
     image = models.ImageField(upload_to='events/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -148,6 +208,11 @@ class Event(models.Model):
 
     class Meta:
         ordering = ['start_date']
+        indexes = [
+            models.Index(fields=['start_date']),
+            models.Index(fields=['status', 'start_date']),
+            models.Index(fields=['category', 'start_date']),
+        ]
 
     def __str__(self):
         return self.title
@@ -212,6 +277,10 @@ class EventRegistration(models.Model):
         choices=REGISTRATION_STATUS_CHOICES, 
         default='pending'
     )
+
+    # Shared by the attendees of one group registration; the group's single
+    # payment hangs off the first (lead) registration
+    group_reference = models.CharField(max_length=20, blank=True, null=True, db_index=True)
     
     # Timestamps
     registration_date = models.DateTimeField(auto_now_add=True)
@@ -239,9 +308,110 @@ class EventRegistration(models.Model):
     def confirm_registration(self):
         """Mark registration as confirmed"""
         self.registration_status = 'confirmed'
-        self.save()
+        self.save(update_fields=['registration_status', 'updated_at'])
+
+def group_registrations(model, registration_id):
+    """A registration and, for a group lead, every registration sharing its group_reference."""
+    group = model.objects.filter(pk=registration_id).values('group_reference')[:1]
+    return model.objects.filter(models.Q(pk=registration_id) | models.Q(group_reference=models.Subquery(group)))
+
+
+class PaymentTransitionsMixin:
+    """
+    Status transitions shared by Payment and ProgramPayment. Each one writes
+    only the columns it changes (plus updated_at) via save(update_fields=...),
+    and a repeated transition to the current state writes nothing.
+
+    A payment model sets `merchant_reference_prefix`, `registration_confirmed`
+    (the registration field values a completed payment sets) and
+    `_populate_from_registration()`, which fills amount, currency, customer
+    and description from the registration.
+    """
+    REQUIRED_ATTRIBUTES = ('merchant_reference_prefix', 'registration_confirmed', '_populate_from_registration')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        missing = [name for name in cls.REQUIRED_ATTRIBUTES if not hasattr(cls, name)]
+        if missing:
+            raise TypeError(f"{cls.__name__} must define {', '.join(missing)}")
+
+    def _transition(self, status, **fields):
+        changed = [name for name, value in fields.items() if getattr(self, name) != value]
+        if self.payment_status == status and not changed:
+            return False
+        self.payment_status = status
+        for name in changed:
+            setattr(self, name, fields[name])
+        self.save(update_fields=['payment_status', *changed, 'updated_at'])
+        return True
+
+    def mark_as_initiated(self, order_tracking_id, payment_url, merchant_reference=None):
+        fields = {
+            'pesapal_order_tracking_id': order_tracking_id,
+            'pesapal_payment_url': payment_url,
+            'payment_initiated_at': timezone.now(),
+        }
+        if merchant_reference:
+            fields['pesapal_merchant_reference'] = merchant_reference
+        return self._transition('initiated', **fields)
+
+    def mark_as_completed(self, transaction_id=None, payment_method=None):
+        """
+        Mark payment as completed and confirm the registration; False if it
+        already was. The row is re-read under a lock first: the PesaPal IPN
+        and the callback can complete the same payment at once, and only one
+        of them may send the confirmation and count the revenue.
+        """
+        fields = {'payment_completed_at': timezone.now()}
+        if transaction_id:
+            fields['pesapal_transaction_id'] = transaction_id
+        if payment_method:
+            fields['payment_method'] = payment_method
+        with transaction.atomic():
+            current = type(self)._default_manager.select_for_update().get(pk=self.pk)
+            if current.payment_status == 'completed':
+                self._refresh_from(current)
+                return False
+            self._transition('completed', **fields)
+            self._confirm_registration()
+        return True
+
+    def mark_as_failed(self, **fields):
+        return self._transition('failed', **fields)
+
+    def mark_as_pending(self):
+        return self._transition('pending')
+
+    def _refresh_from(self, current):
+        """Take the column values, and the rollup state tracked by api.signals, of a fresh copy."""
+        for field in self._meta.concrete_fields:
+            setattr(self, field.attname, getattr(current, field.attname))
+        if hasattr(current, '_rollup_state'):
+            self._rollup_state = current._rollup_state
+
+    def _confirm_registration(self):
+        """Confirm the registration, and for a group lead the whole group, in one UPDATE."""
+        registration_model = self._meta.get_field('registration').related_model
+        values = dict(self.registration_confirmed)
+        if any(field.name == 'updated_at' for field in registration_model._meta.concrete_fields):
+            values['updated_at'] = timezone.now()
+        group_registrations(registration_model, self.registration_id).exclude(**self.registration_confirmed).update(**values)
+        registration = self._state.fields_cache.get('registration')
+        if registration is not None:
+            for name, value in values.items():
+                setattr(registration, name, value)
 
-class Payment(models.Model):
+    def save(self, *args, **kwargs):
+        # Partial saves (transitions) never touch the auto-populated columns
+        if kwargs.get('update_fields') is None:
+            if not (self.amount and self.currency and self.customer_email and self.customer_phone and self.description):
+                self._populate_from_registration()
+            if not self.pesapal_merchant_reference:
+                self.pesapal_merchant_reference = f"{self.merchant_reference_prefix}{self.registration_id}"
+        super().save(*args, **kwargs)
+
+
+class Payment(PaymentTransitionsMixin, models.Model):
     PAYMENT_METHOD_CHOICES = [
         ('pesapal', 'PesaPal'),
         ('cash', 'Cash'),
@@ -294,43 +464,29 @@ class Payment(models.Model):
         indexes = [
             models.Index(fields=['pesapal_order_tracking_id']),
             models.Index(fields=['payment_status']),
+            models.Index(fields=['customer_email']),
+            models.Index(fields=['created_at', 'id']),  # default changelist order, -created_at then -pk
+            models.Index(fields=['payment_initiated_at']),
         ]
 
     def __str__(self):
         return f"Payment {self.id} - {self.amount} {self.currency}"
 
-    def save(self, *args, **kwargs):
-        # Auto-populate from event registration
-        if self.registration:
-            if not self.amount:
-                self.amount = self.registration.event.investment_amount or 0
-            if not self.currency:
-                self.currency = self.registration.event.currency
-            if not self.customer_email:
-                self.customer_email = self.registration.email
-            if not self.customer_phone:
-                self.customer_phone = self.registration.phone
-            if not self.description:
-                self.description = f"Event: {self.registration.event.title}"
-        
-        # Ensure PesaPal fields have default values if empty
-        if not self.pesapal_merchant_reference:
-            self.pesapal_merchant_reference = f"MBG-{self.registration.id}"
-        
-        super().save(*args, **kwargs)
-
-    def mark_as_completed(self, transaction_id=None):
-        """Mark payment as completed and confirm registration"""
-        self.payment_status = 'completed'
-        self.payment_completed_at = timezone.now()
-        if transaction_id:
-            self.pesapal_transaction_id = transaction_id
-        self.save()
-        
-        # Auto-confirm the linked registration
-        self.registration.registration_status = 'confirmed'
-        self.registration.save()
-        
+    merchant_reference_prefix = "MBG-"
+    registration_confirmed = {'registration_status': 'confirmed'}
+
+    def _populate_from_registration(self):
+        registration = self.registration
+        if not self.amount:
+            self.amount = registration.event.investment_amount or 0
+        if not self.currency:
+            self.currency = registration.event.currency
+        if not self.customer_email:
+            self.customer_email = registration.email
+        if not self.customer_phone:
+            self.customer_phone = registration.phone
+        if not self.description:
+            self.description = f"Event: {registration.event.title}"
 
     @property
     def is_successful(self):
@@ -350,18 +506,23 @@ class ProgramCategory(models.Model):
         return self.name
 
 
-class Program(models.Model):
+class Program(UniqueIdMixin, models.Model):
     """General program model that works for all program types"""
     id = models.CharField(
         primary_key=True,
-        max_length=6,
+        max_length=ID_LENGTH,
         editable=False,
         default=generate_unique_id
     )    
     category = models.ForeignKey(ProgramCategory, on_delete=models.CASCADE, related_name="programs")
     title = models.CharField(max_length=200)
     duration = models.CharField(max_length=50)
-    price = models.CharField(max_length=50)
+    price = models.CharField(max_length=50, help_text="Display price; derived from price_amount and price_currency when set")
+    price_amount = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True,
+        help_text="Leave empty for prices that aren't a single amount (e.g. \"Contact us\")",
+    )
+    price_currency = models.CharField(max_length=3, default='KES')
     description = models.TextField()
     focus = models.TextField(blank=True,default='')
     outcome = models.TextField(blank=True,default='')
@@ -371,10 +532,46 @@ class Program(models.Model):
 
     class Meta:
         ordering = ['title']
+        indexes = [
+            models.Index(fields=['price_amount']),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.category.name})"
 
+    PRICE_FIELDS = ('price', 'price_amount', 'price_currency')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_price = instance._price_state()
+        return instance
+
+    def _price_state(self):
+        return tuple(self.__dict__.get(name) for name in self.PRICE_FIELDS)
+
+    def sync_price(self):
+        """
+        Keep the price text and price_amount/price_currency in step. When
+        only the text was edited since loading, it is parsed again (a
+        non-amount like "Contact us" clears price_amount); otherwise the
+        structured fields win and the text is derived from them.
+        """
+        loaded = getattr(self, '_loaded_price', None)
+        if loaded is not None and self.price != loaded[0] and (self.price_amount, self.price_currency) == loaded[1:]:
+            self.price_amount = None
+        if self.price_amount is None:
+            parsed = parse_price(self.price)
+            if parsed:
+                self.price_amount, self.price_currency = parsed
+        if self.price_amount is not None:
+            self.price = format_price(self.price_amount, self.price_currency)
+
+    def save(self, *args, **kwargs):
+        self.sync_price()
+        super().save(*args, **kwargs)
+        self._loaded_price = self._price_state()
+
 
 class ProgramFeature(models.Model):
     """Features of a program"""
@@ -383,6 +580,10 @@ class ProgramFeature(models.Model):
 
     class Meta:
         ordering = ['id']
+        constraints = [
+            # Lets catalogue imports upsert features without duplicating them
+            models.UniqueConstraint(fields=['program', 'description'], name='unique_program_feature'),
+        ]
 
     def __str__(self):
         return f"{self.program.title} - {self.description[:30]}"
@@ -416,6 +617,7 @@ class ProgramRegistration(models.Model):
     # Payment
     has_paid = models.BooleanField(default=False)
     # payment_reference = models.CharField(max_length=255, blank=True)
+    group_reference = models.CharField(max_length=20, blank=True, null=True, db_index=True)
 
     # Timestamps
     registered_at = models.DateTimeField(auto_now_add=True)
@@ -428,8 +630,7 @@ class ProgramRegistration(models.Model):
     
     
 # models.py
-from decimal import Decimal, InvalidOperation
-class ProgramPayment(models.Model):
+class ProgramPayment(PaymentTransitionsMixin, models.Model):
     PAYMENT_METHOD_CHOICES = [
         ('pesapal', 'PesaPal'),
         ('cash', 'Cash'),
@@ -477,48 +678,31 @@ class ProgramPayment(models.Model):
         indexes = [
             models.Index(fields=['pesapal_order_tracking_id']),
             models.Index(fields=['payment_status']),
+            models.Index(fields=['customer_email']),
+            models.Index(fields=['created_at', 'id']),  # default changelist order, -created_at then -pk
+            models.Index(fields=['payment_initiated_at']),
         ]
 
     def __str__(self):
         return f"ProgramPayment {self.id} - {self.amount} {self.currency}"
 
-    def save(self, *args, **kwargs):
-        # Auto-populate from program registration
-        if self.registration:
-            if not self.amount:
-                # Parse program price to decimal
-                try:
-                    price_str = self.registration.program.price.replace('KES', '').replace(',', '').strip()
-                    self.amount = Decimal(price_str)
-                except (ValueError, InvalidOperation):
-                    self.amount = Decimal('0')
-            
-            if not self.currency:
-                self.currency = 'KES'
-                
-            if not self.customer_email:
-                self.customer_email = self.registration.email
-                
-            if not self.customer_phone:
-                self.customer_phone = self.registration.phone_number
-                
-            if not self.description:
-                self.description = f"Program: {self.registration.program.title}"
-        
-        if not self.pesapal_merchant_reference:
-            self.pesapal_merchant_reference = f"MBG-PRG-{self.registration.id}"
-        
-        super().save(*args, **kwargs)
-
-    def mark_as_completed(self, transaction_id=None):
-        self.payment_status = 'completed'
-        self.payment_completed_at = timezone.now()
-        if transaction_id:
-            self.pesapal_transaction_id = transaction_id
-        self.save()
-        
-        self.registration.has_paid = True
-        self.registration.save()
+    merchant_reference_prefix = "MBG-PRG-"
+    registration_confirmed = {'has_paid': True}
+
+    def _populate_from_registration(self):
+        registration = self.registration
+        if not self.amount:
+            program = registration.program
+            if program.price_amount is None:
+                raise ValueError(f"Program {program.pk} has no structured price ({program.price!r}); set price_amount")
+            self.amount = program.price_amount
+            self.currency = program.price_currency
+        if not self.customer_email:
+            self.customer_email = registration.email
+        if not self.customer_phone:
+            self.customer_phone = registration.phone_number
+        if not self.description:
+            self.description = f"Program: {registration.program.title}"
 
     @property
     def is_successful(self):
@@ -538,4 +722,93 @@ class ProgramPayment(models.Model):
     @property
     def email(self):
         """For PesaPalService compatibility"""
-        return self.customer_email
\ No newline at end of file
+        return self.customer_email
+
+from django.contrib.postgres.search import SearchVectorField
+
+
+class SearchDocument(models.Model):
+    """
+    Searchable text of one Event or Program, kept in sync by signals
+    (api.services.search). On SQLite an FTS5 table indexes these rows through
+    triggers; on Postgres `search_vector` carries a GIN-indexed tsvector.
+    """
+    KIND_CHOICES = [
+        ('event', 'Event'),
+        ('program', 'Program'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=ID_LENGTH)
+    title = models.CharField(max_length=200)
+    summary = models.TextField(blank=True, default='')
+    body = models.TextField(blank=True, default='')
+    location = models.CharField(max_length=255, blank=True, default='')
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
+
+
+class DailyRollup(models.Model):
+    """
+    Registration and payment totals of one Event or Program on one day
+    (Africa/Nairobi) in one currency, for the admin sales dashboard.
+    Payments count in their own currency and registrations in their event's
+    or program's currency at the time. Kept current by signals on
+    registration and payment saves (api.services.rollups) and rebuilt in bulk
+    with `manage.py rebuild_rollups`.
+    """
+    KIND_CHOICES = [
+        ('event', 'Event'),
+        ('program', 'Program'),
+    ]
+
+    date = models.DateField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=ID_LENGTH)
+    currency = models.CharField(max_length=10, default='KES', help_text="Currency of the payments counted in this row")
+    registrations = models.IntegerField(default=0)
+    payments = models.IntegerField(default=0, help_text="Payments created")
+    completed_payments = models.IntegerField(default=0, help_text="Payments completed")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Sum of completed payments")
+
+    class Meta:
+        verbose_name = 'Sales dashboard'
+        verbose_name_plural = 'Sales dashboard'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'kind', 'object_id', 'currency'], name='unique_daily_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'object_id', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.kind} {self.object_id} {self.currency}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    The stored response of a POST sent with an Idempotency-Key header
+    (api.idempotency). A row with no status_code yet is a placeholder for a
+    request still being processed.
+    """
+    scope = models.CharField(max_length=50)
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='unique_idempotency_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}: {self.key}"
@@ -0,0 +1,49 @@
+import logging
+
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_row_count(model, using="default"):
+    """
+    Cheap row-count estimate for a whole table, or None when unavailable:
+    pg_class.reltuples on Postgres (maintained by ANALYZE/autovacuum). SQLite
+    keeps no such statistic (its largest rowid stays high after deletes, so
+    it isn't one), so callers count exactly there.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        logger.warning("Could not estimate the row count of %s", table, exc_info=True)
+        return None
+    if not row or row[0] is None or row[0] < 0:  # reltuples is -1 before the first ANALYZE
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for large admin changelists. An unfiltered queryset over a big
+    Postgres table is counted from the planner estimate instead of COUNT(*);
+    filtered querysets, small tables and other databases keep the exact count.
+    """
+
+    estimate_threshold = 10_000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where and not query.is_sliced and not query.distinct:
+            estimate = estimate_row_count(self.object_list.model, using=self.object_list.db)
+            if estimate is not None and estimate > self.estimate_threshold:
+                return estimate
+        return super().count
@@ -0,0 +1,63 @@
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Optional, Tuple
+
+DEFAULT_CURRENCY = "KES"
+
+# Currency spellings seen in program prices, mapped to ISO 4217 codes
+CURRENCY_ALIASES = {
+    "KES": "KES",
+    "KSH": "KES",
+    "KSHS": "KES",
+    "USD": "USD",
+    "$": "USD",
+    "US$": "USD",
+    "EUR": "EUR",
+    "GBP": "GBP",
+}
+
+# "KES 5,000", "Ksh. 5000/-", "5,000 KES", "$150", "USD 1,200.50"
+PRICE_RE = re.compile(
+    r"^\s*(?P<before>[A-Za-z]{3,4}\$?|\$)?\.?\s*"
+    r"(?P<amount>\d{1,3}(?:,\d{3})+|\d+)(?P<fraction>\.\d{1,2})?"
+    r"\s*(?:/-|/=)?\s*(?P<after>[A-Za-z]{3,4})?\s*$"
+)
+FREE_RE = re.compile(r"^\s*free\s*$", re.IGNORECASE)
+
+
+def parse_price(text: str) -> Optional[Tuple[Decimal, str]]:
+    """
+    (amount, currency) for a single-price string like "KES 5,000" or
+    "Free", or None when the text isn't one unambiguous price
+    ("From KES 5,000", "5,000 - 10,000", "Contact us").
+    """
+    if not text:
+        return None
+    if FREE_RE.match(text):
+        return Decimal("0"), DEFAULT_CURRENCY
+    match = PRICE_RE.match(text)
+    if not match:
+        return None
+    before, after = match.group("before"), match.group("after")
+    if before and after:
+        return None
+    currency = DEFAULT_CURRENCY
+    if before or after:
+        currency = CURRENCY_ALIASES.get((before or after).upper())
+        if currency is None:
+            return None
+    try:
+        amount = Decimal(match.group("amount").replace(",", "") + (match.group("fraction") or ""))
+    except InvalidOperation:
+        return None
+    return amount, currency
+
+
+def format_price(amount: Decimal, currency: str) -> str:
+    """Display string for a structured price: "KES 5,000", "USD 1,200.50", "Free"."""
+    amount = Decimal(str(amount))
+    if amount == 0:
+        return "Free"
+    if amount == amount.to_integral_value():
+        return f"{currency} {amount:,.0f}"
+    return f"{currency} {amount:,.2f}"
@@ -0,0 +1,45 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib json is used without it
+    orjson = None
+
+_ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    Output matches DRF's compact JSONRenderer: datetimes are passed through
+    to DRF's JSONEncoder so they keep its ISO format (millisecond precision,
+    `Z` for UTC), Decimal/lazy strings/querysets go through the same encoder,
+    and U+2028/U+2029 are escaped. Indented output (browsable API, `indent`
+    media type parameter), ensure_ascii mode and anything orjson rejects
+    (e.g. integers wider than 64 bits) fall back to the stdlib renderer.
+    """
+
+    _default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self._default, option=_ORJSON_OPTIONS)
+        except TypeError:  # orjson.JSONEncodeError is a TypeError
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escape the JavaScript line terminators, as JSONRenderer does
+        if b'\xe2\x80' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -1,5 +1,8 @@
+from django.conf import settings
+from django.utils.encoding import filepath_to_uri
 from rest_framework import serializers
 from .models import ContactMessage,TeamMember,Testimonial
+from .services import image_derivatives
 from rest_framework import serializers
 
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
@@ -78,18 +81,74 @@ class ContactMessageSerializer(serializers.ModelSerializer):
         
 
 
+def media_base_url(request=None):
+    """
+    Base URL for media files: settings.MEDIA_BASE_URL when configured,
+    otherwise MEDIA_URL made absolute against the request. Resolved once per
+    request and cached on it, so list responses don't rebuild the scheme and
+    host for every row.
+    """
+    if settings.MEDIA_BASE_URL:
+        return settings.MEDIA_BASE_URL
+    if request is None:
+        return settings.MEDIA_URL
+    base = getattr(request, '_media_base_url', None)
+    if base is None:
+        base = request._media_base_url = request.build_absolute_uri(settings.MEDIA_URL)
+    return base
+
+
+def media_url(name, request=None):
+    """URL of a stored file; same result as the default storage's url() for local media."""
+    return media_base_url(request) + filepath_to_uri(name)
+
+
+class MediaURLField(serializers.Field):
+    """Read-only absolute URL of a FileField/ImageField, built by string concatenation."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        # A FieldFile, or the stored name itself when rendering .values() rows
+        name = getattr(value, 'name', value)
+        if not name:
+            return None
+        return media_url(name, self.context.get('request'))
+
+
+class SparseFieldsetMixin:
+    """Render only the fields named in context['fields'] (the `fields=` query parameter), when given."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        if requested:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+
+def variants_srcset(variants, request=None):
+    """srcset strings per format for recorded image variants, or None"""
+    base = media_base_url(request)
+    return image_derivatives.srcset(variants, lambda name: base + filepath_to_uri(name))
+
+
+def build_srcset(obj, request=None):
+    return variants_srcset(obj.image_variants, request)
+
+
 class TeamMemberSerializer(serializers.ModelSerializer):
-    image = serializers.SerializerMethodField()
+    image = MediaURLField()
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = TeamMember
-        fields = '__all__'
+        exclude = ['image_variants']
 
-    def get_image(self, obj):
-        request = self.context.get('request')
-        if obj.image:
-            return request.build_absolute_uri(obj.image.url)
-        return None
+    def get_image_srcset(self, obj):
+        return build_srcset(obj, self.context.get('request'))
 
 
 from rest_framework import serializers
@@ -103,38 +162,36 @@ class GalleryCategorySerializer(serializers.ModelSerializer):
 
 class GalleryItemSerializer(serializers.ModelSerializer):
     # return full absolute URL for image
-    image = serializers.SerializerMethodField()
+    image = MediaURLField()
+    image_srcset = serializers.SerializerMethodField()
     category = GalleryCategorySerializer(read_only=True)
 
     class Meta:
         model = GalleryItem
-        fields = ['id', 'category',  'image', 'video_url', 'created_at']
-
-    def get_image(self, obj):
-        request = self.context.get('request', None)
-        if obj.image:
-            try:
-                # if serializer has request in context, build absolute uri
-                if request:
-                    return request.build_absolute_uri(obj.image.url)
-                # fallback to returning the relative URL
-                return obj.image.url
-            except Exception:
-                return None
-        return None
+        fields = ['id', 'category',  'image', 'image_srcset', 'video_url', 'created_at']
+
+    def get_image_srcset(self, obj):
+        return build_srcset(obj, self.context.get('request'))
 
 class TestimonialSerializer(serializers.ModelSerializer):
-    logo = serializers.ImageField(use_url=True)
+    logo = MediaURLField()
+    logo_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Testimonial
-        fields = ['id', 'author', 'company', 'text', 'logo', 'created_at']
+        fields = ['id', 'author', 'company', 'text', 'logo', 'logo_srcset', 'created_at']
+
+    def get_logo_srcset(self, obj):
+        return build_srcset(obj, self.context.get('request'))
         
         
 from rest_framework import serializers
 from .models import Event
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    image = MediaURLField()
+    image_srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = Event
         fields = [
@@ -157,8 +214,12 @@ class EventSerializer(serializers.ModelSerializer):
             'status',
             'registration_open',
             'image',
+            'image_srcset',
         ]
 
+    def get_image_srcset(self, obj):
+        return build_srcset(obj, self.context.get('request'))
+
 from rest_framework import serializers
 from .models import EventRegistration, Event, Payment
 class EventRegistrationSerializer(serializers.ModelSerializer):
@@ -265,14 +326,14 @@ class ProgramFeatureSerializer(serializers.ModelSerializer):
 
 
 # Program Serializer
-class ProgramSerializer(serializers.ModelSerializer):
+class ProgramSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category = ProgramCategorySerializer(read_only=True)
     features = ProgramFeatureSerializer(many=True, read_only=True)
 
     class Meta:
         model = Program
         fields = [
-            'id', 'title', 'category', 'duration', 'price', 'description',
+            'id', 'title', 'category', 'duration', 'price', 'price_amount', 'price_currency', 'description',
             'focus', 'outcome', 'skills', 'format', 'badge',  'features'
         ]
 
@@ -288,6 +349,23 @@ class ProgramRegistrationSerializer(serializers.ModelSerializer):
         ]
 
 
+class EventAttendeeSerializer(serializers.ModelSerializer):
+    """One attendee of an event group registration; the event comes from the URL."""
+    class Meta:
+        model = EventRegistration
+        fields = [
+            'full_name', 'email', 'phone', 'company', 'job_title',
+            'industry', 'experience_level', 'goals', 'heard_about',
+        ]
+
+
+class ProgramAttendeeSerializer(serializers.ModelSerializer):
+    """One attendee of a program group registration; team_size is set from the group."""
+    class Meta:
+        model = ProgramRegistration
+        fields = ['full_name', 'email', 'phone_number', 'company_name', 'role', 'challenges']
+
+
 class PaymentSerializer(serializers.ModelSerializer):
     registration_details = serializers.SerializerMethodField()
     event_title = serializers.SerializerMethodField()
@@ -0,0 +1,418 @@
+# api/services/catalogue_import.py
+import csv
+import io
+import logging
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, models, transaction
+from django.db.models import Q
+
+try:
+    import openpyxl
+except ImportError:  # optional; CSV imports only without it
+    openpyxl = None
+
+from ..models import Event, Program, ProgramCategory, ProgramFeature, generate_unique_id
+from . import search, upcoming_events
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+# Row kinds, in the order each chunk writes them: features refer to programs
+KINDS = ("event", "program", "feature")
+# Importable columns per kind; images and timestamps stay in the admin
+COLUMNS = {
+    "event": (
+        "id", "title", "subtitle", "tagline", "category", "start_date", "end_date", "start_time", "end_time",
+        "location", "participants_limit", "duration", "description", "investment_amount", "currency", "is_free",
+        "status", "registration_open",
+    ),
+    "program": (
+        "id", "category", "title", "duration", "price", "price_amount", "price_currency", "description",
+        "focus", "outcome", "skills", "format", "badge",
+    ),
+    "feature": ("program", "description"),
+}
+# Rows without an id update the one existing row with the same values here
+NATURAL_KEYS = {"event": ("title", "start_date"), "program": ("title",)}
+PRICE_COLUMNS = ("price", "price_amount", "price_currency")
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+FALSE_VALUES = {"0", "false", "f", "no", "n"}
+
+# (location, sheet name or None, {column: cell value})
+Row = Tuple[str, Optional[str], Dict[str, object]]
+
+
+class ImportFileError(ValueError):
+    """The file as a whole can't be read (format, missing dependency)."""
+
+
+class ImportReport:
+    """Per-kind created/updated/unchanged counts and per-row errors of one import."""
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.rows = 0
+        self.counts = Counter()
+        self.errors: List[Tuple[str, str]] = []
+        self.elapsed = 0.0
+
+    def count(self, kind, outcome, number=1):
+        if number:
+            self.counts[(kind, outcome)] += number
+
+    def error(self, location, message):
+        self.errors.append((location, message))
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        parts = [
+            f"{kind}s: " + ", ".join(
+                f"{self.counts[(kind, outcome)]} {outcome}"
+                for outcome in ("created", "updated", "unchanged") if self.counts[(kind, outcome)]
+            )
+            for kind in KINDS if any(self.counts[(kind, outcome)] for outcome in ("created", "updated", "unchanged"))
+        ]
+        prefix = "Dry run, nothing saved. " if self.dry_run else ""
+        return (
+            f"{prefix}{self.rows} rows in {self.elapsed:.2f} s ({self.rows_per_second:,.0f} rows/s); "
+            f"{'; '.join(parts) or 'nothing imported'}; {len(self.errors)} row error(s)"
+        )
+
+
+# ---- Reading ----
+
+def _header(cells) -> List[str]:
+    return [str(cell or "").strip().lower().replace(" ", "_") for cell in cells]
+
+
+def _csv_rows(fileobj) -> Iterator[Row]:
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        header = _header(next(reader, []))
+        for number, cells in enumerate(reader, start=2):
+            yield f"row {number}", None, dict(zip(header, cells))
+    except UnicodeDecodeError as exc:
+        raise ImportFileError(f"CSV files must be UTF-8 encoded ({exc.reason})") from exc
+    finally:
+        text.detach()  # leave the caller's file open
+
+
+def _xlsx_rows(fileobj) -> Iterator[Row]:
+    if openpyxl is None:
+        raise ImportFileError("Reading .xlsx files needs openpyxl; install it or save the sheet as CSV")
+    try:
+        workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    except Exception as exc:
+        raise ImportFileError(f"Not a readable .xlsx file: {exc}") from exc
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            header = _header(next(rows, ()))
+            for number, cells in enumerate(rows, start=2):
+                yield f"{sheet.title} row {number}", sheet.title, dict(zip(header, cells))
+    finally:
+        workbook.close()
+
+
+def read_rows(fileobj, filename: str) -> Iterator[Row]:
+    """Stream the rows of a CSV or XLSX file (binary file object) as column dicts."""
+    if filename.lower().endswith(".xlsx"):
+        return _xlsx_rows(fileobj)
+    if filename.lower().endswith((".csv", ".txt")):
+        return _csv_rows(fileobj)
+    raise ImportFileError(f"Unsupported file type: {filename} (use .csv or .xlsx)")
+
+
+def _kind(value) -> Optional[str]:
+    """'event', 'Programs', 'Program features' -> the row kind, or None."""
+    name = str(value or "").strip().lower().replace(" ", "_")
+    if name.endswith("s"):
+        name = name[:-1]
+    if name == "program_feature":
+        name = "feature"
+    return name if name in KINDS else None
+
+
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+# ---- Validation and upserts ----
+
+def _messages(exc: ValidationError) -> str:
+    if hasattr(exc, "error_dict"):
+        return "; ".join(f"{field}: {' '.join(errors)}" for field, errors in exc.message_dict.items())
+    return " ".join(exc.messages)
+
+
+class _Importer:
+    def __init__(self, report: ImportReport):
+        self.report = report
+        self.seen: Dict[str, Dict[str, str]] = defaultdict(dict)  # kind -> {id: location}
+        self.events_changed = False
+        categories = ProgramCategory.objects.values_list("pk", "slug", "name")
+        self.categories = {key.lower(): pk for pk, *keys in categories for key in keys}
+
+    def write(self, chunk: List[Tuple[str, str, Dict[str, object]]]) -> None:
+        """Validate and save one chunk in its own transaction."""
+        by_kind = defaultdict(list)
+        for location, kind, values in chunk:
+            by_kind[kind].append((location, values))
+        with transaction.atomic():
+            for kind in KINDS:
+                if by_kind[kind]:
+                    getattr(self, f"_write_{kind}s")(by_kind[kind])
+
+    # -- Building instances --
+
+    def _instance(self, model, kind, location, values, related=None):
+        """
+        An unsaved, validated instance of `model` from one row, or None after
+        reporting its error. `related` maps foreign keys, already resolved in
+        bulk, to their primary keys.
+        """
+        related = related or {}
+        instance = model(**{f"{name}_id": pk for name, pk in related.items()})
+        columns = tuple(column for column in COLUMNS[kind] if column in values)
+        for column in columns:
+            if column in related:
+                continue
+            field = model._meta.get_field(column)
+            value = values[column]
+            if isinstance(value, str):
+                value = value.strip()
+            if column == "id":
+                if not _blank(value):
+                    instance.pk, instance._pk_generated = str(value), False
+                continue  # otherwise keep the generated ID
+            if _blank(value):
+                value = None if field.null else (field.get_default() if field.has_default() else "")
+            elif isinstance(field, models.BooleanField) and isinstance(value, str):
+                lowered = value.lower()
+                value = True if lowered in TRUE_VALUES else False if lowered in FALSE_VALUES else value
+            setattr(instance, field.attname, value)
+        if isinstance(instance, Program):
+            instance.sync_price()
+        try:
+            instance.full_clean(exclude=list(related), validate_unique=False, validate_constraints=False)
+        except ValidationError as exc:
+            self.report.error(location, _messages(exc))
+            return None
+        return instance, columns
+
+    def _upsert(self, model, kind, items, update_fields) -> List[models.Model]:
+        """bulk_create the rows as upserts on the primary key; failing rows are retried alone and reported."""
+        instances = [instance for _, instance in items]
+        options = (
+            {"update_conflicts": True, "unique_fields": ["id"], "update_fields": update_fields}
+            if update_fields else {"ignore_conflicts": True}
+        )
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(instances, **options)
+            return instances
+        except DatabaseError:
+            logger.warning("Bulk %s upsert failed; retrying %s rows one by one", kind, len(items))
+        saved = []
+        for location, instance in items:
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create([instance], **options)
+                saved.append(instance)
+            except DatabaseError as exc:
+                self.report.error(location, str(exc))
+        return saved
+
+    def _write_objects(self, model, kind, rows):
+        built = []
+        for location, values, related in rows:
+            result = self._instance(model, kind, location, values, related)
+            if result is not None:
+                built.append((location, *result))
+        built = self._assign_ids(model, kind, built)
+        if not built:
+            return []
+
+        existing = set(model.objects.filter(pk__in=[instance.pk for _, instance, _ in built]).values_list("pk", flat=True))
+        groups = defaultdict(list)
+        for location, instance, columns in built:
+            groups[columns].append((location, instance))
+        saved = []
+        for columns, items in groups.items():
+            update_fields = [column for column in columns if column != "id"]
+            if kind == "program" and any(column in PRICE_COLUMNS for column in columns):
+                update_fields += [column for column in PRICE_COLUMNS if column not in update_fields]
+            if kind == "event" and update_fields:
+                update_fields.append("updated_at")
+            saved += self._upsert(model, kind, items, update_fields)
+        for instance in saved:
+            self.report.count(kind, "updated" if instance.pk in existing else "created")
+        return saved
+
+    def _match_existing(self, model, kind, built) -> None:
+        """
+        Point rows without an ID at the existing row with the same natural
+        key (NATURAL_KEYS), so re-importing a sheet updates instead of
+        duplicating. Keys matching several rows are left to create new ones.
+        """
+        keys = NATURAL_KEYS[kind]
+        pending = [(location, instance) for location, instance, _ in built if instance._pk_generated]
+        if not pending:
+            return
+        matches = defaultdict(list)
+        for pk, *key in model.objects.filter(title__in={instance.title for _, instance in pending}).values_list("pk", *keys):
+            matches[tuple(key)].append(pk)
+        for location, instance in pending:
+            found = matches.get(tuple(getattr(instance, key) for key in keys), ())
+            if len(found) == 1:
+                instance.pk, instance._pk_generated = found[0], False
+
+    def _assign_ids(self, model, kind, built):
+        """
+        Reject rows repeating an ID from earlier in the import, and give rows
+        without one a fresh ID that is unused both in this import and in the
+        database (thousands of IDs generated in the same second can collide).
+        """
+        self._match_existing(model, kind, built)
+        seen = self.seen[kind]
+        kept = []
+        for location, instance, columns in built:
+            if instance.pk in seen:
+                if instance._pk_generated:
+                    instance.pk = self._fresh_id(seen)
+                else:
+                    self.report.error(location, f"{instance.pk} was already imported from {seen[instance.pk]}")
+                    continue
+            seen[instance.pk] = location
+            kept.append((location, instance, columns))
+
+        generated = [instance for _, instance, _ in kept if instance._pk_generated]
+        while generated:
+            taken = set(model.objects.filter(pk__in=[instance.pk for instance in generated]).values_list("pk", flat=True))
+            generated = [instance for instance in generated if instance.pk in taken]
+            for instance in generated:
+                instance.pk = self._fresh_id(seen, location=seen.pop(instance.pk))
+        return kept
+
+    @staticmethod
+    def _fresh_id(seen, location=None):
+        while True:
+            pk = generate_unique_id()
+            if pk not in seen:
+                if location is not None:
+                    seen[pk] = location
+                return pk
+
+    # -- Kinds --
+
+    def _write_events(self, rows):
+        saved = self._write_objects(Event, "event", [(location, values, None) for location, values in rows])
+        if saved:
+            self.events_changed = True
+            search.index_objects(saved)
+
+    def _write_programs(self, rows):
+        resolved = []
+        for location, values in rows:
+            category = values.get("category")
+            category_id = self.categories.get(str(category or "").strip().lower())
+            if category_id is None:
+                self.report.error(location, f"category: unknown program category {category!r}")
+                continue
+            resolved.append((location, values, {"category": category_id}))
+        saved = self._write_objects(Program, "program", resolved)
+        if saved:
+            search.index_objects(saved)
+
+    def _write_features(self, rows):
+        references = {str(values.get("program") or "").strip() for _, values in rows} - {""}
+        by_pk, by_title = set(), defaultdict(list)
+        for pk, title in Program.objects.filter(Q(pk__in=references) | Q(title__in=references)).values_list("pk", "title"):
+            by_pk.add(pk)
+            by_title[title].append(pk)
+
+        features, keys = [], set()
+        for location, values in rows:
+            reference = str(values.get("program") or "").strip()
+            if reference in by_pk:
+                program_id = reference
+            elif len(by_title.get(reference, ())) == 1:
+                program_id = by_title[reference][0]
+            else:
+                problem = "matches several programs; use the program id" if by_title.get(reference) else "no such program"
+                self.report.error(location, f"program: {reference!r} {problem}")
+                continue
+            result = self._instance(ProgramFeature, "feature", location, values, {"program": program_id})
+            if result is None:
+                continue
+            feature = result[0]
+            key = (program_id, feature.description)
+            if key in keys:
+                self.report.count("feature", "unchanged")
+                continue
+            keys.add(key)
+            features.append(feature)
+        if not features:
+            return
+
+        existing = set(
+            ProgramFeature.objects.filter(
+                program_id__in={program_id for program_id, _ in keys},
+                description__in={description for _, description in keys},
+            ).values_list("program_id", "description")
+        )
+        # Features have no columns besides their unique key, so an upsert is an insert-or-skip
+        ProgramFeature.objects.bulk_create(features, ignore_conflicts=True)
+        created = len(keys - existing)
+        self.report.count("feature", "created", created)
+        self.report.count("feature", "unchanged", len(features) - created)
+
+
+def import_rows(rows: Iterable[Row], kind: Optional[str] = None, chunk_size: int = CHUNK_SIZE,
+                dry_run: bool = False) -> ImportReport:
+    """
+    Validate and upsert catalogue rows chunk by chunk. Each row's kind comes
+    from its "kind" column, else its sheet name, else `kind`. Invalid rows
+    are reported in the ImportReport and skipped; the rest are saved.
+    """
+    report = ImportReport(dry_run=dry_run)
+    started = time.perf_counter()
+    # Chunks commit as they go; a dry run holds them in one transaction and rolls back
+    with transaction.atomic() if dry_run else nullcontext():
+        importer = _Importer(report)
+        chunk = []
+        for location, sheet, values in rows:
+            if all(_blank(value) for value in values.values()):
+                continue
+            report.rows += 1
+            row_kind = _kind(values.pop("kind", None)) or _kind(sheet) or _kind(kind)
+            if row_kind is None:
+                report.error(location, "kind: use event, program or feature")
+                continue
+            chunk.append((location, row_kind, values))
+            if len(chunk) >= chunk_size:
+                importer.write(chunk)
+                chunk = []
+        if chunk:
+            importer.write(chunk)
+        if dry_run:
+            transaction.set_rollback(True)
+    if importer.events_changed and not dry_run:
+        upcoming_events.invalidate()
+    report.elapsed = time.perf_counter() - started
+    logger.info("Catalogue import: %s", report.summary())
+    return report
+
+
+def import_file(fileobj, filename: str, **options) -> ImportReport:
+    """import_rows for an uploaded or opened (binary) CSV/XLSX file."""
+    return import_rows(read_rows(fileobj, filename), **options)
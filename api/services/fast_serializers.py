@@ -0,0 +1,79 @@
+# api/services/fast_serializers.py
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from rest_framework import serializers
+
+from ..serializers import (
+    EventSerializer, GalleryCategorySerializer, TestimonialSerializer, variants_srcset,
+)
+
+# Fields whose to_representation() returns database values unchanged
+IDENTITY_REPRESENTATIONS = {
+    serializers.CharField.to_representation,
+    serializers.ChoiceField.to_representation,
+    serializers.BooleanField.to_representation,
+    serializers.IntegerField.to_representation,
+}
+
+Computed = Dict[str, Tuple[Sequence[str], Callable[[Dict[str, Any], Dict[str, Any]], Any]]]
+
+
+class ValuesListSerializer:
+    """
+    Renders `serializer_class(queryset, many=True).data` from `.values()` rows
+    instead of model instances.
+
+    The serializer's fields are bound once per call and turned into a plan of
+    (name, column, mapper): identity fields are copied straight from the row,
+    the rest reuse the DRF field's own to_representation(), so the output is
+    the same as the serializer's. SerializerMethodFields must be listed in
+    `computed` as {name: (columns, func(row, context))}.
+    Only flat serializers whose sources are plain model columns are supported.
+    """
+
+    def __init__(self, serializer_class, computed: Optional[Computed] = None):
+        self.serializer_class = serializer_class
+        self.computed = computed or {}
+
+    def _plan(self, context):
+        fields = self.serializer_class(context=context).fields
+        plan: List[tuple] = []
+        columns: List[str] = []
+        for name, field in fields.items():
+            if field.write_only:
+                continue
+            if name in self.computed:
+                needed, func = self.computed[name]
+                columns.extend(needed)
+                plan.append((name, None, None, func))
+                continue
+            if isinstance(field, serializers.SerializerMethodField) or "." in field.source:
+                raise ValueError(f"{self.serializer_class.__name__}.{name} needs an entry in `computed`")
+            mapper = None if type(field).to_representation in IDENTITY_REPRESENTATIONS else field.to_representation
+            columns.append(field.source)
+            plan.append((name, field.source, mapper, None))
+        return plan, list(dict.fromkeys(columns))
+
+    def render(self, queryset, context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        context = context or {}
+        plan, columns = self._plan(context)
+        data = []
+        for row in queryset.values(*columns).iterator(chunk_size=2000):
+            item = {}
+            for name, column, mapper, func in plan:
+                if func is not None:
+                    item[name] = func(row, context)
+                    continue
+                value = row[column]
+                item[name] = value if mapper is None or value is None else mapper(value)
+            data.append(item)
+        return data
+
+
+def _srcset(row, context):
+    return variants_srcset(row["image_variants"], context.get("request"))
+
+
+EVENTS = ValuesListSerializer(EventSerializer, {"image_srcset": (["image_variants"], _srcset)})
+TESTIMONIALS = ValuesListSerializer(TestimonialSerializer, {"logo_srcset": (["image_variants"], _srcset)})
+GALLERY_CATEGORIES = ValuesListSerializer(GalleryCategorySerializer)
@@ -0,0 +1,113 @@
+# api/services/gallery_upload.py
+import logging
+import os
+import zipfile
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from PIL import Image, UnidentifiedImageError
+
+from ..models import GalleryItem
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+_DEFAULTS = {
+    "MAX_FILES": 1000,
+    "MAX_ARCHIVE_BYTES": 4 * 1024 ** 3,  # uncompressed total, guards against zip bombs
+    "BATCH_SIZE": 200,
+}
+
+
+def get_config() -> Dict[str, Any]:
+    return {**_DEFAULTS, **getattr(settings, "GALLERY_BULK_UPLOAD", {})}
+
+
+def _is_image(fileobj) -> bool:
+    """Header check with Pillow; verify() reads the file but never decodes pixels."""
+    try:
+        with Image.open(fileobj) as image:
+            image.verify()
+        return True
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+        return False
+    finally:
+        fileobj.seek(0)
+
+
+def _store(content, filename: str) -> str:
+    """Stream one file into gallery storage in chunks and return the stored name."""
+    field = GalleryItem._meta.get_field("image")
+    name = field.generate_filename(None, filename)
+    return field.storage.save(name, content, max_length=field.max_length)
+
+
+def _archive_members(archive, config) -> Iterable[zipfile.ZipInfo]:
+    with zipfile.ZipFile(archive) as zf:
+        members = [
+            info for info in zf.infolist()
+            if not info.is_dir()
+            and not os.path.basename(info.filename).startswith(".")
+            and "__MACOSX" not in info.filename
+        ]
+        total = sum(info.file_size for info in members)
+        if total > config["MAX_ARCHIVE_BYTES"]:
+            raise ValueError(f"Archive expands to {total} bytes, over the {config['MAX_ARCHIVE_BYTES']} byte limit.")
+        for info in members:
+            yield zf, info
+
+
+def bulk_upload(category, files: Iterable = (), archive=None) -> Dict[str, Any]:
+    """
+    Store uploaded photos and/or the photos in a ZIP archive for a gallery
+    category, then create all GalleryItem rows with one bulk_create.
+    Files are streamed to storage chunk by chunk (uploads Django spooled to a
+    temp file are moved, not copied). Variants are left pending for
+    `manage.py process_images`.
+    Returns {"created": [GalleryItem], "rejected": [(filename, reason)]}.
+    """
+    config = get_config()
+    stored: List[str] = []
+    rejected: List[tuple] = []
+
+    def accept(content, filename: str) -> Optional[str]:
+        if len(stored) >= config["MAX_FILES"]:
+            rejected.append((filename, f"over the {config['MAX_FILES']} file limit"))
+            return None
+        if os.path.splitext(filename)[1].lower() not in IMAGE_EXTENSIONS:
+            rejected.append((filename, "not an image file type"))
+            return None
+        if not _is_image(content):
+            rejected.append((filename, "not a valid image"))
+            return None
+        name = _store(content, filename)
+        stored.append(name)
+        return name
+
+    try:
+        for upload in files:
+            accept(upload, upload.name)
+
+        if archive is not None:
+            for zf, info in _archive_members(archive, config):
+                filename = os.path.basename(info.filename)
+                with zf.open(info) as member:
+                    accept(File(member, name=filename), filename)
+
+        with transaction.atomic():
+            created = GalleryItem.objects.bulk_create(
+                [GalleryItem(category=category, image=name) for name in stored],
+                batch_size=config["BATCH_SIZE"],
+            )
+    except Exception:
+        # Don't leave orphaned files behind when the batch fails
+        storage = GalleryItem._meta.get_field("image").storage
+        for name in stored:
+            storage.delete(name)
+        raise
+
+    logger.info("Bulk gallery upload to %s: %s created, %s rejected", category, len(created), len(rejected))
+    return {"created": created, "rejected": rejected}
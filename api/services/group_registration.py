@@ -0,0 +1,201 @@
+# api/services/group_registration.py
+import logging
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework import status
+
+from ..models import Event, EventRegistration, Payment, ProgramPayment, ProgramRegistration, generate_unique_id
+from ..serializers import EventAttendeeSerializer, ProgramAttendeeSerializer
+from . import rollups
+
+logger = logging.getLogger(__name__)
+
+# Registrations holding a seat, as in Event.available_spots
+SEAT_STATUSES = ("pending", "confirmed")
+
+
+class GroupRegistrationError(ValueError):
+    """A group registration that was rejected as a whole; nothing was written."""
+
+    def __init__(self, message, errors=None, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(message)
+        self.errors = errors
+        self.status_code = status_code
+
+    def as_response_data(self) -> Dict[str, object]:
+        data = {"error": str(self)}
+        if self.errors is not None:
+            data["attendees"] = self.errors
+        return data
+
+
+def new_group_reference() -> str:
+    return f"GRP-{generate_unique_id()}"
+
+
+def team_size(seats: int) -> str:
+    """The ProgramRegistration.TEAM_SIZE_CHOICES bucket for a group of `seats`."""
+    if seats <= 5:
+        return "1-5"
+    if seats <= 10:
+        return "5-10"
+    if seats <= 20:
+        return "10-20"
+    return "20+"
+
+
+def attendees_from(data):
+    """The attendee list of a request body; anything but an object is rejected."""
+    if not isinstance(data, dict):
+        raise GroupRegistrationError("Request body must be an object with an 'attendees' list")
+    return data.get("attendees")
+
+
+def _validate(serializer_class, attendees) -> List[dict]:
+    """
+    Validate every attendee in one pass and reject the group if any row is
+    invalid or an email appears twice; errors are reported per attendee.
+    """
+    limit = settings.GROUP_REGISTRATION_MAX_SIZE
+    if not isinstance(attendees, list) or not attendees:
+        raise GroupRegistrationError("'attendees' must be a non-empty list")
+    if len(attendees) > limit:
+        raise GroupRegistrationError(f"A group registration takes at most {limit} attendees")
+
+    serializer = serializer_class(data=attendees, many=True)
+    if not serializer.is_valid():
+        raise GroupRegistrationError("Invalid attendees", errors=serializer.errors)
+    rows = serializer.validated_data
+
+    seen = {}
+    errors = [{} for _ in rows]
+    for index, row in enumerate(rows):
+        email = row["email"].lower()
+        if email in seen:
+            errors[index] = {"email": [f"Duplicate of attendee {seen[email] + 1}"]}
+        seen.setdefault(email, index)
+    if any(errors):
+        raise GroupRegistrationError("Duplicate attendee emails", errors=errors)
+    return rows
+
+
+def _reject_registered(model, rows, **target) -> None:
+    """One query for every attendee already registered (event, email is unique)."""
+    existing = {
+        email.lower()
+        for email in model.objects.filter(email__in=[row["email"] for row in rows], **target)
+        .values_list("email", flat=True)
+    }
+    if existing:
+        errors = [
+            {"email": ["Already registered"]} if row["email"].lower() in existing else {}
+            for row in rows
+        ]
+        raise GroupRegistrationError("Some attendees are already registered", errors=errors,
+                                     status_code=status.HTTP_409_CONFLICT)
+
+
+def _bulk_create(model, registrations):
+    try:
+        created = model.objects.bulk_create(registrations)
+    except IntegrityError as exc:
+        # An attendee registered individually between the check and the insert
+        raise GroupRegistrationError("Some attendees are already registered",
+                                     status_code=status.HTTP_409_CONFLICT) from exc
+    # bulk_create skips post_save, which keeps the dashboard rollups current
+    deltas = rollups.Deltas()
+    for registration in created:
+        rollups.registration_created(registration, deltas)
+    deltas.apply()
+    return created
+
+
+def register_event_group(event: Event, attendees) -> Dict[str, object]:
+    """
+    Register `attendees` for `event` in one transaction: seats are checked
+    and taken under a lock on the event row, the registrations are inserted
+    with one bulk_create, and for paid events a single Payment for every
+    seat is attached to the first (lead) attendee.
+    """
+    rows = _validate(EventAttendeeSerializer, attendees)
+    seats = len(rows)
+    if not (event.registration_open and event.status == "open"):
+        raise GroupRegistrationError("Registration is closed for this event")
+    _reject_registered(EventRegistration, rows, event=event)
+
+    with transaction.atomic():
+        # Concurrent group registrations queue here (row lock on Postgres; SQLite
+        # already serialises writers with BEGIN IMMEDIATE), so the count below
+        # can't be overtaken before the insert
+        limit = Event.objects.select_for_update().values_list("participants_limit", flat=True).get(pk=event.pk)
+        taken = EventRegistration.objects.filter(event=event, registration_status__in=SEAT_STATUSES).count()
+        available = max(0, limit - taken)
+        if seats > available:
+            raise GroupRegistrationError(
+                f"Only {available} spot(s) left for {seats} attendee(s)",
+                status_code=status.HTTP_409_CONFLICT,
+            )
+
+        reference = new_group_reference()
+        registration_status = "confirmed" if event.is_free else "pending"
+        registrations = _bulk_create(EventRegistration, [
+            EventRegistration(event=event, group_reference=reference, registration_status=registration_status, **row)
+            for row in rows
+        ])
+
+        payment = None
+        lead = registrations[0]
+        if not event.is_free:
+            payment = Payment.objects.create(
+                registration=lead,
+                amount=(event.investment_amount or 0) * seats,
+                currency=event.currency,
+                payment_method="pesapal",
+                customer_email=lead.email,
+                customer_phone=lead.phone,
+                description=f"Group registration ({seats} seats): {event.title}",
+            )
+
+    logger.info("Group %s: %s registrations for event %s", reference, seats, event.pk)
+    return {"group_reference": reference, "registrations": registrations, "payment": payment}
+
+
+def register_program_group(program, attendees) -> Dict[str, object]:
+    """
+    Register `attendees` for `program` with one bulk_create and a single
+    ProgramPayment for every seat on the first (lead) attendee; free
+    programs need no payment. Programs have no seat limit.
+    """
+    rows = _validate(ProgramAttendeeSerializer, attendees)
+    seats = len(rows)
+    if program.price_amount is None:
+        raise GroupRegistrationError(
+            f"Program price {program.price!r} has no structured amount; group registration needs one"
+        )
+
+    with transaction.atomic():
+        reference = new_group_reference()
+        size = team_size(seats)
+        registrations = _bulk_create(ProgramRegistration, [
+            ProgramRegistration(program=program, group_reference=reference, team_size=size,
+                                has_paid=not program.price_amount, **row)
+            for row in rows
+        ])
+
+        payment: Optional[ProgramPayment] = None
+        lead = registrations[0]
+        if program.price_amount:
+            payment = ProgramPayment.objects.create(
+                registration=lead,
+                amount=program.price_amount * seats,
+                currency=program.price_currency,
+                payment_method="pesapal",
+                customer_email=lead.email,
+                customer_phone=lead.phone_number,
+                description=f"Group registration ({seats} seats): {program.title}",
+            )
+
+    logger.info("Group %s: %s registrations for program %s", reference, seats, program.pk)
+    return {"group_reference": reference, "registrations": registrations, "payment": payment}
@@ -0,0 +1,196 @@
+# api/services/image_derivatives.py
+import hashlib
+import io
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Which file field carries the source image on each model with derivatives
+IMAGE_FIELDS = {
+    "TeamMember": "image",
+    "GalleryItem": "image",
+    "Testimonial": "logo",
+    "Event": "image",
+}
+
+_DEFAULTS = {
+    "WIDTHS": [320, 640, 1280],
+    "FORMATS": ["webp", "jpeg"],
+    "QUALITY": 80,
+    "GENERATE_ON_SAVE": True,
+}
+
+_EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+
+def get_config() -> Dict[str, Any]:
+    return {**_DEFAULTS, **getattr(settings, "IMAGE_DERIVATIVES", {})}
+
+
+def config_fingerprint(config: Dict[str, Any]) -> str:
+    """Identifies the settings variants were rendered with, so a change re-renders them."""
+    widths = ",".join(str(width) for width in sorted(config["WIDTHS"]))
+    return f"{widths}|{','.join(config['FORMATS'])}|q{config['QUALITY']}"
+
+
+def image_field_name(instance) -> str:
+    return IMAGE_FIELDS[type(instance).__name__]
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def derivative_name(source_name: str, width: int, fmt: str) -> str:
+    """`gallery/photo.jpg` -> `gallery/photo_w640.webp`, next to the original."""
+    stem, _ = os.path.splitext(source_name)
+    return f"{stem}_w{width}.{_EXTENSIONS[fmt]}"
+
+
+def render_derivatives(data: bytes, widths: List[int], formats: List[str], quality: int) -> Dict[str, Any]:
+    """
+    Resize and transcode one source image. Pure Pillow, no Django or storage
+    access, so it can run in a worker process.
+    Returns the source size and a list of (width, format, bytes) variants;
+    widths larger than the source collapse to a single source-width variant.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image.load()
+    src_width, src_height = image.size
+
+    targets = sorted({min(width, src_width) for width in widths})
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+
+    variants = []
+    for width in targets:
+        height = max(1, round(src_height * width / src_width))
+        resized = image if width == src_width else image.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt in formats:
+            buffer = io.BytesIO()
+            if fmt == "webp":
+                resized.convert("RGBA" if has_alpha else "RGB").save(buffer, "WEBP", quality=quality, method=4)
+            elif fmt == "jpeg":
+                rgb = resized
+                if has_alpha:
+                    rgb = Image.new("RGB", resized.size, (255, 255, 255))
+                    rgb.paste(resized.convert("RGBA"), mask=resized.convert("RGBA").getchannel("A"))
+                rgb.convert("RGB").save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+            else:
+                raise ValueError(f"Unsupported derivative format: {fmt}")
+            variants.append((width, fmt, buffer.getvalue()))
+
+    return {"width": src_width, "height": src_height, "variants": variants}
+
+
+def store_derivatives(instance, source_name: str, digest: str, rendered: Dict[str, Any]) -> Dict[str, Any]:
+    """Write rendered variants next to the source and record them on the row."""
+    field = getattr(instance, image_field_name(instance))
+    storage = field.storage
+
+    delete_derivatives(instance)
+    files = []
+    for width, fmt, content in rendered["variants"]:
+        name = storage.save(derivative_name(source_name, width, fmt), ContentFile(content))
+        files.append({"width": width, "format": fmt, "name": name})
+
+    variants = {
+        "source": source_name,
+        "hash": digest,
+        "config": config_fingerprint(get_config()),
+        "width": rendered["width"],
+        "height": rendered["height"],
+        "files": files,
+    }
+    _save_variants(instance, variants)
+    return variants
+
+
+def delete_derivatives(instance):
+    field = getattr(instance, image_field_name(instance))
+    for entry in (instance.image_variants or {}).get("files", []):
+        try:
+            field.storage.delete(entry["name"])
+        except Exception:
+            logger.debug("Could not delete derivative %s", entry.get("name"))
+
+
+def generate_derivatives(instance) -> Optional[Dict[str, Any]]:
+    """
+    Build all configured variants for the instance's image in-process.
+    Clears the recorded variants when the image has been removed.
+    """
+    field = getattr(instance, image_field_name(instance))
+    if not field:
+        if instance.image_variants:
+            delete_derivatives(instance)
+            _save_variants(instance, {})
+        return None
+
+    with field.open("rb") as source:
+        data = source.read()
+
+    config = get_config()
+    rendered = render_derivatives(data, config["WIDTHS"], config["FORMATS"], config["QUALITY"])
+    return store_derivatives(instance, field.name, content_hash(data), rendered)
+
+
+def is_current(instance, digest: str) -> bool:
+    """
+    True when the recorded variants were rendered from content with this hash,
+    using the current settings, and all their files still exist.
+    """
+    variants = instance.image_variants or {}
+    if variants.get("hash") != digest or variants.get("config") != config_fingerprint(get_config()):
+        return False
+    storage = getattr(instance, image_field_name(instance)).storage
+    return all(storage.exists(entry["name"]) for entry in variants.get("files", []))
+
+
+def mark_source(instance, source_name: str):
+    """Point current variants at a renamed source with identical content."""
+    _save_variants(instance, {**instance.image_variants, "source": source_name})
+
+
+def mark_failed(instance, source_name: str, digest: Optional[str], error: str):
+    """
+    Record that no variants can be built from this source (unreadable or not
+    an image), so `process_images` skips it until the image is replaced.
+    """
+    delete_derivatives(instance)
+    _save_variants(instance, {"source": source_name, "hash": digest, "failed": error})
+
+
+def needs_derivatives(instance) -> bool:
+    """True when the image changed since its variants were last generated."""
+    field = getattr(instance, image_field_name(instance))
+    recorded = (instance.image_variants or {}).get("source")
+    if not field:
+        return bool(instance.image_variants)
+    return recorded != field.name
+
+
+def _save_variants(instance, variants: Dict[str, Any]):
+    # Queryset update: no save() signals, no auto_now bumps
+    type(instance)._default_manager.filter(pk=instance.pk).update(image_variants=variants)
+    instance.image_variants = variants
+
+
+def srcset(variants: Optional[Dict[str, Any]], url_for) -> Optional[Dict[str, str]]:
+    """
+    `{"webp": "<url> 320w, <url> 640w", "jpeg": ...}` from recorded variants,
+    or None when none have been generated yet. url_for maps a storage name to a URL.
+    """
+    files = (variants or {}).get("files")
+    if not files:
+        return None
+    candidates: Dict[str, List[str]] = {}
+    for entry in sorted(files, key=lambda item: item["width"]):
+        candidates.setdefault(entry["format"], []).append(f"{url_for(entry['name'])} {entry['width']}w")
+    return {fmt: ", ".join(items) for fmt, items in candidates.items()}
@@ -0,0 +1,293 @@
+# payments/pesapal_emulator.py
+import json
+import logging
+import random
+import secrets
+import threading
+import time
+import uuid
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# PesaPal status codes returned by GetTransactionStatus
+STATUS_INVALID = 0
+STATUS_COMPLETED = 1
+STATUS_FAILED = 2
+STATUS_REVERSED = 3
+
+_STATUS_DESCRIPTIONS = {
+    STATUS_INVALID: "INVALID",
+    STATUS_COMPLETED: "Completed",
+    STATUS_FAILED: "Failed",
+    STATUS_REVERSED: "Reversed",
+}
+
+
+class PesaPalEmulator:
+    """
+    Local stand-in for the PesaPal v3 API, for load tests and offline development.
+
+    Implements RequestToken, RegisterIPN, SubmitOrderRequest, GetTransactionStatus
+    and ConfirmTransaction with the same response shapes PesaPalService expects.
+    Any path prefix is accepted, so BASE_URL can keep its `/pesapalv3` suffix.
+
+    - latency_ms / jitter_ms: artificial delay added to every response
+    - failure_rate: fraction (0..1) of requests answered with HTTP 500
+    - completion_status: status_code reported for submitted orders
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        failure_rate: float = 0.0,
+        completion_status: int = STATUS_COMPLETED,
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.completion_status = completion_status
+        self.random = random.Random(seed)
+
+        self.tokens = set()
+        self.ipns: Dict[str, str] = {}
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.request_counts: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+        handler = type("PesaPalEmulatorHandler", (_EmulatorRequestHandler,), {"emulator": self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/pesapalv3"
+
+    def start(self):
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="pesapal-emulator", daemon=True)
+        self._thread.start()
+        logger.info("PesaPal emulator listening on %s", self.base_url)
+        return self
+
+    def serve_forever(self):
+        """Serve requests on the calling thread until interrupted."""
+        logger.info("PesaPal emulator listening on %s", self.base_url)
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # -------------------------
+    # Behaviour knobs
+    # -------------------------
+    def _delay(self):
+        delay_ms = self.latency_ms
+        if self.jitter_ms:
+            delay_ms += self.random.uniform(0, self.jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+
+    def _should_fail(self) -> bool:
+        if self.failure_rate <= 0:
+            return False
+        with self.lock:
+            return self.random.random() < self.failure_rate
+
+    def _count(self, endpoint: str):
+        with self.lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+    # -------------------------
+    # Endpoints
+    # -------------------------
+    def request_token(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        if not body.get("consumer_key") or not body.get("consumer_secret"):
+            return 401, _error("invalid_consumer_key_or_secret_provided", "Invalid consumer key or secret")
+        token = secrets.token_urlsafe(32)
+        with self.lock:
+            self.tokens.add(token)
+        return 200, {
+            "token": token,
+            "expiryDate": (timezone.now() + timedelta(minutes=5)).isoformat(),
+            "error": None,
+            "status": "200",
+            "message": "Request processed successfully",
+        }
+
+    def register_ipn(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        url = body.get("url")
+        if not url:
+            return 400, _error("invalid_ipn_url", "IPN url is required")
+        with self.lock:
+            ipn_id = self.ipns.get(url)
+            if ipn_id is None:
+                ipn_id = str(uuid.uuid4())
+                self.ipns[url] = ipn_id
+        return 200, {
+            "url": url,
+            "created_date": timezone.now().isoformat(),
+            "ipn_id": ipn_id,
+            "notification_type": 1 if body.get("ipn_notification_type") == "GET" else 2,
+            "ipn_notification_type_description": body.get("ipn_notification_type", "POST"),
+            "ipn_status": 1,
+            "ipn_status_description": "Active",
+            "error": None,
+            "status": "200",
+        }
+
+    def submit_order(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        merchant_reference = body.get("id")
+        if not merchant_reference or body.get("amount") in (None, ""):
+            return 400, _error("invalid_order", "Order id and amount are required")
+        order_tracking_id = str(uuid.uuid4())
+        with self.lock:
+            self.orders[order_tracking_id] = {
+                "merchant_reference": merchant_reference,
+                "amount": body.get("amount"),
+                "currency": body.get("currency", "KES"),
+                "description": body.get("description", ""),
+                "callback_url": body.get("callback_url"),
+                "phone_number": (body.get("billing_address") or {}).get("phone_number", ""),
+                "created_date": timezone.now().isoformat(),
+            }
+        return 200, {
+            "order_tracking_id": order_tracking_id,
+            "merchant_reference": merchant_reference,
+            "redirect_url": f"{self.base_url}/iframe?OrderTrackingId={order_tracking_id}",
+            "error": None,
+            "status": "200",
+        }
+
+    def transaction_status(self, order_tracking_id: Optional[str]) -> Tuple[int, Dict[str, Any]]:
+        with self.lock:
+            order = self.orders.get(order_tracking_id)
+        if order is None:
+            return 404, _error("order_not_found", "Order tracking id not found")
+        status_code = self.completion_status
+        return 200, {
+            "payment_method": "MpesaKE",
+            "amount": order["amount"],
+            "created_date": order["created_date"],
+            "confirmation_code": f"EMU{order_tracking_id[:8].upper()}" if status_code == STATUS_COMPLETED else "",
+            "payment_status_description": _STATUS_DESCRIPTIONS.get(status_code, "INVALID"),
+            "description": order["description"],
+            "message": "Request processed successfully",
+            "payment_account": order["phone_number"],
+            "call_back_url": order["callback_url"],
+            "status_code": status_code,
+            "merchant_reference": order["merchant_reference"],
+            "payment_status_code": "",
+            "currency": order["currency"],
+            "error": {"error_type": None, "code": None, "message": None, "call_back_url": None},
+            "status": "200",
+        }
+
+
+def _error(code: str, message: str) -> Dict[str, Any]:
+    return {"error": {"error_type": "api_error", "code": code, "message": message}, "status": "500"}
+
+
+class _EmulatorRequestHandler(BaseHTTPRequestHandler):
+    emulator: PesaPalEmulator = None
+    protocol_version = "HTTP/1.1"
+
+    _POST_ROUTES = {
+        "/api/Auth/RequestToken": "RequestToken",
+        "/api/URLSetup/RegisterIPN": "RegisterIPN",
+        "/api/Transactions/SubmitOrderRequest": "SubmitOrderRequest",
+        "/api/Transactions/ConfirmTransaction": "ConfirmTransaction",
+    }
+    _GET_ROUTES = {
+        "/api/Transactions/GetTransactionStatus": "GetTransactionStatus",
+    }
+
+    def log_message(self, format, *args):
+        logger.debug("PesaPal emulator: " + format, *args)
+
+    def _route(self, routes) -> Optional[str]:
+        path = urlparse(self.path).path.rstrip("/")
+        for suffix, endpoint in routes.items():
+            if path.endswith(suffix):
+                return endpoint
+        return None
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _authorized(self) -> bool:
+        auth = self.headers.get("Authorization", "")
+        token = auth[len("Bearer "):] if auth.startswith("Bearer ") else None
+        with self.emulator.lock:
+            return token in self.emulator.tokens
+
+    def _send(self, status_code: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self, endpoint: Optional[str], handle):
+        emulator = self.emulator
+        if endpoint is None:
+            self._send(404, _error("not_found", f"No emulated endpoint for {self.path}"))
+            return
+        emulator._count(endpoint)
+        emulator._delay()
+        if emulator._should_fail():
+            self._send(500, _error("emulated_failure", f"Emulated {endpoint} failure"))
+            return
+        if endpoint != "RequestToken" and not self._authorized():
+            self._send(401, _error("invalid_access_token", "Invalid or expired access token"))
+            return
+        self._send(*handle())
+
+    def do_POST(self):
+        endpoint = self._route(self._POST_ROUTES)
+        body = self._read_json()
+        emulator = self.emulator
+
+        def handle():
+            if endpoint == "RequestToken":
+                return emulator.request_token(body)
+            if endpoint == "RegisterIPN":
+                return emulator.register_ipn(body)
+            if endpoint == "SubmitOrderRequest":
+                return emulator.submit_order(body)
+            return emulator.transaction_status(body.get("orderTrackingId"))
+
+        self._dispatch(endpoint, handle)
+
+    def do_GET(self):
+        endpoint = self._route(self._GET_ROUTES)
+        params = parse_qs(urlparse(self.path).query)
+        order_tracking_id = (params.get("orderTrackingId") or [None])[0]
+        self._dispatch(endpoint, lambda: self.emulator.transaction_status(order_tracking_id))
@@ -322,12 +322,7 @@ class PesaPalService:
             redirect_url = order_response.get("redirect_url", "")
 
             # keep original field names you used
-            payment.pesapal_order_tracking_id = pesapal_tracking_id
-            payment.pesapal_merchant_reference = merchant_reference
-            payment.pesapal_payment_url = redirect_url
-            payment.payment_status = "initiated"
-            payment.payment_initiated_at = timezone.now()
-            payment.save()
+            payment.mark_as_initiated(pesapal_tracking_id, redirect_url, merchant_reference=merchant_reference)
             logger.debug("Payment updated: tracking_id=%s merchant_reference=%s", pesapal_tracking_id, merchant_reference)
         except Exception:
             logger.exception("Failed to update payment success for merchant_reference=%s", merchant_reference)
@@ -338,12 +333,12 @@ class PesaPalService:
         Keeps same fields and behavior as original.
         """
         try:
-            payment.pesapal_order_tracking_id = None
-            payment.pesapal_merchant_reference = merchant_reference
-            payment.pesapal_payment_url = ""
-            payment.payment_status = "failed"
-            payment.payment_initiated_at = timezone.now()
-            payment.save()
+            payment.mark_as_failed(
+                pesapal_order_tracking_id=None,
+                pesapal_merchant_reference=merchant_reference,
+                pesapal_payment_url="",
+                payment_initiated_at=timezone.now(),
+            )
             logger.info("Payment saved with fallback (error=%s) merchant_reference=%s", error_type, merchant_reference)
         except Exception:
             logger.exception("Failed to update payment fallback for merchant_reference=%s", merchant_reference)
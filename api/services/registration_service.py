@@ -0,0 +1,229 @@
+# api/services/registration_service.py
+import logging
+import time
+from typing import Dict, Iterator, List
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from ..models import EventRegistration, Payment, ProgramPayment, ProgramRegistration
+from . import rollups
+
+logger = logging.getLogger(__name__)
+
+# Payments still open when their registration is cancelled
+OPEN_PAYMENT_STATUSES = ("pending", "initiated")
+# Primary keys per UPDATE ... WHERE pk IN (...), below SQLite's bound-parameter limit
+BATCH_SIZE = 900
+
+
+def _batches(ids: List) -> Iterator[List]:
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
+
+
+def _update(model, ids, **values) -> int:
+    return sum(model.objects.filter(pk__in=batch).update(**values) for batch in _batches(ids))
+
+
+def _result(updated: int, started: float, **extra) -> Dict[str, object]:
+    elapsed = time.perf_counter() - started
+    return {
+        "updated": updated,
+        "elapsed": elapsed,
+        "rows_per_second": updated / elapsed if elapsed > 0 else 0.0,
+        **extra,
+    }
+
+
+def describe(result: Dict[str, object], verb: str, noun: str) -> str:
+    """One-line summary of a bulk result for admin messages and logs."""
+    message = f"{verb} {result['updated']} {noun} in {result['elapsed'] * 1000:.0f} ms ({result['rows_per_second']:,.0f} rows/s)"
+    if result.get("emails"):
+        message += f"; {result['emails']} confirmation email(s) queued"
+    return message
+
+
+# ---- Emails ----
+
+def _send_after_commit(messages: List[EmailMultiAlternatives]) -> None:
+    """Send all messages over one SMTP connection once the transaction commits."""
+    if not messages:
+        return
+
+    def send():
+        try:
+            with get_connection() as connection:
+                sent = connection.send_messages(messages)
+            logger.info("Sent %s of %s confirmation emails", sent, len(messages))
+        except Exception:
+            logger.exception("Failed to send %s confirmation emails", len(messages))
+
+    transaction.on_commit(send)
+
+
+def _message(subject, template, context, to) -> EmailMultiAlternatives:
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body=render_to_string(f"emails/{template}.txt", context),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=to,
+    )
+    message.attach_alternative(render_to_string(f"emails/{template}.html", context), "text/html")
+    return message
+
+
+def _rows(model, ids, *fields) -> Iterator[dict]:
+    for batch in _batches(ids):
+        yield from model.objects.filter(pk__in=batch).values(*fields)
+
+
+def _registration_confirmed_messages(registration_ids) -> List[EmailMultiAlternatives]:
+    rows = _rows(
+        EventRegistration, registration_ids,
+        "full_name", "email", "event__title", "event__start_date", "event__location",
+    )
+    return [
+        _message(
+            f"✅ Your registration for {row['event__title']} is confirmed",
+            "event_registration_confirmed",
+            {"name": row["full_name"], "event": row["event__title"],
+             "date": row["event__start_date"], "location": row["event__location"]},
+            [row["email"]],
+        )
+        for row in rows
+    ]
+
+
+def _payment_confirmed_messages(payment_ids) -> List[EmailMultiAlternatives]:
+    rows = _rows(
+        Payment, payment_ids, "amount", "currency", "pesapal_transaction_id", "registration__full_name", "registration__email",
+        "registration__event__title", "registration__event__start_date", "registration__event__location",
+    )
+    return [
+        _message(
+            f"✅ Payment Confirmed for {row['registration__event__title']}",
+            "payment_confirmation",
+            {"name": row["registration__full_name"], "event": row["registration__event__title"],
+             "date": row["registration__event__start_date"], "location": row["registration__event__location"],
+             "amount": row["amount"], "currency": row["currency"], "transaction_id": row["pesapal_transaction_id"]},
+            [row["registration__email"]],
+        )
+        for row in rows
+    ]
+
+
+def _program_payment_confirmed_messages(payment_ids) -> List[EmailMultiAlternatives]:
+    rows = _rows(
+        ProgramPayment, payment_ids, "amount", "currency", "pesapal_transaction_id", "registration__full_name", "registration__email",
+        "registration__program__title", "registration__program__duration",
+    )
+    return [
+        _message(
+            f"✅ Payment Confirmed for {row['registration__program__title']}",
+            "program_payment_confirmation",
+            {"full_name": row["registration__full_name"], "program_title": row["registration__program__title"],
+             "duration": row["registration__program__duration"], "amount": row["amount"], "currency": row["currency"],
+             "transaction_id": row["pesapal_transaction_id"], "support_email": settings.DEFAULT_FROM_EMAIL},
+            [row["registration__email"]],
+        )
+        for row in rows
+    ]
+
+
+# ---- Registration transitions ----
+
+def _set_registration_status(queryset, status):
+    """Move every registration in `queryset` not already in `status` there, one UPDATE per batch."""
+    ids = list(queryset.exclude(registration_status=status).values_list("pk", flat=True))
+    updated = _update(EventRegistration, ids, registration_status=status, updated_at=timezone.now())
+    return ids, updated
+
+
+def confirm_registrations(queryset, notify: bool = True) -> Dict[str, object]:
+    """Confirm event registrations in bulk and queue one confirmation email per newly confirmed registration."""
+    started = time.perf_counter()
+    with transaction.atomic():
+        ids, updated = _set_registration_status(queryset, "confirmed")
+        messages = _registration_confirmed_messages(ids) if notify else []
+        _send_after_commit(messages)
+    return _result(updated, started, emails=len(messages))
+
+
+def cancel_registrations(queryset) -> Dict[str, object]:
+    """Cancel event registrations in bulk; their pending or initiated payments are cancelled too."""
+    started = time.perf_counter()
+    with transaction.atomic():
+        ids, updated = _set_registration_status(queryset, "cancelled")
+        payments = sum(
+            Payment.objects.filter(registration_id__in=batch, payment_status__in=OPEN_PAYMENT_STATUSES)
+            .update(payment_status="cancelled", updated_at=timezone.now())
+            for batch in _batches(ids)
+        )
+    return _result(updated, started, payments=payments)
+
+
+def waitlist_registrations(queryset) -> Dict[str, object]:
+    """Move event registrations to the waiting list in bulk."""
+    started = time.perf_counter()
+    with transaction.atomic():
+        _, updated = _set_registration_status(queryset, "waiting_list")
+    return _result(updated, started)
+
+
+# ---- Payment transitions ----
+
+def mark_cash_payments_completed(queryset, notify: bool = True) -> Dict[str, object]:
+    """
+    Complete the cash payments in a Payment or ProgramPayment queryset with
+    set-based UPDATEs, then confirm their event registrations (or flag
+    program registrations as paid), as Payment.mark_as_completed does row by
+    row. Other methods and already completed payments are left alone.
+    """
+    started = time.perf_counter()
+    model = queryset.model
+    is_event = model is Payment
+    target = "registration__event_id" if is_event else "registration__program_id"
+    now = timezone.now()
+    with transaction.atomic():
+        payments = queryset.filter(payment_method="cash").exclude(payment_status="completed")
+        ids = list(payments.values_list("pk", flat=True))
+        deltas = rollups.Deltas()
+        day = rollups.local_date(now)
+        for batch in _batches(ids):
+            totals = (
+                model.objects.filter(pk__in=batch).values(target, "currency")
+                .annotate(completed=Count("pk"), revenue=Sum("amount")).order_by()
+            )
+            for row in totals:
+                deltas.add(day, "event" if is_event else "program", row[target], row["currency"] or rollups.DEFAULT_CURRENCY,
+                           completed_payments=row["completed"], revenue=row["revenue"])
+
+        updated = _update(model, ids, payment_status="completed", payment_completed_at=now, updated_at=now)
+        for batch in _batches(ids):
+            # The paid registrations plus the rest of their groups (group registrations share one payment)
+            paid = model.objects.filter(pk__in=batch)
+            covered = Q(pk__in=paid.values("registration_id")) | Q(
+                group_reference__in=paid.filter(registration__group_reference__isnull=False).values("registration__group_reference")
+            )
+            if is_event:
+                EventRegistration.objects.filter(covered).exclude(registration_status="confirmed").update(
+                    registration_status="confirmed", updated_at=now,
+                )
+            else:
+                ProgramRegistration.objects.filter(covered, has_paid=False).update(has_paid=True)
+        if not notify:
+            messages = []
+        elif is_event:
+            messages = _payment_confirmed_messages(ids)
+        else:
+            messages = _program_payment_confirmed_messages(ids)
+        # update() skips the post_save signals that maintain the dashboard rollups
+        deltas.apply()
+        _send_after_commit(messages)
+    logger.info("Marked %s cash %s completed", updated, model._meta.verbose_name_plural)
+    return _result(updated, started, emails=len(messages))
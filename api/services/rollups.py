@@ -0,0 +1,215 @@
+# api/services/rollups.py
+import datetime
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from ..models import DailyRollup, Event, EventRegistration, Payment, Program, ProgramPayment, ProgramRegistration
+
+logger = logging.getLogger(__name__)
+
+# (date, kind, object_id, currency) -> {counter: delta}
+Key = Tuple[datetime.date, str, str, str]
+
+# Currency of rows whose event or program has been deleted before the delta
+DEFAULT_CURRENCY = "KES"
+
+
+class Deltas:
+    """Counter changes to apply to DailyRollup rows, grouped by row."""
+
+    def __init__(self):
+        self.rows: Dict[Key, Dict[str, object]] = defaultdict(dict)
+
+    def add(self, day: datetime.date, kind: str, object_id: str, currency: str, **counters) -> None:
+        row = self.rows[(day, kind, str(object_id), currency)]
+        for name, value in counters.items():
+            row[name] = row.get(name, 0) + value
+
+    def apply(self) -> None:
+        """Add the deltas to their rows with one UPDATE per row, creating missing rows."""
+        for (day, kind, object_id, currency), counters in self.rows.items():
+            counters = {name: value for name, value in counters.items() if value}
+            if counters:
+                _increment(day, kind, object_id, currency, counters)
+        self.rows.clear()
+
+
+def _increment(day, kind, object_id, currency, counters) -> None:
+    rows = DailyRollup.objects.filter(date=day, kind=kind, object_id=object_id, currency=currency)
+    updates = {name: F(name) + value for name, value in counters.items()}
+    if rows.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            DailyRollup.objects.create(date=day, kind=kind, object_id=object_id, currency=currency, **counters)
+    except IntegrityError:
+        # Created concurrently between the UPDATE and the INSERT
+        rows.update(**updates)
+
+
+def local_date(value: Optional[datetime.datetime]) -> datetime.date:
+    return timezone.localdate(value) if value else timezone.localdate()
+
+
+# ---- Registrations ----
+
+def _registration_target(registration) -> Tuple[str, str, Optional[datetime.datetime], str]:
+    """(kind, object_id, registered at, the event's or program's current currency)."""
+    if isinstance(registration, EventRegistration):
+        kind, object_id, registered = "event", registration.event_id, registration.registration_date
+        target_model, column = Event, "currency"
+    else:
+        kind, object_id, registered = "program", registration.program_id, registration.registered_at
+        target_model, column = Program, "price_currency"
+    target = registration._state.fields_cache.get(kind)
+    if target is not None:
+        currency = getattr(target, column)
+    else:
+        currency = target_model.objects.filter(pk=object_id).values_list(column, flat=True).first()
+    return kind, object_id, registered, currency or DEFAULT_CURRENCY
+
+
+def registration_created(registration, deltas: Optional[Deltas] = None) -> None:
+    _registration_delta(registration, 1, deltas)
+
+
+def registration_deleted(registration, deltas: Optional[Deltas] = None) -> None:
+    _registration_delta(registration, -1, deltas)
+
+
+def _registration_delta(registration, sign, deltas):
+    kind, object_id, registered, currency = _registration_target(registration)
+    own = deltas is None
+    if own:
+        deltas = Deltas()
+    deltas.add(local_date(registered), kind, object_id, currency, registrations=sign)
+    if own:
+        deltas.apply()
+
+
+# ---- Payments ----
+# A payment counts once on its creation day, and once more (with its amount)
+# on the day it completed while its status is "completed", both in the
+# payment's own currency.
+
+def payment_state(payment) -> Optional[Tuple[datetime.date, Decimal, str]]:
+    """The completed-payment contribution of a payment: (completion day, amount, currency), or None."""
+    values = payment.__dict__  # never trigger a deferred-field load
+    if values.get("payment_status") != "completed":
+        return None
+    completed_at = values.get("payment_completed_at") or values.get("updated_at")
+    return local_date(completed_at), values.get("amount") or Decimal("0"), _currency(payment)
+
+
+def _currency(payment) -> str:
+    return payment.__dict__.get("currency") or DEFAULT_CURRENCY
+
+
+def track(payment) -> None:
+    """Remember the loaded state so the next save can be diffed against it."""
+    payment._rollup_state = payment_state(payment)
+
+
+def _payment_target(payment) -> Tuple[str, Optional[str]]:
+    if isinstance(payment, Payment):
+        kind, registrations, target = "event", EventRegistration.objects, "event_id"
+    else:
+        kind, registrations, target = "program", ProgramRegistration.objects, "program_id"
+    registration = payment._state.fields_cache.get("registration")
+    if registration is not None:
+        return kind, getattr(registration, target)
+    return kind, registrations.filter(pk=payment.registration_id).values_list(target, flat=True).first()
+
+
+def payment_saved(payment, created: bool, deltas: Optional[Deltas] = None) -> None:
+    before = None if created else getattr(payment, "_rollup_state", None)
+    after = payment_state(payment)
+    if not created and before == after:
+        return
+    own = deltas is None
+    if own:
+        deltas = Deltas()
+    kind, object_id = _payment_target(payment)
+    if object_id is None:
+        return
+    if created:
+        deltas.add(local_date(payment.created_at), kind, object_id, _currency(payment), payments=1)
+    if before:
+        deltas.add(before[0], kind, object_id, before[2], completed_payments=-1, revenue=-before[1])
+    if after:
+        deltas.add(after[0], kind, object_id, after[2], completed_payments=1, revenue=after[1])
+    payment._rollup_state = after
+    if own:
+        deltas.apply()
+
+
+def payment_deleted(payment, deltas: Optional[Deltas] = None) -> None:
+    own = deltas is None
+    if own:
+        deltas = Deltas()
+    kind, object_id = _payment_target(payment)
+    if object_id is None:
+        return
+    deltas.add(local_date(payment.created_at), kind, object_id, _currency(payment), payments=-1)
+    state = getattr(payment, "_rollup_state", None)
+    if state:
+        deltas.add(state[0], kind, object_id, state[2], completed_payments=-1, revenue=-state[1])
+    if own:
+        deltas.apply()
+
+
+# ---- Bulk rebuild ----
+
+def _grouped(queryset, day_field, object_field, currency_field, **aggregates) -> Iterable[dict]:
+    return (
+        queryset.annotate(day=TruncDate(day_field), target=F(object_field), row_currency=currency_field)
+        .values("day", "target", "row_currency")
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+
+def _sources():
+    completed_day = Coalesce("payment_completed_at", "updated_at")
+    for kind, registrations, payments, registered, target, target_currency in (
+        ("event", EventRegistration, Payment, "registration_date", "event_id", "event__currency"),
+        ("program", ProgramRegistration, ProgramPayment, "registered_at", "program_id", "program__price_currency"),
+    ):
+        # A registration's currency isn't stored: use its payment's, else its target's current one
+        yield kind, _grouped(
+            registrations.objects.all(), registered, target, Coalesce("payment__currency", target_currency),
+            registrations=Count("pk"),
+        )
+        yield kind, _grouped(payments.objects.all(), "created_at", f"registration__{target}", F("currency"), payments=Count("pk"))
+        yield kind, _grouped(
+            payments.objects.filter(payment_status="completed"), completed_day, f"registration__{target}", F("currency"),
+            completed_payments=Count("pk"), revenue=Sum("amount"),
+        )
+
+
+def rebuild(batch_size: int = 1000) -> int:
+    """
+    Recompute every DailyRollup row from registrations and payments with a
+    few GROUP BY queries; returns the row count.
+    """
+    totals: Dict[Key, Dict[str, object]] = defaultdict(dict)
+    for kind, rows in _sources():
+        for row in rows:
+            key = (row.pop("day"), kind, str(row.pop("target")), row.pop("row_currency") or DEFAULT_CURRENCY)
+            totals[key].update(row)
+    rollups = [
+        DailyRollup(date=day, kind=kind, object_id=object_id, currency=currency, **counters)
+        for (day, kind, object_id, currency), counters in totals.items()
+    ]
+    with transaction.atomic():
+        DailyRollup.objects.all().delete()
+        DailyRollup.objects.bulk_create(rollups, batch_size=batch_size)
+    logger.info("Rebuilt %s daily rollup rows", len(rollups))
+    return len(rollups)
@@ -0,0 +1,189 @@
+# api/services/search.py
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, Q
+
+from ..models import Event, Program, SearchDocument
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "api_search_fts"
+# bm25() weights for the FTS5 columns: title, summary, body, location, kind
+BM25_WEIGHTS = (10.0, 4.0, 1.0, 2.0, 0.0)
+POSTGRES_CONFIG = "english"
+MAX_TERMS = 8
+# Shorter terms match whole words only; two-letter prefixes expand to too many terms
+MIN_PREFIX_LENGTH = 3
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Source fields read for each indexed model
+SOURCE_FIELDS = {
+    Event: ("title", "subtitle", "tagline", "description", "location"),
+    Program: ("title", "description", "focus", "outcome", "skills"),
+}
+
+
+def _document_fields(instance) -> Dict[str, str]:
+    if isinstance(instance, Event):
+        return {
+            "title": instance.title,
+            "summary": " ".join(filter(None, [instance.subtitle, instance.tagline])),
+            "body": instance.description,
+            "location": instance.location,
+        }
+    return {
+        "title": instance.title,
+        "summary": instance.focus,
+        "body": "\n".join(filter(None, [instance.description, instance.outcome, instance.skills])),
+        "location": "",
+    }
+
+
+def _kind(instance) -> str:
+    return "event" if isinstance(instance, Event) else "program"
+
+
+def _search_vector():
+    return (
+        SearchVector("title", weight="A", config=POSTGRES_CONFIG)
+        + SearchVector("summary", weight="B", config=POSTGRES_CONFIG)
+        + SearchVector("location", weight="C", config=POSTGRES_CONFIG)
+        + SearchVector("body", weight="D", config=POSTGRES_CONFIG)
+    )
+
+
+def index_object(instance) -> None:
+    """Create or refresh the search document of an Event or Program."""
+    document, _ = SearchDocument.objects.update_or_create(
+        kind=_kind(instance), object_id=instance.pk, defaults=_document_fields(instance),
+    )
+    if connection.vendor == "postgresql":
+        SearchDocument.objects.filter(pk=document.pk).update(search_vector=_search_vector())
+
+
+def index_objects(instances) -> None:
+    """index_object for many Events/Programs at once, with one upsert (imports)."""
+    documents = [
+        SearchDocument(kind=_kind(instance), object_id=instance.pk, **_document_fields(instance))
+        for instance in instances
+    ]
+    if not documents:
+        return
+    SearchDocument.objects.bulk_create(
+        documents, batch_size=500, update_conflicts=True,
+        unique_fields=["kind", "object_id"], update_fields=["title", "summary", "body", "location"],
+    )
+    if connection.vendor == "postgresql":
+        kinds = {document.kind for document in documents}
+        SearchDocument.objects.filter(
+            kind__in=kinds, object_id__in=[document.object_id for document in documents],
+        ).update(search_vector=_search_vector())
+
+
+def remove_object(instance) -> None:
+    SearchDocument.objects.filter(kind=_kind(instance), object_id=instance.pk).delete()
+
+
+def rebuild() -> int:
+    """Re-create every search document from Event and Program; returns the count."""
+    documents = [
+        SearchDocument(kind=_kind(instance), object_id=instance.pk, **_document_fields(instance))
+        for model, fields in SOURCE_FIELDS.items()
+        for instance in model.objects.only(*fields).iterator(chunk_size=2000)
+    ]
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        SearchDocument.objects.bulk_create(documents, batch_size=1000)
+        if connection.vendor == "postgresql":
+            SearchDocument.objects.update(search_vector=_search_vector())
+    if connection.vendor == "sqlite":
+        # Merge the FTS5 b-tree segments written by the per-row triggers
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        except DatabaseError:
+            logger.warning("FTS5 search table missing; search falls back to icontains")
+    logger.info("Rebuilt search index: %s documents", len(documents))
+    return len(documents)
+
+
+def terms(query: str) -> List[str]:
+    return TOKEN_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def _result(kind, object_id, title, summary, score) -> Dict[str, Any]:
+    return {"type": kind, "id": object_id, "title": title, "summary": summary, "score": round(score, 6)}
+
+
+def _search_sqlite(words, kind, limit):
+    # Every term must match as a prefix ("tok"*, served by the prefix index) in
+    # the text columns; the type filter is a match on the indexed kind column.
+    match = "{title summary body location} : (%s)" % " ".join(
+        f'"{word}"*' if len(word) >= MIN_PREFIX_LENGTH else f'"{word}"' for word in words
+    )
+    if kind:
+        match += f' AND kind : "{kind}"'
+    # Rank inside FTS5 and only join the top rows back to the documents
+    sql = (
+        f"SELECT d.kind, d.object_id, d.title, d.summary, ranked.score FROM ("
+        f"SELECT rowid, -bm25({FTS_TABLE}, {', '.join(map(str, BM25_WEIGHTS))}) AS score "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY score DESC LIMIT %s"
+        f") ranked JOIN api_searchdocument d ON d.id = ranked.rowid ORDER BY ranked.score DESC"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, limit])
+        return [_result(*row) for row in cursor.fetchall()]
+
+
+def _search_postgres(words, kind, limit):
+    query = SearchQuery(
+        " & ".join(f"{word}:*" if len(word) >= MIN_PREFIX_LENGTH else word for word in words),
+        search_type="raw", config=POSTGRES_CONFIG,
+    )
+    documents = SearchDocument.objects.filter(search_vector=query)
+    if kind:
+        documents = documents.filter(kind=kind)
+    rows = (
+        documents.annotate(score=SearchRank(F("search_vector"), query))
+        .order_by("-score")
+        .values_list("kind", "object_id", "title", "summary", "score")[:limit]
+    )
+    return [_result(*row) for row in rows]
+
+
+def _search_basic(words, kind, limit):
+    documents = SearchDocument.objects.all()
+    if kind:
+        documents = documents.filter(kind=kind)
+    for word in words:
+        documents = documents.filter(
+            Q(title__icontains=word) | Q(summary__icontains=word) | Q(body__icontains=word) | Q(location__icontains=word)
+        )
+    rows = documents.order_by("title").values_list("kind", "object_id", "title", "summary")[:limit]
+    return [_result(*row, 0.0) for row in rows]
+
+
+def search(query: str, kind: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Ranked Event/Program matches for `query`. All terms must match and terms
+    of three or more characters match as prefixes ("neg" finds "negotiation").
+    Uses FTS5 bm25 on SQLite, ts_rank on Postgres and icontains elsewhere.
+    """
+    if kind is not None and kind not in dict(SearchDocument.KIND_CHOICES):
+        raise ValueError(f"Unknown search document type: {kind!r}")
+    words = terms(query)
+    if not words:
+        return []
+    if connection.vendor == "sqlite":
+        try:
+            return _search_sqlite(words, kind, limit)
+        except DatabaseError:
+            logger.warning("FTS5 search failed, falling back to icontains", exc_info=True)
+    elif connection.vendor == "postgresql":
+        return _search_postgres(words, kind, limit)
+    return _search_basic(words, kind, limit)
@@ -0,0 +1,77 @@
+# api/services/upcoming_events.py
+import datetime
+import logging
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import Event
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = "upcoming_event_ids:{day}"
+
+
+def today() -> datetime.date:
+    """The current date in Africa/Nairobi (settings.TIME_ZONE)."""
+    return timezone.localdate()
+
+
+def seconds_until_midnight(now: Optional[datetime.datetime] = None) -> int:
+    now = timezone.localtime(now)
+    midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time.min, tzinfo=now.tzinfo)
+    return max(1, int((midnight - now).total_seconds()))
+
+
+def _with_last_day(queryset):
+    return queryset.alias(last_day=Coalesce("end_date", "start_date"))
+
+
+def upcoming_queryset(day: Optional[datetime.date] = None):
+    """Events that haven't ended by `day` and aren't marked completed."""
+    day = day or today()
+    return _with_last_day(Event.objects.all()).filter(last_day__gte=day).exclude(status="completed")
+
+
+def upcoming_ids(day: Optional[datetime.date] = None) -> List[str]:
+    """
+    IDs of upcoming events in start order, cached per Nairobi date. The key
+    changes at midnight, so yesterday's list is never served; it also expires
+    then, or sooner (UPCOMING_EVENTS_CACHE_TIMEOUT) to bound staleness when
+    the cache is per-process. Event saves and deletes clear it.
+    """
+    day = day or today()
+    key = CACHE_KEY.format(day=day.isoformat())
+    ids = cache.get(key)
+    if ids is None:
+        ids = list(upcoming_queryset(day).order_by("start_date", "pk").values_list("pk", flat=True))
+        timeout = min(seconds_until_midnight(), settings.UPCOMING_EVENTS_CACHE_TIMEOUT)
+        cache.set(key, ids, timeout)
+    return ids
+
+
+def invalidate() -> None:
+    cache.delete(CACHE_KEY.format(day=today().isoformat()))
+
+
+def complete_past_events(day: Optional[datetime.date] = None, dry_run: bool = False) -> int:
+    """
+    Mark every event that ended before `day` as completed with registration
+    closed, in a single UPDATE. Returns the number of events changed.
+    """
+    day = day or today()
+    past = _with_last_day(Event.objects.all()).filter(last_day__lt=day).filter(
+        ~Q(status="completed") | Q(registration_open=True)
+    )
+    if dry_run:
+        return past.count()
+    # update() bypasses auto_now and signals, so set updated_at and clear the cache here
+    updated = past.update(status="completed", registration_open=False, updated_at=timezone.now())
+    if updated:
+        invalidate()
+    logger.info("Marked %s past events as completed (before %s)", updated, day)
+    return updated
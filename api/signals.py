@@ -0,0 +1,103 @@
+import logging
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import (
+    Event, EventRegistration, GalleryItem, Payment, Program, ProgramPayment, ProgramRegistration, TeamMember, Testimonial,
+)
+from .services import image_derivatives, rollups, search, upcoming_events
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Apply settings.SQLITE_PRAGMAS to each new SQLite connection."""
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", None) or {}
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    logger.debug("Applied SQLite PRAGMAs to connection %s: %s", connection.alias, pragmas)
+
+
+@receiver(post_save, sender=TeamMember)
+@receiver(post_save, sender=GalleryItem)
+@receiver(post_save, sender=Testimonial)
+@receiver(post_save, sender=Event)
+def build_image_derivatives(sender, instance, raw=False, **kwargs):
+    """
+    Generate resized WebP/JPEG variants when an image is uploaded or replaced,
+    or leave them pending for `manage.py process_images`.
+    """
+    if raw or not image_derivatives.needs_derivatives(instance):
+        return
+    if not image_derivatives.get_config()["GENERATE_ON_SAVE"]:
+        logger.debug("Image derivatives pending for %s %s", sender.__name__, instance.pk)
+        return
+    try:
+        image_derivatives.generate_derivatives(instance)
+    except Exception:
+        # A broken upload must not break the admin save; the original is still served.
+        logger.exception("Failed to generate image derivatives for %s %s", sender.__name__, instance.pk)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Program)
+def update_search_document(sender, instance, raw=False, **kwargs):
+    """Keep the /api/search/ index in step with Event and Program edits."""
+    if raw:
+        return
+    search.index_object(instance)
+
+
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Program)
+def delete_search_document(sender, instance, **kwargs):
+    search.remove_object(instance)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_upcoming_events(sender, **kwargs):
+    upcoming_events.invalidate()
+
+
+@receiver(post_save, sender=EventRegistration)
+@receiver(post_save, sender=ProgramRegistration)
+def count_registration(sender, instance, created, raw=False, **kwargs):
+    """Keep the sales dashboard rollups (DailyRollup) in step with new registrations."""
+    if created and not raw:
+        rollups.registration_created(instance)
+
+
+@receiver(post_delete, sender=EventRegistration)
+@receiver(post_delete, sender=ProgramRegistration)
+def uncount_registration(sender, instance, **kwargs):
+    rollups.registration_deleted(instance)
+
+
+@receiver(post_init, sender=Payment)
+@receiver(post_init, sender=ProgramPayment)
+def track_payment_state(sender, instance, **kwargs):
+    # The status as loaded, so the post_save below only applies real transitions
+    rollups.track(instance)
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_save, sender=ProgramPayment)
+def count_payment(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        rollups.payment_saved(instance, created)
+
+
+@receiver(post_delete, sender=Payment)
+@receiver(post_delete, sender=ProgramPayment)
+def uncount_payment(sender, instance, **kwargs):
+    rollups.payment_deleted(instance)
@@ -0,0 +1,39 @@
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+HASH_LENGTH = 12
+
+# `gallery/photo.3f2a9c0b1d4e.jpg`; Django puts any collision suffix before the hash
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{%d}\.[A-Za-z0-9]+$" % HASH_LENGTH)
+
+
+def is_hashed_name(name):
+    return bool(HASHED_NAME_RE.search(name))
+
+
+class ContentHashedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that embeds a hash of the file content in every stored
+    name (`team/jane.3f2a9c0b1d4e.jpg`). A name therefore always refers to the
+    same bytes: replacing an image produces a new URL, and existing URLs can be
+    cached forever (see api.media.serve_media).
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        return super().save(self.hashed_name(name, digest.hexdigest()), content, max_length=max_length)
+
+    def hashed_name(self, name, digest):
+        root, ext = os.path.splitext(name)
+        return f"{root}.{digest[:HASH_LENGTH]}{ext}"
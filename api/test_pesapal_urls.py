@@ -1,15 +1,19 @@
 # test_pesapal_urls.py
+import os
 import requests
 import json
 
 def test_pesapal_urls():
-    consumer_key = "qkio1BGGYAXTu2JOfm7XSXNruoZsrqEW"
-    consumer_secret = "osGQ364R49cXKeOYSpaOnT++rHs="
+    # Credentials come from the environment; never commit them.
+    # Point PESAPAL_TEST_HOST at `manage.py run_pesapal_emulator` to test offline.
+    consumer_key = os.getenv("PESAPAL_CONSUMER_KEY", "")
+    consumer_secret = os.getenv("PESAPAL_CONSUMER_SECRET", "")
+    host = os.getenv("PESAPAL_TEST_HOST", "https://cybqa.pesapal.com").rstrip("/")
     
     # Test both URL formats
     url_formats = [
-        "https://cybqa.pesapal.com/pesapalv3/api/Auth/RequestToken",  # With /pesapalv3
-        "https://cybqa.pesapal.com/api/Auth/RequestToken"             # Without /pesapalv3
+        f"{host}/pesapalv3/api/Auth/RequestToken",  # With /pesapalv3
+        f"{host}/api/Auth/RequestToken"             # Without /pesapalv3
     ]
     
     data = {
@@ -1,3 +1,906 @@
-from django.test import TestCase
+import datetime
+import io
+import tempfile
+import zipfile
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.fields.files import FieldFile
+from django.http import Http404, HttpResponse, JsonResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+
+from .media import serve_media
+from .middleware import CompressionMiddleware
+from .models import (
+    DailyRollup, Event, EventRegistration, GalleryCategory, GalleryItem, IdempotencyKey, Payment, Program, ProgramCategory,
+    ProgramPayment, ProgramRegistration, SearchDocument, Testimonial, generate_unique_id,
+)
+from .paginators import EstimatedCountPaginator, estimate_row_count
+from .renderers import FastJSONRenderer
+from .serializers import (
+    EventSerializer, GalleryCategorySerializer, GalleryItemSerializer, TestimonialSerializer, media_url,
+)
+from .services import catalogue_import, fast_serializers, gallery_upload, rollups, upcoming_events
+from .storage import ContentHashedStorage
+
+
+def create_event(**fields):
+    return Event.objects.create(**{
+        "title": "Sales Summit", "start_date": datetime.date(2030, 1, 1), "location": "Nairobi",
+        "participants_limit": 10, "description": "Summit", "investment_amount": 1000, "status": "open", **fields,
+    })
+
+
+def create_program(**fields):
+    category, _ = ProgramCategory.objects.get_or_create(slug="training", defaults={"name": "Training"})
+    return Program.objects.create(**{
+        "category": category, "title": "Closing", "duration": "2 days", "price": "KES 5,000",
+        "description": "Closing", **fields,
+    })
+
+
+@override_settings(RATE_LIMITS={**settings.RATE_LIMITS, "ENABLED": False})
+class GroupRegistrationBodyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(
+            title="Sales Summit", start_date=datetime.date(2030, 1, 1), location="Nairobi",
+            participants_limit=10, description="Summit", investment_amount=1000, status="open",
+        )
+        category = ProgramCategory.objects.create(name="Training", slug="training")
+        cls.program = Program.objects.create(
+            category=category, title="Closing", duration="2 days", price="KES 5,000", description="Closing",
+        )
+
+    def test_array_body_is_rejected(self):
+        for url in (
+            f"/api/events/{self.event.pk}/group-registrations/",
+            f"/api/program/{self.program.pk}/group-register/",
+        ):
+            with self.subTest(url=url):
+                response = self.client.post(url, [{"email": "a@example.com"}], content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
+
+@override_settings(RATE_LIMITS={**settings.RATE_LIMITS, "ENABLED": False})
+class GroupRegistrationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = create_event(participants_limit=3, investment_amount=1000)
+
+    def attendee(self, email):
+        return {"full_name": "Jane Doe", "email": email, "phone": "0700000000", "company": "Acme", "job_title": "Sales"}
+
+    def register(self, *emails):
+        return self.client.post(
+            f"/api/events/{self.event.pk}/group-registrations/",
+            {"attendees": [self.attendee(email) for email in emails]}, content_type="application/json",
+        )
+
+    def test_group_shares_one_lead_payment(self):
+        response = self.register("a@example.com", "b@example.com")
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual((data["seats"], data["payment_amount"]), (2, "2000.00"))
+        registrations = EventRegistration.objects.filter(group_reference=data["group_reference"])
+        self.assertEqual(registrations.count(), 2)
+        payment = Payment.objects.get()
+        self.assertEqual(payment.registration_id, data["lead_registration_id"])
+
+        payment.mark_as_completed()
+        self.assertEqual(set(registrations.values_list("registration_status", flat=True)), {"confirmed"})
+
+    def test_group_over_capacity_is_refused(self):
+        EventRegistration.objects.create(event=self.event, **self.attendee("taken@example.com"))
+        response = self.register("a@example.com", "b@example.com", "c@example.com")
+        self.assertEqual(response.status_code, 409)
+        self.assertIn("Only 2 spot(s) left", response.json()["error"])
+        self.assertEqual(EventRegistration.objects.count(), 1)
+        self.assertFalse(Payment.objects.exists())
+
+    def test_registered_attendee_rejects_the_whole_group(self):
+        EventRegistration.objects.create(event=self.event, **self.attendee("b@example.com"))
+        response = self.register("a@example.com", "b@example.com")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["attendees"], [{}, {"email": ["Already registered"]}])
+        self.assertEqual(EventRegistration.objects.count(), 1)
+
+    def test_failure_after_insert_rolls_back(self):
+        # An attendee registering individually between the check and the insert
+        with mock.patch("api.services.group_registration._reject_registered"):
+            EventRegistration.objects.create(event=self.event, **self.attendee("b@example.com"))
+            response = self.register("a@example.com", "b@example.com")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(list(EventRegistration.objects.values_list("email", flat=True)), ["b@example.com"])
+
+        with mock.patch.object(Payment.objects, "create", side_effect=RuntimeError("gateway down")), \
+                self.assertRaises(RuntimeError):
+            self.register("a@example.com", "c@example.com")
+        self.assertEqual(EventRegistration.objects.count(), 1)
+        self.assertFalse(DailyRollup.objects.filter(registrations__gt=1).exists())
+
+
+class ProgramPriceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = ProgramCategory.objects.create(name="Training", slug="training")
+
+    def program(self, **fields):
+        return Program.objects.create(
+            category=self.category, title="Closing", duration="2 days", description="Closing", **fields,
+        )
+
+    def test_edited_price_text_is_parsed_again(self):
+        program = Program.objects.get(pk=self.program(price="KES 5,000").pk)
+        program.price = "KES 6,000"
+        program.save()
+        program.refresh_from_db()
+        self.assertEqual((program.price, program.price_amount), ("KES 6,000", 6000))
+
+        program.price = "Contact us"
+        program.save()
+        program.refresh_from_db()
+        self.assertEqual((program.price, program.price_amount), ("Contact us", None))
+
+    def test_edited_amount_rewrites_the_text(self):
+        program = Program.objects.get(pk=self.program(price="KES 5,000").pk)
+        program.price_amount = 7500
+        program.save()
+        program.refresh_from_db()
+        self.assertEqual(program.price, "KES 7,500")
+
+    def test_payment_for_unpriced_program_is_refused(self):
+        registration = ProgramRegistration.objects.create(
+            program=self.program(price="Contact us"), full_name="Jane Doe", email="jane@example.com",
+            phone_number="0700000000",
+        )
+        response = self.client.post(f"/api/program-payments/initiate/{registration.pk}/")
+        self.assertEqual(response.status_code, 409)
+        self.assertIn("no payable price", response.json()["error"])
+        self.assertFalse(ProgramPayment.objects.exists())
+
+    def test_payment_for_free_program_is_refused(self):
+        registration = ProgramRegistration.objects.create(
+            program=self.program(price="Free"), full_name="Jane Doe", email="jane@example.com",
+            phone_number="0700000000",
+        )
+        response = self.client.post(f"/api/program-payments/initiate/{registration.pk}/")
+        self.assertEqual(response.status_code, 409)
+        self.assertIn("is free", response.json()["error"])
+        self.assertFalse(ProgramPayment.objects.exists())
+
+
+@override_settings(RATE_LIMITS={
+    **settings.RATE_LIMITS, "ENABLED": True, "SCOPES": {"event_registration": {"rate": "1/min", "burst": 2}},
+})
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(
+            title="Sales Summit", start_date=datetime.date(2030, 1, 1), location="Nairobi",
+            participants_limit=10, description="Summit", investment_amount=1000, status="open",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.url = f"/api/events/{self.event.pk}/registrations/"
+        clock = mock.patch("api.throttling.time")
+        self.clock = clock.start().time
+        self.clock.return_value = 1000.0
+        self.addCleanup(clock.stop)
+
+    def post(self):
+        return self.client.post(self.url, {}, content_type="application/json")
+
+    def test_only_posts_are_limited(self):
+        self.assertEqual([self.post().status_code for _ in range(2)], [400, 400])
+        response = self.post()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "60")
+        self.assertEqual([self.client.get(self.url).status_code for _ in range(3)], [200, 200, 200])
+
+    def test_bucket_refills_at_the_rate(self):
+        for _ in range(2):
+            self.post()
+        self.clock.return_value += 30
+        self.assertEqual(self.post().status_code, 429)
+        self.clock.return_value += 30
+        self.assertEqual(self.post().status_code, 400)
+        self.assertEqual(self.post().status_code, 429)
+
+
+class CompressionTests(SimpleTestCase):
+    def compress(self, response):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_json_is_compressed(self):
+        response = self.compress(JsonResponse({"items": ["event"] * 500}))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    @override_settings(RESPONSE_COMPRESSION={**settings.RESPONSE_COMPRESSION, "CACHE": True})
+    def test_cache_outage_still_compresses(self):
+        with mock.patch("api.middleware.caches") as caches:
+            caches.__getitem__.return_value.get.side_effect = ConnectionError("cache down")
+            caches.__getitem__.return_value.set.side_effect = ConnectionError("cache down")
+            response = self.compress(JsonResponse({"items": ["event"] * 500}))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_html_is_not_compressed(self):
+        response = self.compress(HttpResponse("<input name='csrfmiddlewaretoken'>" * 100))
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class SalesDashboardTests(TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "x"))
+        event = Event.objects.create(
+            title="Sales Summit", start_date=datetime.date(2030, 1, 1), location="Nairobi",
+            participants_limit=10, description="Summit", investment_amount=1000, status="open",
+        )
+        self.program = Program.objects.create(
+            category=ProgramCategory.objects.create(name="Training", slug="training"),
+            title="Closing", duration="2 days", price="USD 200", description="Closing",
+        )
+        registration = EventRegistration.objects.create(
+            event=event, full_name="Jane Doe", email="jane@example.com", phone="0700000000", company="Acme", job_title="Sales",
+        )
+        Payment.objects.create(registration=registration, payment_method="pesapal").mark_as_completed()
+        for i in range(2):
+            registration = ProgramRegistration.objects.create(
+                program=self.program, full_name="Jane Doe", email=f"jane{i}@example.com", phone_number="0700000000",
+            )
+            ProgramPayment.objects.create(registration=registration, payment_method="pesapal").mark_as_completed()
+
+    def dashboard(self):
+        return self.client.get("/admin/api/dailyrollup/").context
+
+    def test_revenue_is_totalled_and_ranked_per_currency(self):
+        context = self.dashboard()
+        self.assertEqual(context["totals"]["revenue"], [("KES", 1000), ("USD", 400)])
+        self.assertEqual(
+            [(currency, [(row["kind"], row["revenue"]) for row in rows]) for currency, rows in context["top"]],
+            [("KES", [("event", 1000)]), ("USD", [("program", 400)])],
+        )
+
+    def test_revenue_keeps_the_currency_it_was_paid_in(self):
+        self.program.price = "KES 20,000"
+        self.program.save()
+        self.assertEqual(self.dashboard()["totals"]["revenue"], [("KES", 1000), ("USD", 400)])
+
+        expected = sorted(DailyRollup.objects.values_list("kind", "currency", "registrations", "payments", "revenue"))
+        rollups.rebuild()
+        self.assertEqual(sorted(DailyRollup.objects.values_list("kind", "currency", "registrations", "payments", "revenue")), expected)
+
+
+class FastListSerializationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        variants = {"files": [
+            {"width": width, "format": fmt, "name": f"uploads/photo_w{width}.0123456789ab.{fmt}"}
+            for width in (320, 640) for fmt in ("webp", "jpeg")
+        ]}
+        for i in range(6):
+            Event.objects.create(
+                title=f"Event {i}", subtitle="Sales mastery" if i % 2 else "", tagline=f"Tagline – {i}",
+                category=[choice for choice, _ in Event.CATEGORY_CHOICES][i % len(Event.CATEGORY_CHOICES)],
+                start_date=datetime.date(2030, 1, 1 + i), end_date=None if i % 3 else datetime.date(2030, 1, 2 + i),
+                start_time=datetime.time(9, 30) if i % 2 else None, end_time=datetime.time(17, 0, 15) if i % 2 else None,
+                location="Nairobi", participants_limit=50, duration="2 days", description="Summit",
+                investment_amount=None if i % 3 == 0 else Decimal(f"{1000 * i}.5"), is_free=i % 3 == 0,
+                status=[choice for choice, _ in Event.EVENT_STATUS_CHOICES][i % len(Event.EVENT_STATUS_CHOICES)],
+                image=f"events/event-{i}.0123456789ab.jpg" if i % 4 else "",
+            )
+            Testimonial.objects.create(
+                author=f"Author {i}", company="Smart Sales", text="Great training",
+                logo=f"testimonials/logo {i}.0123456789ab.png",
+            )
+            GalleryCategory.objects.create(name=f"Category {i}", slug=f"category-{i}")
+        # Saving an image marks its variants pending; record some as generated
+        for model in (Event, Testimonial):
+            every_other = list(model.objects.order_by("pk").values_list("pk", flat=True))[::2]
+            model.objects.filter(pk__in=every_other).update(image_variants=variants)
+
+    def test_values_rows_render_like_the_serializers(self):
+        context = {"request": RequestFactory().get("/api/events/")}
+        for fast, serializer_class, model in (
+            (fast_serializers.EVENTS, EventSerializer, Event),
+            (fast_serializers.TESTIMONIALS, TestimonialSerializer, Testimonial),
+            (fast_serializers.GALLERY_CATEGORIES, GalleryCategorySerializer, GalleryCategory),
+        ):
+            with self.subTest(serializer=serializer_class.__name__):
+                expected = serializer_class(model.objects.all(), many=True, context=context).data
+                rendered = fast.render(model.objects.all(), context)
+                self.assertEqual([list(item.items()) for item in rendered], [list(item.items()) for item in expected])
+                if model is not GalleryCategory:
+                    self.assertTrue(any(item.get("image_srcset") or item.get("logo_srcset") for item in rendered))
+
+
+class PaymentTransitionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(
+            title="Sales Summit", start_date=datetime.date(2030, 1, 1), location="Nairobi",
+            participants_limit=10, description="Summit", investment_amount=2500, status="open",
+        )
+
+    def setUp(self):
+        self.registration = EventRegistration.objects.create(
+            event=self.event, full_name="Jane Doe", email="jane@example.com", phone="0700000000",
+            company="Acme", job_title="Sales",
+        )
+        self.payment = Payment.objects.create(registration=self.registration, payment_method="pesapal")
+
+    def test_transitions_save_only_the_changed_columns(self):
+        with mock.patch.object(Payment, "save", autospec=True, side_effect=Payment.save) as save:
+            self.assertTrue(self.payment.mark_as_initiated("TRACK-1", "https://pay.example.com/1"))
+            self.assertEqual(
+                save.call_args.kwargs["update_fields"],
+                ["payment_status", "pesapal_order_tracking_id", "pesapal_payment_url", "payment_initiated_at", "updated_at"],
+            )
+            self.assertTrue(self.payment.mark_as_failed())
+            self.assertEqual(save.call_args.kwargs["update_fields"], ["payment_status", "updated_at"])
+            save.reset_mock()
+            self.assertFalse(self.payment.mark_as_failed())
+            save.assert_not_called()
+        self.payment.refresh_from_db()
+        self.assertEqual((self.payment.payment_status, self.payment.pesapal_order_tracking_id), ("failed", "TRACK-1"))
+
+    def test_completion_confirms_the_registration_once(self):
+        self.assertTrue(self.payment.mark_as_completed(transaction_id="TX-1"))
+        self.assertEqual(self.payment.registration.registration_status, "confirmed")
+        self.registration.refresh_from_db()
+        self.assertEqual(self.registration.registration_status, "confirmed")
+        self.assertFalse(self.payment.mark_as_completed(transaction_id="TX-1"))
+
+    def test_stale_copy_does_not_complete_twice(self):
+        # The IPN and the callback each load the payment before either completes it
+        ipn, callback = Payment.objects.get(pk=self.payment.pk), Payment.objects.get(pk=self.payment.pk)
+        self.assertTrue(ipn.mark_as_completed(transaction_id="TX-1"))
+        self.assertFalse(callback.mark_as_completed(transaction_id="TX-1"))
+        self.assertEqual(callback.payment_status, "completed")
+        callback.save()
+        rollup = DailyRollup.objects.get(kind="event", object_id=self.event.pk)
+        self.assertEqual((rollup.completed_payments, rollup.revenue), (1, 2500))
+
+    def test_program_completion_marks_the_registration_paid(self):
+        program = Program.objects.create(
+            category=ProgramCategory.objects.create(name="Training", slug="training"),
+            title="Closing", duration="2 days", price="KES 5,000", description="Closing",
+        )
+        registration = ProgramRegistration.objects.create(
+            program=program, full_name="Jane Doe", email="jane@example.com", phone_number="0700000000",
+        )
+        payment = ProgramPayment.objects.create(registration=registration, payment_method="pesapal")
+        self.assertEqual((payment.amount, payment.currency), (5000, "KES"))
+        self.assertTrue(payment.mark_as_completed())
+        registration.refresh_from_db()
+        self.assertTrue(registration.has_paid)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def test_count_is_exact_after_deletes_on_sqlite(self):
+        GalleryCategory.objects.bulk_create([GalleryCategory(name=f"Category {i}", slug=f"category-{i}") for i in range(30)])
+        GalleryCategory.objects.filter(pk__in=list(GalleryCategory.objects.order_by("pk").values_list("pk", flat=True)[:12])).delete()
+
+        paginator = EstimatedCountPaginator(GalleryCategory.objects.order_by("pk"), 10)
+        paginator.estimate_threshold = 5
+        self.assertEqual((paginator.count, paginator.num_pages), (18, 2))
+        self.assertEqual(len(paginator.page(2).object_list), 8)
+        if connection.vendor == "sqlite":
+            self.assertIsNone(estimate_row_count(GalleryCategory))
+
+
+class ProcessImagesTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.item = GalleryItem(category=GalleryCategory.objects.create(name="Events", slug="events"))
+
+    def process(self):
+        out = io.StringIO()
+        call_command("process_images", "--workers", "1", "--models", "GalleryItem", stdout=out)
+        return out.getvalue()
+
+    def test_variants_are_generated_once_per_source(self):
+        png = io.BytesIO()
+        Image.new("RGB", (800, 400)).save(png, "PNG")
+        self.item.image.save("stage.png", ContentFile(png.getvalue()), save=True)
+        self.assertIn("processed=1 skipped=0 failed=0", self.process())
+        self.item.refresh_from_db()
+        self.assertEqual(
+            sorted((entry["width"], entry["format"]) for entry in self.item.image_variants["files"]),
+            [(320, "jpeg"), (320, "webp"), (640, "jpeg"), (640, "webp"), (800, "jpeg"), (800, "webp")],
+        )
+        srcset = GalleryItemSerializer(self.item, context={"request": RequestFactory().get("/")}).data["image_srcset"]
+        self.assertRegex(srcset["webp"], r"^http://testserver/media/gallery/stage\.[0-9a-f]{12}_w320\.[0-9a-f]{12}\.webp 320w, ")
+        self.assertIn("processed=0 skipped=1 failed=0", self.process())
+
+    def test_broken_image_fails_once_until_replaced(self):
+        self.item.image.save("broken.jpg", ContentFile(b"not an image"), save=True)
+        self.assertIn("processed=0 skipped=0 failed=1", self.process())
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.image_variants["source"], self.item.image.name)
+        self.assertIn("failed", self.item.image_variants)
+
+        # Later polls neither read the file again nor report it
+        with mock.patch.object(FieldFile, "open", side_effect=AssertionError("source was read")):
+            self.assertIn("processed=0 skipped=1 failed=0", self.process())
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.title_match = create_event(title="Negotiation Masterclass", description="Two days of practice")
+        cls.body_match = create_event(title="Sales Summit", description="Includes a short negotiation workshop")
+        cls.program = create_program(title="Negotiation for Managers", description="Closing deals")
+        create_event(title="Leadership Retreat", description="Strategy and people")
+
+    def search(self, q, **params):
+        response = self.client.get("/api/search/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def ids(self, results):
+        return [result["id"] for result in results]
+
+    def test_title_matches_rank_above_body_matches(self):
+        results = self.search("negotiation", type="event")
+        self.assertEqual(self.ids(results), [self.title_match.pk, self.body_match.pk])
+        self.assertGreater(results[0]["score"], results[1]["score"])
+
+    def test_terms_match_as_prefixes_and_all_must_match(self):
+        self.assertCountEqual(
+            self.ids(self.search("negot")), [self.title_match.pk, self.body_match.pk, self.program.pk],
+        )
+        self.assertEqual(self.ids(self.search("negot manag")), [self.program.pk])
+        # Two-letter terms only match whole words
+        self.assertEqual(self.search("ne"), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.title_match.title = "Pricing Masterclass"
+        self.title_match.save()
+        self.assertEqual(self.ids(self.search("pricing")), [self.title_match.pk])
+        self.assertNotIn(self.title_match.pk, self.ids(self.search("negotiation")))
+
+        self.program.delete()
+        self.assertFalse(SearchDocument.objects.filter(kind="program", object_id=self.program.pk).exists())
+        self.assertEqual(self.ids(self.search("managers")), [])
+
+    def test_invalid_type_is_rejected(self):
+        response = self.client.get("/api/search/", {"q": "negotiation", "type": "gallery"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ListFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.march = create_event(title="March Summit", start_date=datetime.date(2030, 3, 1), location="Mombasa")
+        cls.january = create_event(title="January Summit", start_date=datetime.date(2030, 1, 1), status="closed")
+        cls.cheap = create_program(title="Prospecting", price="KES 2,000")
+        cls.dear = create_program(title="Closing", price="USD 300")
+
+    def get(self, url, **params):
+        return self.client.get(url, params)
+
+    def test_event_filters_and_ordering(self):
+        response = self.get("/api/events/", status="open,closed", ordering="-start_date")
+        self.assertEqual([event["id"] for event in response.json()], [self.march.pk, self.january.pk])
+        response = self.get("/api/events/", status="closed")
+        self.assertEqual([event["id"] for event in response.json()], [self.january.pk])
+        response = self.get("/api/events/", location="mombasa", start_date_from="2030-02-01")
+        self.assertEqual([event["id"] for event in response.json()], [self.march.pk])
+
+    def test_program_price_filters(self):
+        response = self.get("/api/program/list/", price_currency="kes", price_max="5000")
+        self.assertEqual([program["id"] for program in response.json()], [self.cheap.pk])
+
+    def test_sparse_fieldset(self):
+        response = self.get("/api/events/", fields="id,title")
+        self.assertEqual(response.json()[0], {"id": self.january.pk, "title": "January Summit"})
+        response = self.get("/api/program/list/", fields="title")
+        self.assertEqual(response.json(), [{"title": "Closing"}, {"title": "Prospecting"}])
+
+    def test_invalid_parameters_are_rejected(self):
+        for url, params in (
+            ("/api/events/", {"status": "archived"}),
+            ("/api/events/", {"is_free": "maybe"}),
+            ("/api/events/", {"start_date_from": "01/02/2030"}),
+            ("/api/events/", {"ordering": "location"}),
+            ("/api/events/", {"fields": "id,secret"}),
+            ("/api/program/list/", {"price_min": "cheap"}),
+            ("/api/program/list/", {"price_max": "NaN"}),
+            ("/api/program/list/", {"fields": "title,nope"}),
+        ):
+            with self.subTest(url=url, params=params):
+                response = self.get(url, **params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
+
+class BulkAdminActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = create_event(investment_amount=2500)
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "x"))
+
+    def register(self, email, **fields):
+        return EventRegistration.objects.create(
+            event=self.event, full_name="Jane Doe", email=email, phone="0700000000", company="Acme", job_title="Sales",
+            **fields,
+        )
+
+    def action(self, url, action, objects):
+        return self.client.post(url, {"action": action, "_selected_action": [str(obj.pk) for obj in objects]})
+
+    def test_mark_cash_completed_confirms_groups_and_updates_rollups(self):
+        lead = self.register("lead@example.com", group_reference="GRP-1")
+        member = self.register("member@example.com", group_reference="GRP-1")
+        cash = Payment.objects.create(registration=lead, payment_method="cash", amount=5000)
+        online = Payment.objects.create(registration=self.register("online@example.com"), payment_method="pesapal")
+        paid = Payment.objects.create(registration=self.register("paid@example.com"), payment_method="cash")
+        paid.mark_as_completed()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.action("/admin/api/payment/", "mark_cash_completed", [cash, online, paid])
+        self.assertEqual(response.status_code, 302)
+
+        statuses = dict(Payment.objects.values_list("pk", "payment_status"))
+        self.assertEqual((statuses[cash.pk], statuses[online.pk], statuses[paid.pk]), ("completed", "pending", "completed"))
+        self.assertEqual(
+            set(EventRegistration.objects.filter(pk__in=[lead.pk, member.pk]).values_list("registration_status", flat=True)),
+            {"confirmed"},
+        )
+        rollup = DailyRollup.objects.get(kind="event", object_id=self.event.pk)
+        self.assertEqual((rollup.completed_payments, rollup.revenue), (2, 7500))
+
+    def test_mark_cash_completed_marks_program_registrations_paid(self):
+        registration = ProgramRegistration.objects.create(
+            program=create_program(), full_name="Jane Doe", email="jane@example.com", phone_number="0700000000",
+        )
+        payment = ProgramPayment.objects.create(registration=registration, payment_method="cash")
+        self.action("/admin/api/programpayment/", "mark_cash_completed", [payment])
+        payment.refresh_from_db()
+        registration.refresh_from_db()
+        self.assertEqual((payment.payment_status, registration.has_paid), ("completed", True))
+
+    def test_registration_status_actions(self):
+        pending = self.register("pending@example.com")
+        confirmed = self.register("confirmed@example.com", registration_status="confirmed")
+        payment = Payment.objects.create(registration=pending, payment_method="pesapal")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.action("/admin/api/eventregistration/", "confirm_selected", [pending, confirmed])
+        # Only the newly confirmed registration is emailed
+        self.assertEqual([message.to for message in mail.outbox], [["pending@example.com"]])
+
+        self.action("/admin/api/eventregistration/", "waitlist_selected", [confirmed])
+        EventRegistration.objects.filter(pk=pending.pk).update(registration_status="pending")
+        self.action("/admin/api/eventregistration/", "cancel_selected", [pending])
+        self.assertEqual(
+            dict(EventRegistration.objects.values_list("pk", "registration_status")),
+            {pending.pk: "cancelled", confirmed.pk: "waiting_list"},
+        )
+        payment.refresh_from_db()
+        self.assertEqual(payment.payment_status, "cancelled")
+
+
+class CatalogueImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ProgramCategory.objects.create(name="Training", slug="training")
+
+    def run_import(self, *lines, **options):
+        return catalogue_import.import_file(io.BytesIO("\n".join(lines).encode()), "catalogue.csv", **options)
+
+    def test_reimport_updates_instead_of_duplicating(self):
+        events = ("kind,title,start_date,location,participants_limit,description,status",
+                  "event,Sales Summit,2030-01-01,Nairobi,50,Summit,open")
+        programs = ("kind,category,title,duration,price,description",
+                    "program,training,Closing,2 days,\"KES 5,000\",Closing")
+        features = ("kind,program,description", "feature,Closing,Role play")
+        report = self.run_import(*events)
+        self.run_import(*programs)
+        self.run_import(*features)
+        self.assertEqual(report.counts[("event", "created")], 1)
+
+        report = self.run_import(events[0], events[1].replace("Nairobi", "Mombasa"))
+        self.assertEqual((report.counts[("event", "updated")], report.errors), (1, []))
+        self.assertEqual(list(Event.objects.values_list("location", flat=True)), ["Mombasa"])
+
+        self.run_import(programs[0], programs[1].replace("5,000", "6,000"))
+        self.assertEqual(list(Program.objects.values_list("price_amount", flat=True)), [6000])
+        report = self.run_import(*features)
+        self.assertEqual(report.counts[("feature", "unchanged")], 1)
+        self.assertEqual(Program.objects.get().features.count(), 1)
+
+    def test_invalid_rows_are_reported_and_the_rest_saved(self):
+        report = self.run_import(
+            "kind,id,title,start_date,location,participants_limit,description,status",
+            "event,,Good Summit,2030-01-01,Nairobi,50,Summit,open",
+            "event,,Bad Date,01/02/2030,Nairobi,50,Summit,open",
+            "event,,Bad Status,2030-01-01,Nairobi,50,Summit,archived",
+            "event,EVT1,First,2030-01-01,Nairobi,50,Summit,open",
+            "event,EVT1,Repeat,2030-01-01,Nairobi,50,Summit,open",
+            "webinar,,Nope,2030-01-01,Nairobi,50,Summit,open",
+        )
+        self.assertEqual(sorted(Event.objects.values_list("title", flat=True)), ["First", "Good Summit"])
+        self.assertEqual([location for location, _ in report.errors], ["row 7", "row 3", "row 4", "row 6"])
+        self.assertIn("start_date", report.errors[1][1])
+        self.assertIn("already imported from row 5", report.errors[3][1])
+
+        report = self.run_import(
+            "kind,category,title,program,description",
+            "program,webinars,Closing,,Closing",
+            "feature,,,Missing,Role play",
+        )
+        self.assertEqual([message for _, message in report.errors], [
+            "category: unknown program category 'webinars'", "program: 'Missing' no such program",
+        ])
+
+    def test_dry_run_saves_nothing(self):
+        report = self.run_import(
+            "kind,title,start_date,location,participants_limit,description,status",
+            "event,Sales Summit,2030-01-01,Nairobi,50,Summit,open",
+            dry_run=True,
+        )
+        self.assertEqual(report.counts[("event", "created")], 1)
+        self.assertFalse(Event.objects.exists())
+
+
+@override_settings(RATE_LIMITS={**settings.RATE_LIMITS, "ENABLED": False})
+class IdempotencyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = create_event(is_free=True, investment_amount=None)
+
+    def register(self, key, email="jane@example.com"):
+        body = {"event": self.event.pk, "full_name": "Jane Doe", "email": email, "phone": "0700000000",
+                "company": "Acme", "job_title": "Sales"}
+        return self.client.post(f"/api/events/{self.event.pk}/registrations/", body,
+                                content_type="application/json", headers={"Idempotency-Key": key})
+
+    def test_repeat_replays_the_stored_response(self):
+        first = self.register("key-1")
+        self.assertEqual(first.status_code, 201)
+        repeat = self.register("key-1")
+        self.assertEqual((repeat.status_code, repeat.json()), (201, first.json()))
+        self.assertEqual(repeat.headers["Idempotent-Replayed"], "true")
+        self.assertNotIn("Idempotent-Replayed", first.headers)
+        self.assertEqual(EventRegistration.objects.count(), 1)
+
+    def test_key_reused_for_another_body_is_refused(self):
+        self.register("key-1")
+        response = self.register("key-1", email="john@example.com")
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(EventRegistration.objects.count(), 1)
+
+    def test_repeat_while_in_flight_is_refused(self):
+        self.register("key-1")
+        # As though the first request were still running
+        IdempotencyKey.objects.update(status_code=None, response_body=None)
+        response = self.register("key-1")
+        self.assertEqual((response.status_code, response.headers["Retry-After"]), (409, "1"))
+        self.assertEqual(EventRegistration.objects.count(), 1)
+
+    def test_server_errors_and_expired_keys_run_again(self):
+        with mock.patch("api.views.EventRegistrationSerializer.save", side_effect=RuntimeError("database down")):
+            self.assertEqual(self.register("key-1").status_code, 500)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(self.register("key-1").status_code, 201)
+
+        expired = timezone.now() - datetime.timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL + 1)
+        IdempotencyKey.objects.update(created_at=expired)
+        EventRegistration.objects.all().delete()
+        response = self.register("key-1")
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+        self.assertEqual(EventRegistration.objects.count(), 1)
+
+        IdempotencyKey.objects.update(created_at=expired)
+        call_command("purge_idempotency_keys", stdout=io.StringIO())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class UpcomingEventsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        today = timezone.localdate()
+        self.ended = create_event(title="Ended", start_date=today - datetime.timedelta(days=3),
+                                  end_date=today - datetime.timedelta(days=1))
+        self.running = create_event(title="Running", start_date=today - datetime.timedelta(days=1),
+                                    end_date=today + datetime.timedelta(days=1))
+        self.completed = create_event(title="Completed", start_date=today + datetime.timedelta(days=5), status="completed")
+
+    def titles(self):
+        return [event["title"] for event in self.client.get("/api/events/upcoming/").json()]
+
+    def test_list_follows_event_changes(self):
+        self.assertEqual(self.titles(), ["Running"])
+        create_event(title="Next Month", start_date=timezone.localdate() + datetime.timedelta(days=30))
+        self.assertEqual(self.titles(), ["Running", "Next Month"])
+        self.running.delete()
+        self.assertEqual(self.titles(), ["Next Month"])
+
+    def test_past_events_are_completed(self):
+        stdout = io.StringIO()
+        call_command("complete_past_events", "--dry-run", stdout=stdout)
+        self.assertIn("1 past events would be marked", stdout.getvalue())
+        self.assertEqual(Event.objects.get(pk=self.ended.pk).status, "open")
+
+        self.assertEqual(self.titles(), ["Running"])
+        tomorrow = timezone.localdate() + datetime.timedelta(days=2)
+        self.assertEqual(upcoming_events.complete_past_events(tomorrow), 2)
+        self.assertEqual(
+            set(Event.objects.values_list("title", "status", "registration_open")),
+            {("Ended", "completed", False), ("Running", "completed", False), ("Completed", "completed", True)},
+        )
+        self.assertEqual(upcoming_events.complete_past_events(tomorrow), 0)
+
+
+class EventRegistrationsPanelTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = create_event()
+        EventRegistration.objects.bulk_create([
+            EventRegistration(
+                event=cls.event, full_name=f"Attendee {i}", email=f"attendee{i}@example.com", phone="0700000000",
+                company="Acme" if i % 2 else "Globex", job_title="Sales",
+                registration_status="confirmed" if i % 3 == 0 else "pending",
+            )
+            for i in range(7)
+        ])
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "x"))
+        self.url = f"/admin/api/event/{self.event.pk}/registrations/"
+
+    def test_page_counts_and_filters(self):
+        with mock.patch("api.admin.EventAdmin.registrations_per_page", 2):
+            data = self.client.get(self.url, {"page": 9}).json()
+            self.assertEqual((data["count"], data["page"], data["num_pages"], len(data["results"])), (7, 4, 4, 1))
+            self.assertEqual((data["counts"]["total"], data["counts"]["confirmed"], data["counts"]["pending"]), (7, 3, 4))
+
+            data = self.client.get(self.url, {"status": "confirmed", "q": "globex"}).json()
+            self.assertEqual(sorted(row["full_name"] for row in data["results"]), ["Attendee 0", "Attendee 6"])
+            self.assertEqual((data["count"], data["num_pages"]), (2, 1))
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({"status": "archived"}, {"page": "last"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+        self.assertEqual(self.client.get("/admin/api/event/missing/registrations/").status_code, 404)
+
+
+class HashedMediaTests(SimpleTestCase):
+    def test_names_carry_the_content_hash(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = ContentHashedStorage(location=root)
+            names = [storage.save("team/jane.jpg", ContentFile(content)) for content in (b"one", b"one", b"two")]
+            self.assertRegex(names[0], r"^team/jane\.[0-9a-f]{12}\.jpg$")
+            digests = [name.rsplit(".", 2)[1] for name in names]
+            self.assertEqual(digests[0], digests[1])
+            self.assertNotEqual(digests[0], digests[2])
+
+    @override_settings(MEDIA_SERVE={"MODE": "x-accel-redirect", "ACCEL_REDIRECT_PREFIX": "/protected-media/", "MAX_AGE": 60})
+    def test_hashed_names_are_cached_as_immutable(self):
+        request = RequestFactory().get("/media/")
+        response = serve_media(request, "team/jane.0123456789ab.jpg")
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/team/jane.0123456789ab.jpg")
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=60", serve_media(request, "team/jane.jpg")["Cache-Control"])
+        with self.assertRaises(Http404):
+            serve_media(request, "../settings.py")
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_output_matches_the_drf_renderer(self):
+        data = {
+            "when": datetime.datetime(2030, 1, 1, 9, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            "day": datetime.date(2030, 1, 1), "amount": Decimal("1000.50"), "text": "Sales Summit \u2013 Nairobi\u2028\u2029",
+            "ids": [1, 2 ** 70], 1: None,
+        }
+        for value in (data, {**data, "ids": [1, 2]}, [data["when"]], None):
+            with self.subTest(value=value):
+                self.assertEqual(FastJSONRenderer().render(value), JSONRenderer().render(value))
+
+
+class ShortIdTests(TestCase):
+    def test_ids_sort_by_creation_time(self):
+        ids = [generate_unique_id(timestamp) for timestamp in (1.8e9, 1.8e9 + 1, 1.9e9, 2.5e9)]
+        self.assertEqual(sorted(ids), ids)
+        for pk in ids:
+            self.assertRegex(pk, r"^[0-9A-Z]{10}$")
+
+    def test_collision_retries_with_a_fresh_id(self):
+        existing = create_event()
+        event = Event(title="Other", start_date=datetime.date(2030, 1, 1), location="Nairobi",
+                      participants_limit=10, description="Other", status="open")
+        event.pk = existing.pk
+        event.save()
+        self.assertNotEqual(event.pk, existing.pk)
+        self.assertEqual(sorted(Event.objects.values_list("title", flat=True)), ["Other", "Sales Summit"])
+
+
+class GalleryBulkUploadTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.category = GalleryCategory.objects.create(name="Events", slug="events")
+
+    def archive(self):
+        png = io.BytesIO()
+        Image.new("RGB", (4, 4)).save(png, "PNG")
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("photos/stage.png", png.getvalue())
+            zf.writestr("photos/fake.jpg", b"not an image")
+            zf.writestr("photos/notes.txt", b"hello")
+            zf.writestr("__MACOSX/photos/._stage.png", b"")
+        archive.seek(0)
+        return archive
+
+    def storage_names(self):
+        storage = GalleryItem._meta.get_field("image").storage
+        return storage.listdir("gallery")[1] if storage.exists("gallery") else []
+
+    def test_archive_is_imported_and_bad_files_rejected(self):
+        result = gallery_upload.bulk_upload(self.category, archive=self.archive())
+        self.assertEqual(result["rejected"], [("fake.jpg", "not a valid image"), ("notes.txt", "not an image file type")])
+        item = GalleryItem.objects.get()
+        self.assertEqual((item, item.category), (result["created"][0], self.category))
+        self.assertRegex(item.image.name, r"^gallery/stage\.[0-9a-f]{12}\.png$")
+
+    def test_failed_batch_leaves_no_files(self):
+        with mock.patch.object(GalleryItem.objects, "bulk_create", side_effect=RuntimeError("database down")), \
+                self.assertRaises(RuntimeError):
+            gallery_upload.bulk_upload(self.category, archive=self.archive())
+        self.assertEqual(self.storage_names(), [])
+        self.assertFalse(GalleryItem.objects.exists())
+
+
+class MediaURLTests(SimpleTestCase):
+    def test_urls_match_the_storage(self):
+        request = RequestFactory().get("/api/gallery/")
+        name = "gallery/photo album.0123456789ab.jpg"
+        storage = GalleryItem._meta.get_field("image").storage
+        self.assertEqual(media_url(name, request), request.build_absolute_uri(storage.url(name)))
+        self.assertEqual(media_url(name), storage.url(name))
+        with override_settings(MEDIA_BASE_URL="https://cdn.example.com/media/"):
+            self.assertEqual(media_url(name, request), "https://cdn.example.com/media/gallery/photo%20album.0123456789ab.jpg")
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite connection tuning")
+class SQLitePragmaTests(SimpleTestCase):
+    databases = {"default"}
+
+    def test_pragmas_are_applied_to_connections(self):
+        with connection.cursor() as cursor:
+            values = {
+                name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in ("busy_timeout", "synchronous", "cache_size")
+            }
+        # synchronous=NORMAL reads back as 1; the in-memory test database has no WAL journal
+        self.assertEqual(values, {
+            "busy_timeout": settings.SQLITE_PRAGMAS["busy_timeout"], "synchronous": 1,
+            "cache_size": settings.SQLITE_PRAGMAS["cache_size"],
+        })
@@ -24,17 +24,22 @@ urlpatterns = [
     path('gallery/categories/', views.category_list, name='category_list'),
     path('testimonials/', views.get_testimonials, name='testimonial-list'),
     
+    path('search/', views.search_view, name='search'),
+
      # Event endpoints
     path('events/', views.event_list, name='api-events-list'),
+    path('events/upcoming/', views.upcoming_event_list, name='api-events-upcoming'),  # before events/<pk>/
     path('events/<str:pk>/', views.event_detail, name='api-event-detail'),
 
     # Event registration endpoints
     path('registrations/', views.event_registration_list, name='api-registrations'),
     path('events/<str:event_id>/registrations/', views.event_registration_by_event, name='api-registrations-by-event'),
+    path('events/<str:event_id>/group-registrations/', views.event_group_registration, name='api-group-registrations-by-event'),
     
    
   # Program URLs
     path('program/<str:program_id>/register/', views.program_register_endpoint, name='program-register'),
+    path('program/<str:program_id>/group-register/', views.program_group_register_endpoint, name='program-group-register'),
     path('program/list/', views.program_list_endpoint, name='program-list'),
     
    
@@ -26,8 +26,12 @@ from .serializers import (
     EventRegistrationSerializer, ProgramSerializer, ProgramRegistrationSerializer,
     PaymentSerializer, MyTokenObtainPairSerializer
 )
+from . import filters
+from .services import fast_serializers, group_registration, search, upcoming_events
 from .services.pesapal_service import PesaPalService
 from .services.program_payment_service import ProgramPaymentService
+from .idempotency import idempotent
+from .throttling import rate_limit
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.http import HttpResponse
 from django.shortcuts import redirect
@@ -48,6 +52,7 @@ def get_csrf_token(request):
     return JsonResponse({"message": "CSRF cookie set"})
 
 @api_view(['POST'])
+@rate_limit('contact')
 def contact_view(request):
     serializer = ContactMessageSerializer(data=request.data)
     if serializer.is_valid():
@@ -75,20 +80,66 @@ def gallery_list(request):
 @api_view(['GET'])
 def category_list(request):
     categories = GalleryCategory.objects.all()
+    if settings.FAST_LIST_SERIALIZATION:
+        return Response(fast_serializers.GALLERY_CATEGORIES.render(categories, {'request': request}))
     serializer = GalleryCategorySerializer(categories, many=True, context={'request': request})
     return Response(serializer.data)
 
 @api_view(['GET'])
 def get_testimonials(request):
     testimonials = Testimonial.objects.all()
+    if settings.FAST_LIST_SERIALIZATION:
+        return Response(fast_serializers.TESTIMONIALS.render(testimonials, {'request': request}), status=status.HTTP_200_OK)
     serializer = TestimonialSerializer(testimonials, many=True, context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
 
+@api_view(['GET'])
+def search_view(request):
+    """Ranked full-text search over events and programs: ?q=<terms>[&type=event|program][&limit=20]"""
+    query = request.GET.get('q', '').strip()
+    kind = request.GET.get('type') or None
+    if kind not in (None, 'event', 'program'):
+        return Response({'error': "type must be 'event' or 'program'"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 20)), 50))
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    results = search.search(query, kind=kind, limit=limit) if query else []
+    return Response({'query': query, 'results': results})
+
 # Events
 @api_view(['GET'])
 def event_list(request):
-    events = Event.objects.all().order_by('start_date')
-    serializer = EventSerializer(events, many=True)
+    """
+    Events ordered by start date. Optional filters: status, category, is_free,
+    registration_open, start_date_from, start_date_to, location, ordering;
+    `fields=id,title,...` returns (and loads) only those fields.
+    """
+    try:
+        fields = filters.sparse_fields(request.GET, EventSerializer)
+        events = filters.filter_events(Event.objects.all(), request.GET)
+    except filters.QueryParamError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    context = {'fields': fields}
+    if settings.FAST_LIST_SERIALIZATION:
+        return Response(fast_serializers.EVENTS.render(events, context))
+    events = filters.apply_only(events, EventSerializer, fields)
+    serializer = EventSerializer(events, many=True, context=context)
+    return Response(serializer.data)
+
+@api_view(['GET'])
+def upcoming_event_list(request):
+    """Events that haven't ended yet (and aren't completed), from the per-day ID cache; supports `fields=`."""
+    try:
+        fields = filters.sparse_fields(request.GET, EventSerializer)
+    except filters.QueryParamError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    events = Event.objects.filter(pk__in=upcoming_events.upcoming_ids()).order_by('start_date', 'pk')
+    context = {'fields': fields}
+    if settings.FAST_LIST_SERIALIZATION:
+        return Response(fast_serializers.EVENTS.render(events, context))
+    events = filters.apply_only(events, EventSerializer, fields)
+    serializer = EventSerializer(events, many=True, context=context)
     return Response(serializer.data)
 
 @api_view(['GET'])
@@ -102,6 +153,8 @@ def event_detail(request, pk):
     return Response(serializer.data)
 
 @api_view(['GET', 'POST'])
+@rate_limit('event_registration')
+@idempotent('event_registration')
 def event_registration_list(request):
     if request.method == 'GET':
         registrations = EventRegistration.objects.all()
@@ -117,6 +170,8 @@ def event_registration_list(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET', 'POST'])
+@rate_limit('event_registration')
+@idempotent('event_registration')
 def event_registration_by_event(request, event_id):
     """
     GET: List all registrations for a specific event
@@ -195,7 +250,47 @@ def event_registration_by_event(request, event_id):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
             
-def send_registration_emails(registration):
+@api_view(['POST'])
+@rate_limit('group_registration')
+@idempotent('event_group_registration')
+def event_group_registration(request, event_id):
+    """
+    Register several attendees for an event in one request:
+    {"attendees": [{full_name, email, phone, company, job_title, ...}, ...]}.
+    The first attendee is the group lead; for paid events their single
+    payment covers every seat (initiate it at /api/payments/initiate/<lead id>/).
+    """
+    event = get_object_or_404(Event, pk=event_id)
+    try:
+        group = group_registration.register_event_group(
+            event, group_registration.attendees_from(request.data),
+        )
+    except group_registration.GroupRegistrationError as exc:
+        return Response(exc.as_response_data(), status=exc.status_code)
+
+    lead, payment = group['registrations'][0], group['payment']
+    try:
+        send_registration_emails(lead, seats=len(group['registrations']))
+    except Exception as email_error:
+        logger.error(f"Failed to send group registration emails: {str(email_error)}")
+
+    response_data = {
+        'group_reference': group['group_reference'],
+        'seats': len(group['registrations']),
+        'registration_ids': [registration.id for registration in group['registrations']],
+        'lead_registration_id': lead.id,
+        'registration_status': lead.registration_status,
+        'payment_required': payment is not None,
+    }
+    if payment is not None:
+        response_data['payment_id'] = str(payment.id)
+        response_data['payment_amount'] = str(payment.amount)
+        response_data['payment_currency'] = payment.currency
+        response_data['payment_url'] = f"/api/payments/initiate/{lead.id}/"
+    return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+def send_registration_emails(registration, seats=1):
     event = registration.event
     user_email = registration.email
     user_name = registration.full_name
@@ -213,8 +308,9 @@ def send_registration_emails(registration):
         'location': event.location,
         'is_free_event': event.is_free,
         'payment_url': payment_url,
-        'amount': event.investment_amount if not event.is_free else 0,
+        'amount': (event.investment_amount or 0) * seats if not event.is_free else 0,
         'currency': event.currency,
+        'seats': seats,
     }
 
     # USER EMAIL
@@ -250,14 +346,22 @@ def send_registration_emails(registration):
 # Programs
 @api_view(['GET'])
 def program_list_endpoint(request):
-    programs = Program.objects.all()
-    serializer = ProgramSerializer(programs, many=True)
+    """Programs by title. Optional filters: category (slug), badge, price_currency, price_min/price_max, ordering; `fields=` sparse fieldset."""
+    try:
+        fields = filters.sparse_fields(request.GET, ProgramSerializer)
+        programs = filters.filter_programs(Program.objects.all(), request.GET, fields)
+    except filters.QueryParamError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    programs = filters.apply_only(programs, ProgramSerializer, fields)
+    serializer = ProgramSerializer(programs, many=True, context={'fields': fields})
     return Response(serializer.data, status=status.HTTP_200_OK)
 from .models import ProgramPayment
 # views.py
 # views.py - Your existing program registration endpoint
 
 @api_view(['POST'])
+@rate_limit('program_registration')
+@idempotent('program_registration')
 def program_register_endpoint(request, program_id):
     """Register for a program and return registration ID for payment"""
     try:
@@ -294,6 +398,46 @@ def program_register_endpoint(request, program_id):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
         
+@api_view(['POST'])
+@rate_limit('group_registration')
+@idempotent('program_group_registration')
+def program_group_register_endpoint(request, program_id):
+    """
+    Register several attendees for a program in one request:
+    {"attendees": [{full_name, email, phone_number, ...}, ...]}. The lead's
+    single payment covers every seat (initiate it at
+    /api/program-payments/initiate/<lead id>/).
+    """
+    program = get_object_or_404(Program, id=program_id)
+    try:
+        group = group_registration.register_program_group(
+            program, group_registration.attendees_from(request.data),
+        )
+    except group_registration.GroupRegistrationError as exc:
+        return Response(exc.as_response_data(), status=exc.status_code)
+
+    lead, payment = group['registrations'][0], group['payment']
+    try:
+        send_program_registration_emails(lead)
+    except Exception as email_error:
+        logger.error(f"Email sending failed: {email_error}")
+
+    response_data = {
+        'group_reference': group['group_reference'],
+        'seats': len(group['registrations']),
+        'registration_ids': [registration.id for registration in group['registrations']],
+        'lead_registration_id': lead.id,
+        'program_title': program.title,
+        'payment_required': payment is not None,
+    }
+    if payment is not None:
+        response_data['payment_id'] = str(payment.id)
+        response_data['payment_amount'] = str(payment.amount)
+        response_data['payment_currency'] = payment.currency
+        response_data['next_step'] = f'/api/program-payments/initiate/{lead.id}/'
+    return Response(response_data, status=status.HTTP_201_CREATED)
+
+
 def send_program_registration_emails(registration):
     context = {
         'full_name': registration.full_name,
@@ -359,6 +503,7 @@ def sign_out(request):
 
 # Payment Views
 @api_view(['POST'])
+@idempotent('payment_initiation')
 def initiate_payment(request, registration_id):
     """Initiate PesaPal payment for a registration"""
     try:
@@ -456,7 +601,7 @@ def pesapal_callback(request):
         
         # Try EVENT payment first
         try:
-            payment = Payment.objects.get(pesapal_order_tracking_id=order_tracking_id)
+            payment = Payment.objects.select_related('registration').get(pesapal_order_tracking_id=order_tracking_id)
             logger.info(f"✅ Processing as EVENT payment: {payment.id}")
             return handle_event_payment_callback(request, payment, order_tracking_id)
         except Payment.DoesNotExist:
@@ -464,7 +609,7 @@ def pesapal_callback(request):
         
         # Try PROGRAM payment
         try:
-            payment = ProgramPayment.objects.get(pesapal_order_tracking_id=order_tracking_id)
+            payment = ProgramPayment.objects.select_related('registration').get(pesapal_order_tracking_id=order_tracking_id)
             logger.info(f"✅ Processing as PROGRAM payment: {payment.id}")
             return handle_program_payment_callback(request, payment, order_tracking_id)
         except ProgramPayment.DoesNotExist:
@@ -490,46 +635,36 @@ def handle_event_payment_callback(request, payment, order_tracking_id):
     
     logger.info(f"📡 Event payment status response: {status_response}")
     
-    payment_updated = False
     payment_status = payment.payment_status
     
     if status_response:
         status_code = status_response.get('status_code')
         
         if status_code in [1, '1']:  # COMPLETED
-            payment.payment_status = 'completed'
-            payment.payment_completed_at = timezone.now()
-            payment.payment_method = status_response.get('payment_method') or 'pesapal'
-            payment.pesapal_transaction_id = status_response.get('transaction_id')
-            
-            # Update registration status
-            payment.registration.registration_status = 'confirmed'
-            payment.registration.save()
-            
+            # Also confirms the registration; False when an IPN already completed it
+            completed = payment.mark_as_completed(
+                transaction_id=status_response.get('transaction_id'),
+                payment_method=status_response.get('payment_method') or 'pesapal',
+            )
             payment_status = 'completed'
-            payment_updated = True
-            
-            logger.info(f"✅ EVENT PAYMENT COMPLETED! Registration confirmed for {payment.registration.email}")
             
-            # Send payment confirmation email
-            try:
-                send_program_payment_confirmation_email(payment)
-                logger.info("✅ Event payment confirmation email sent successfully")
-            except Exception as email_error:
-                logger.error(f"❌ Failed to send event payment confirmation email: {str(email_error)}")
+            if completed:
+                logger.info(f"✅ EVENT PAYMENT COMPLETED! Registration confirmed for {payment.customer_email}")
+                
+                # Send payment confirmation email
+                try:
+                    send_program_payment_confirmation_email(payment)
+                    logger.info("✅ Event payment confirmation email sent successfully")
+                except Exception as email_error:
+                    logger.error(f"❌ Failed to send event payment confirmation email: {str(email_error)}")
             
         elif status_code in [2, '2']:  # Failed
-            payment.payment_status = 'failed'
+            payment.mark_as_failed()
             payment_status = 'failed'
-            payment_updated = True
             
         elif status_code in [0, '0']:  # Pending
-            payment.payment_status = 'pending'
+            payment.mark_as_pending()
             payment_status = 'pending'
-            payment_updated = True
-        
-        if payment_updated:
-            payment.save()
     
     # Redirect to frontend
     frontend_base_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:8080').rstrip('/')
@@ -552,46 +687,36 @@ def handle_program_payment_callback(request, payment, order_tracking_id):
     
     logger.info(f"📡 Program payment status response: {status_response}")
     
-    payment_updated = False
     payment_status = payment.payment_status
     
     if status_response:
         status_code = status_response.get('status_code')
         
         if status_code in [1, '1']:  # COMPLETED
-            payment.payment_status = 'completed'
-            payment.payment_completed_at = timezone.now()
-            payment.payment_method = status_response.get('payment_method') or 'pesapal'
-            payment.pesapal_transaction_id = status_response.get('transaction_id')
-            
-            # Update registration payment status
-            payment.registration.has_paid = True
-            payment.registration.save()
-            
+            # Also flags the registration as paid; False when an IPN already completed it
+            completed = payment.mark_as_completed(
+                transaction_id=status_response.get('transaction_id'),
+                payment_method=status_response.get('payment_method') or 'pesapal',
+            )
             payment_status = 'completed'
-            payment_updated = True
-            
-            logger.info(f"✅ PROGRAM PAYMENT COMPLETED! Payment ID: {payment.id}")
             
-            # Send program payment confirmation email
-            try:
-                send_program_payment_confirmation_email(payment)
-                logger.info("✅ Program payment confirmation email sent successfully")
-            except Exception as email_error:
-                logger.error(f"❌ Failed to send program payment confirmation email: {str(email_error)}")
+            if completed:
+                logger.info(f"✅ PROGRAM PAYMENT COMPLETED! Payment ID: {payment.id}")
+                
+                # Send program payment confirmation email
+                try:
+                    send_program_payment_confirmation_email(payment)
+                    logger.info("✅ Program payment confirmation email sent successfully")
+                except Exception as email_error:
+                    logger.error(f"❌ Failed to send program payment confirmation email: {str(email_error)}")
             
         elif status_code in [2, '2']:  # Failed
-            payment.payment_status = 'failed'
+            payment.mark_as_failed()
             payment_status = 'failed'
-            payment_updated = True
             
         elif status_code in [0, '0']:  # Pending
-            payment.payment_status = 'pending'
+            payment.mark_as_pending()
             payment_status = 'pending'
-            payment_updated = True
-        
-        if payment_updated:
-            payment.save()
     
     # Redirect to frontend - use program-specific page
     frontend_base_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:8080').rstrip('/')
@@ -629,7 +754,7 @@ def pesapal_ipn(request):
         payment_type = None
         
         try:
-            payment = Payment.objects.get(pesapal_order_tracking_id=order_tracking_id)
+            payment = Payment.objects.select_related('registration').get(pesapal_order_tracking_id=order_tracking_id)
             payment_type = 'event'
             logger.info(f"✅ Found EVENT payment: {payment.id}")
         except Payment.DoesNotExist:
@@ -638,7 +763,7 @@ def pesapal_ipn(request):
         # If not found in events, try PROGRAM payments
         if not payment:
             try:
-                payment = ProgramPayment.objects.get(pesapal_order_tracking_id=order_tracking_id)
+                payment = ProgramPayment.objects.select_related('registration').get(pesapal_order_tracking_id=order_tracking_id)
                 payment_type = 'program'
                 logger.info(f"✅ Found PROGRAM payment: {payment.id}")
             except ProgramPayment.DoesNotExist:
@@ -662,40 +787,21 @@ def pesapal_ipn(request):
             logger.info(f"🔄 Processing payment status - Code: {status_code}, Type: {payment_type}")
             
             if status_code in [1, '1']:  # COMPLETED
-                payment.payment_status = 'completed'
-                payment.payment_completed_at = timezone.now()
-                payment.payment_method = payment_method or 'pesapal'
-                if transaction_id:
-                    payment.pesapal_transaction_id = transaction_id
-                
-                payment.save()
-                logger.info(f"✅ PAYMENT COMPLETED - {payment_type.upper()}: {payment.id}")
+                # Confirms the event registration / flags the program registration
+                # as paid. PesaPal repeats IPNs; a repeat writes and sends nothing.
+                completed = payment.mark_as_completed(
+                    transaction_id=transaction_id, payment_method=payment_method or 'pesapal',
+                )
                 
-                # Handle completion based on payment type
-                if payment_type == 'event':
-                    # Confirm event registration
-                    payment.registration.registration_status = 'confirmed'
-                    payment.registration.save()
+                if completed:
+                    logger.info(f"✅ PAYMENT COMPLETED - {payment_type.upper()}: {payment.id}")
                     
-                    # Send event payment confirmation email
+                    # Send payment confirmation email
                     try:
                         send_program_payment_confirmation_email(payment)
-                        logger.info("✅ Event payment confirmation email sent successfully")
+                        logger.info(f"✅ {payment_type.title()} payment confirmation email sent successfully")
                     except Exception as email_error:
-                        logger.error(f"❌ Failed to send event payment confirmation email: {str(email_error)}")
-                        
-                elif payment_type == 'program':
-                    # Update program registration payment status
-                    payment.registration.has_paid = True
-                    payment.registration.payment_status = 'completed'  # Add this field if it exists
-                    payment.registration.save()
-                    
-                    # Send program payment confirmation email
-                    try:
-                        send_program_payment_confirmation_email(payment)
-                        logger.info("✅ Program payment confirmation email sent successfully")
-                    except Exception as email_error:
-                        logger.error(f"❌ Failed to send program payment confirmation email: {str(email_error)}")
+                        logger.error(f"❌ Failed to send {payment_type} payment confirmation email: {str(email_error)}")
                 
                 return Response({
                     'message': f'{payment_type.title()} payment completed successfully',
@@ -704,8 +810,7 @@ def pesapal_ipn(request):
                 })
                 
             elif status_code in [2, '2']:  # FAILED
-                payment.payment_status = 'failed'
-                payment.save()
+                payment.mark_as_failed()
                 logger.warning(f"❌ PAYMENT FAILED - {payment_type.upper()}: {payment.id}")
                 return Response({
                     'message': f'{payment_type.title()} payment failed',
@@ -714,8 +819,7 @@ def pesapal_ipn(request):
                 })
                 
             elif status_code in [0, '0']:  # PENDING
-                payment.payment_status = 'pending'
-                payment.save()
+                payment.mark_as_pending()
                 logger.info(f"⏳ PAYMENT PENDING - {payment_type.upper()}: {payment.id}")
                 return Response({
                     'message': f'{payment_type.title()} payment is pending',
@@ -809,6 +913,7 @@ from .models import ProgramPayment
 from .serializers import ProgramPaymentSerializer
 # views.py
 @api_view(['POST'])
+@idempotent('program_payment_initiation')
 def initiate_program_payment(request, registration_id):
     """Initiate payment for program registration using ProgramPaymentService"""
     try:
@@ -819,6 +924,15 @@ def initiate_program_payment(request, registration_id):
         if hasattr(registration, 'payment'):
             payment = registration.payment
             logger.info(f"✅ Using existing program payment: {payment.id}")
+        elif not registration.program.price_amount:
+            # Nothing to charge: a free program, or one without a structured price
+            program = registration.program
+            logger.warning(f"❌ Program {program.id} has no amount to pay ({program.price!r}); cannot initiate payment")
+            if program.price_amount is None:
+                error = f'Program "{program.title}" has no payable price ({program.price}); contact us to complete this registration'
+            else:
+                error = f'Program "{program.title}" is free; no payment is needed'
+            return Response({'error': error}, status=status.HTTP_409_CONFLICT)
         else:
             # Create new payment
             payment = ProgramPayment.objects.create(
@@ -836,11 +950,7 @@ def initiate_program_payment(request, registration_id):
 
         if order_response and order_response.get('redirect_url'):
             # Update payment with PesaPal details
-            payment.pesapal_order_tracking_id = order_response.get('order_tracking_id')
-            payment.pesapal_payment_url = order_response.get('redirect_url')
-            payment.payment_status = 'initiated'
-            payment.payment_initiated_at = timezone.now()
-            payment.save()
+            payment.mark_as_initiated(order_response.get('order_tracking_id'), order_response.get('redirect_url'))
             
             logger.info(f"✅ Program payment initiated successfully - Payment ID: {payment.id}, Tracking ID: {payment.pesapal_order_tracking_id}")
             
@@ -853,8 +963,7 @@ def initiate_program_payment(request, registration_id):
             })
         else:
             # Mark payment as failed if initiation fails
-            payment.payment_status = 'failed'
-            payment.save()
+            payment.mark_as_failed()
             
             logger.error(f"❌ Program payment initiation failed for registration: {registration.id}")
             return Response(
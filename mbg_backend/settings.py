@@ -6,6 +6,8 @@ import os
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 
 # Load .env file
 load_dotenv()
@@ -48,6 +50,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "api.middleware.CompressionMiddleware",  # before anything that reads/writes the body
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # must come before CommonMiddleware
     "django.middleware.common.CommonMiddleware",
@@ -78,12 +81,67 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "mbg_backend.wsgi.application"
 
-# DATABASE (SQLite)
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+# DATABASE
+# DB_ENGINE selects the backend: "sqlite" (default) or "postgres".
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite").lower()
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", 600))
+
+if DB_ENGINE in ("postgres", "postgresql"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("DB_NAME", "mbg"),
+            "USER": os.getenv("DB_USER", "postgres"),
+            "PASSWORD": os.getenv("DB_PASSWORD", ""),
+            "HOST": os.getenv("DB_HOST", "localhost"),
+            "PORT": os.getenv("DB_PORT", "5432"),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
+    }
+    if os.getenv("DB_POOL", "True") == "True":
+        # Django's native psycopg pool. It already keeps connections open, and
+        # Django refuses to combine it with CONN_MAX_AGE, so that stays 0.
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            "timeout": int(os.getenv("DB_POOL_TIMEOUT", 10)),
+        }
+    else:
+        # Persistent per-thread connections instead of a pool.
+        DATABASES["default"]["CONN_MAX_AGE"] = DB_CONN_MAX_AGE
+elif DB_ENGINE == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("DB_NAME", os.path.join(BASE_DIR, "db.sqlite3")),
+            # Keep connections open between requests instead of reconnecting (and
+            # re-running the PRAGMAs below) every time.
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                # Take the write lock when a transaction starts, so busy_timeout
+                # applies instead of failing a read->write lock upgrade.
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
     }
+else:
+    raise ImproperlyConfigured(f"Unsupported DB_ENGINE {DB_ENGINE!r}; use 'sqlite' or 'postgres'.")
+
+if os.getenv("DB_TEST_NAME"):
+    DATABASES["default"]["TEST"] = {"NAME": os.getenv("DB_TEST_NAME")}
+
+# Applied to every new SQLite connection by api.signals.configure_sqlite_connection.
+# WAL lets readers run alongside a writer; busy_timeout makes writers wait for
+# the lock instead of raising "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # negative = KiB, i.e. 64 MiB
 }
 
 # PASSWORD VALIDATION
@@ -105,6 +163,41 @@ STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Absolute media base used by the API serializers, e.g. "https://api.smartsales.co.ke/media/".
+# Leave empty to build it from the incoming request (once per request).
+MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL", "")
+if MEDIA_BASE_URL and not MEDIA_BASE_URL.endswith("/"):
+    MEDIA_BASE_URL += "/"
+
+# Uploads are stored under content-hash names (api.storage.ContentHashedStorage),
+# so a media URL always refers to the same bytes and can be cached as immutable.
+STORAGES = {
+    "default": {"BACKEND": "api.storage.ContentHashedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# How MEDIA_URL is served (api.media.serve_media):
+#   "x-accel-redirect" - nginx sends the file from an `internal` location that
+#                        aliases MEDIA_ROOT at ACCEL_REDIRECT_PREFIX
+#   "x-sendfile"       - Apache mod_xsendfile / lighttpd
+#   "django"           - Django streams the file itself (development)
+#   "none"             - not routed; the web server serves MEDIA_URL directly
+MEDIA_SERVE = {
+    "MODE": os.getenv("MEDIA_SERVE_MODE", "django" if DEBUG else "none"),
+    "ACCEL_REDIRECT_PREFIX": os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/"),
+    "MAX_AGE": int(os.getenv("MEDIA_MAX_AGE", "3600")),  # for names without a content hash
+}
+
+# Resized variants generated for TeamMember/GalleryItem/Testimonial/Event images
+# (api.services.image_derivatives), exposed as srcset strings by the API.
+# Unless GENERATE_ON_SAVE is on, uploads are left pending for
+# `manage.py process_images` so admin saves never wait on Pillow.
+IMAGE_DERIVATIVES = {
+    "WIDTHS": [320, 640, 1280],
+    "FORMATS": ["webp", "jpeg"],
+    "QUALITY": 80,
+    "GENERATE_ON_SAVE": os.getenv("IMAGE_DERIVATIVES_ON_SAVE", "False") == "True",
+}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -116,6 +209,8 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:3000",
 ]
 CORS_ALLOW_CREDENTIALS = True
+# Idempotency-Key lets the frontend retry registrations and payment starts safely
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
 
 CSRF_TRUSTED_ORIGINS = [
     "https://smartsales.co.ke",
@@ -135,20 +230,87 @@ JAZZMIN_SETTINGS = {
     "topmenu_links": [
         {"name": "Home", "url": "/", "permissions": ["auth.view_user"]},
         {"app": "api"},
+        {"name": "Sales dashboard", "url": "admin:api_dailyrollup_changelist", "permissions": ["api.view_dailyrollup"]},
     ],
     "icons": {
         "auth": "fas fa-users-cog",
         "api.TeamMember": "fas fa-user-tie",
         "api.Program": "fas fa-chalkboard-teacher",
         "api.Event": "fas fa-calendar-check",
+        "api.DailyRollup": "fas fa-chart-line",
+    },
+}
+
+# CACHE
+# Shared cache (Redis, via the redis package) when REDIS_URL is set;
+# per-process memory otherwise.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Upcoming event IDs are cached per Nairobi date (api.services.upcoming_events)
+# until midnight, or at most this long so per-process caches converge.
+UPCOMING_EVENTS_CACHE_TIMEOUT = int(os.getenv("UPCOMING_EVENTS_CACHE_TIMEOUT", "300"))
+
+# REGISTRATIONS
+# Most attendees one group registration request may carry
+# (api.services.group_registration).
+GROUP_REGISTRATION_MAX_SIZE = int(os.getenv("GROUP_REGISTRATION_MAX_SIZE", "100"))
+
+# Token-bucket limits on the anonymous write endpoints (api.throttling), per
+# client IP and per submitted email: `burst` requests at once, refilled at
+# `rate`. Set PROXY_COUNT to the number of reverse proxies in front of the
+# app so the client IP is read from X-Forwarded-For.
+RATE_LIMITS = {
+    "ENABLED": os.getenv("RATE_LIMITS_ENABLED", "True") == "True",
+    "PROXY_COUNT": int(os.getenv("RATE_LIMIT_PROXY_COUNT", "0")),
+    "SCOPES": {
+        "contact": {"rate": "10/hour", "burst": 3},
+        "event_registration": {"rate": "20/hour", "burst": 5},
+        "program_registration": {"rate": "20/hour", "burst": 5},
+        "group_registration": {"rate": "5/hour", "burst": 2},
     },
 }
 
+# Responses of registration and payment-initiation POSTs sent with an
+# Idempotency-Key header are replayed for repeats of that key within this
+# many seconds (api.idempotency). `manage.py purge_idempotency_keys` drops
+# older ones.
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 24 * 3600))
+
+# RESPONSE RENDERING
+# gzip/brotli for JSON responses (api.middleware.CompressionMiddleware). Don't
+# add text/html: admin pages carry CSRF tokens and would be open to BREACH.
+# With CACHE on, compressed bodies are cached by content digest, so unchanged
+# catalogue responses (events, programs) are compressed once.
+RESPONSE_COMPRESSION = {
+    "MIN_SIZE": int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+    "CONTENT_TYPES": ["application/json"],
+    "CACHE": os.getenv("COMPRESSION_CACHE", "False") == "True",
+    "CACHE_TIMEOUT": 300,
+}
+
+# Render event_list, get_testimonials and category_list from .values() rows
+# (api.services.fast_serializers) instead of one serializer per instance.
+# Output is identical; `manage.py bench_fast_lists` checks parity.
+FAST_LIST_SERIALIZATION = os.getenv("FAST_LIST_SERIALIZATION", "True") == "True"
+
 # JWT SETTINGS
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    # orjson-backed when installed, same output as DRF's JSONRenderer
+    "DEFAULT_RENDERER_CLASSES": (
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
 }
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
@@ -1,8 +1,10 @@
 from django.contrib import admin
-from django.urls import path, include
+import re
+
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
+from api.media import serve_media
 
 
 
@@ -22,6 +24,8 @@ urlpatterns = [
     
 ]
 
-# 👇 Serve uploaded images (only in development)
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# 👇 Serve uploaded images (Django itself in development, X-Accel-Redirect/X-Sendfile in production)
+if settings.MEDIA_SERVE["MODE"] != "none":
+    urlpatterns += [
+        re_path(r"^%s(?P<path>.+)$" % re.escape(settings.MEDIA_URL.lstrip("/")), serve_media),
+    ]